@@ -5,6 +5,26 @@ set -euo pipefail
 BRAIN_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../brain" && pwd)"
 PYTHON_EXEC="$BRAIN_DIR/.venv/bin/python3"
 SCRIPT="$BRAIN_DIR/ingestion/recall_text.py"
+DAEMON_CLIENT="$BRAIN_DIR/lib/daemon_client.py"
+SOCKET="${BRAIN_SOCKET:-$BRAIN_DIR/brain.sock}"
+
+# Fast path: the resident daemon (start_daemon.sh) answers without importing chromadb.
+# Exit status 69 means it was unreachable, so fall through to the direct script.
+# --batch streams JSONL from stdin, which only recall_text.py implements.
+use_daemon=1
+for arg in "$@"; do
+    if [ "$arg" = "--batch" ]; then
+        use_daemon=0
+    fi
+done
+
+if [ "$use_daemon" -eq 1 ] && [ -S "$SOCKET" ] && command -v python3 &> /dev/null; then
+    status=0
+    BRAIN_SOCKET="$SOCKET" BRAIN_DAEMON_FALLBACK=1 python3 "$DAEMON_CLIENT" recall "$@" || status=$?
+    if [ "$status" -ne 69 ]; then
+        exit "$status"
+    fi
+fi
 
 if [ ! -x "$PYTHON_EXEC" ]; then
     echo "Error: Brain virtualenv not found. Run start_brain.sh first." >&2
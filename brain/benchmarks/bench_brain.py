@@ -0,0 +1,193 @@
+"""
+End-to-end benchmark of the brain pipeline on synthetic exports.
+
+Generates ChatGPT (with branching mapping trees) and Claude exports, then
+times ChatParser parsing, pair extraction, batched ingest and vector
+recall. Ingest and recall run against an in-process Chroma store (the
+embedded backend in a temp directory) with a hash embedding, so no server
+or model download is needed and the numbers track our own code.
+
+Results are written as JSON; pass a previous run with --compare to see
+the change per metric.
+
+    python3 benchmarks/bench_brain.py --conversations 2000 --output /tmp/bench.json
+    python3 benchmarks/bench_brain.py --compare /tmp/bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add brain root to path to allow imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+brain_root = os.path.abspath(os.path.join(current_dir, "../.."))
+if brain_root not in sys.path:
+    sys.path.insert(0, brain_root)
+
+from brain.benchmarks.bench_transport import HashEmbedding, summarize
+from brain.benchmarks.synthetic import WORDS, write_export
+from brain.ingestion.ingest import BatchWriter, extract_memories
+from brain.ingestion.parser import ChatParser
+from brain.lib import memory
+
+BENCH_COLLECTION = "bench_brain"
+FORMATS = ("chatgpt", "claude")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=current_dir,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_parse(path, format_type, workers=None):
+    parser = ChatParser()
+    started = time.perf_counter()
+    # The records ingest.py streams, not parse_file's dict copies
+    conversations = list(parser.iter_file(path, format_type, workers))
+    elapsed = time.perf_counter() - started
+    size_mb = os.path.getsize(path) / 1e6
+    return conversations, {
+        "conversations": len(conversations),
+        "size_mb": size_mb,
+        "seconds": elapsed,
+        "mb_per_sec": size_mb / elapsed if elapsed else 0.0,
+        "conversations_per_sec": len(conversations) / elapsed if elapsed else 0.0,
+    }
+
+
+def bench_extract(conversations):
+    started = time.perf_counter()
+    pairs = list(extract_memories(conversations))
+    elapsed = time.perf_counter() - started
+    return pairs, {
+        "pairs": len(pairs),
+        "seconds": elapsed,
+        "pairs_per_sec": len(pairs) / elapsed if elapsed else 0.0,
+    }
+
+
+def bench_ingest(client, pairs, batch_size):
+    writer = BatchWriter(client, batch_size=batch_size, collection_name=BENCH_COLLECTION)
+    started = time.perf_counter()
+    try:
+        for mem_id, content, metadata in pairs:
+            writer.add(mem_id, content, metadata)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - started
+    return {
+        "pairs": writer.written,
+        "seconds": elapsed,
+        "pairs_per_sec": writer.written / elapsed if elapsed else 0.0,
+        "batch_size": batch_size,
+    }
+
+
+def bench_recall(client, queries, n_results):
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        memory.recall(client, query, n_results=n_results, collection_name=BENCH_COLLECTION)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def run(conversations, turns, queries, n_results, batch_size, seed, parse_workers=None):
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "conversations": conversations,
+            "turns": turns,
+            "queries": queries,
+            "parse_workers": parse_workers,
+        },
+    }
+    with tempfile.TemporaryDirectory(prefix="brain-bench-") as tmp:
+        all_pairs = []
+        for format_type in FORMATS:
+            path = write_export(os.path.join(tmp, f"{format_type}.json"), format_type,
+                                conversations, turns, seed)
+            parsed, results[f"parse_{format_type}"] = bench_parse(path, format_type)
+            if parse_workers:
+                _, results[f"parse_{format_type}_parallel"] = bench_parse(path, format_type, parse_workers)
+            pairs, results[f"extract_{format_type}"] = bench_extract(parsed)
+            all_pairs.extend(pairs)
+
+        # Hash vectors through the embedding cache stand in for the model
+        memory.enable_embedding_cache(os.path.join(tmp, "embeddings"), HashEmbedding())
+        try:
+            client = memory.get_client(backend="embedded", path=os.path.join(tmp, "chroma"))
+            results["ingest"] = bench_ingest(client, all_pairs, batch_size)
+
+            words = sorted(WORDS)
+            recall_queries = [f"{words[i % len(words)]} {words[(i * 7) % len(words)]}" for i in range(queries)]
+            results["recall"] = bench_recall(client, recall_queries, n_results)
+        finally:
+            memory.disable_embedding_cache()
+            memory.clear_pool()
+    return results
+
+
+def _flatten(results):
+    flat = {}
+    for section, values in results.items():
+        if section == "meta":
+            continue
+        for key, value in values.items():
+            if isinstance(value, (int, float)):
+                flat[f"{section}.{key}"] = value
+    return flat
+
+
+def compare(current, baseline):
+    """Prints each metric next to the baseline with the relative change."""
+    before = _flatten(baseline)
+    print(f"{'metric':<36} {'baseline':>12} {'current':>12} {'change':>8}")
+    for key, value in _flatten(current).items():
+        if key not in before:
+            continue
+        old = before[key]
+        change = f"{(value - old) / old * 100:+.1f}%" if old else "n/a"
+        print(f"{key:<36} {old:>12.3f} {value:>12.3f} {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsing, ingest and recall on synthetic exports.")
+    parser.add_argument("--conversations", type=int, default=1000, help="Conversations per export format")
+    parser.add_argument("--turns", type=int, default=6, help="User/assistant turns per conversation")
+    parser.add_argument("--queries", type=int, default=200, help="Recall queries to time")
+    parser.add_argument("--n-results", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--parse-workers", type=int, default=None,
+                        help="Also time sharded parsing with N processes")
+    parser.add_argument("--output", help="Write results JSON here (default: print it)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against a previous results JSON")
+    args = parser.parse_args()
+
+    results = run(args.conversations, args.turns, args.queries, args.n_results, args.batch_size, args.seed,
+                  args.parse_workers)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    elif not args.compare:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
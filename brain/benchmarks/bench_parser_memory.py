@@ -0,0 +1,84 @@
+"""
+Measures memory retained by parsed conversations.
+
+Feeds synthetic conversations straight into ChatParser (no file, so only
+the parsed output is retained) and reports tracemalloc's retained and peak
+bytes for the slotted model next to the plain dicts ChatParser used to
+return (Conversation.to_dict()).
+
+    python3 benchmarks/bench_parser_memory.py --conversations 100000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+# Add brain root to path to allow imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+brain_root = os.path.abspath(os.path.join(current_dir, "../.."))
+if brain_root not in sys.path:
+    sys.path.insert(0, brain_root)
+
+from brain.benchmarks.synthetic import GENERATORS
+from brain.ingestion.parser import ChatParser
+
+REPRESENTATIONS = ("model", "dict")
+
+
+def measure(format_type, representation, conversations, turns, seed):
+    parser = ChatParser()
+    parse = parser._conversation_parser(format_type)
+    generate = GENERATORS[format_type]
+    rng = random.Random(seed)
+
+    gc.collect()
+    tracemalloc.start()
+    kept = []
+    for i in range(conversations):
+        conv = parse(generate(rng, i, turns=turns))
+        kept.append(conv.to_dict() if representation == "dict" else conv)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    messages = sum(len(c["messages"]) for c in kept)
+    del kept
+    return {
+        "conversations": conversations,
+        "messages": messages,
+        "retained_mb": retained / 1e6,
+        "peak_mb": peak / 1e6,
+        "bytes_per_message": retained / messages if messages else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare parsed-conversation memory: slotted model vs dicts.")
+    parser.add_argument("--conversations", type=int, default=100_000)
+    parser.add_argument("--turns", type=int, default=4, help="User/assistant turns per conversation")
+    parser.add_argument("--format", choices=sorted(GENERATORS), default="chatgpt")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = {rep: measure(args.format, rep, args.conversations, args.turns, args.seed)
+               for rep in REPRESENTATIONS}
+    model, legacy = results["model"]["retained_mb"], results["dict"]["retained_mb"]
+    results["reduction_pct"] = (1 - model / legacy) * 100 if legacy else 0.0
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'repr':<6} {'retained MB':>12} {'peak MB':>9} {'B/msg':>7}")
+    for rep in REPRESENTATIONS:
+        r = results[rep]
+        print(f"{rep:<6} {r['retained_mb']:>12.1f} {r['peak_mb']:>9.1f} {r['bytes_per_message']:>7.0f}")
+    print(f"Retained memory reduced by {results['reduction_pct']:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Compares per-document latency of the http and embedded memory backends.
+
+Uses a throwaway collection (and a temp store for the embedded backend)
+plus a cheap deterministic embedding so the numbers reflect transport
+cost rather than model time. The http run is skipped when no server is
+listening.
+
+    python3 benchmarks/bench_transport.py --docs 200 --queries 50
+"""
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add brain root to path to allow imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+brain_root = os.path.abspath(os.path.join(current_dir, "../.."))
+if brain_root not in sys.path:
+    sys.path.insert(0, brain_root)
+
+from chromadb import EmbeddingFunction
+
+from brain.lib import memory
+
+BENCH_COLLECTION = "bench_transport"
+
+
+class HashEmbedding(EmbeddingFunction):
+    """Deterministic 64-dim vectors from a hash; no model load."""
+
+    def __init__(self):
+        pass
+
+    def __call__(self, input):
+        vectors = []
+        for text in input:
+            digest = hashlib.sha512(text.encode("utf-8")).digest()
+            vectors.append([b / 255.0 for b in digest])
+        return vectors
+
+    @staticmethod
+    def name():
+        return "bench_hash"
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    return {
+        "n": len(samples),
+        "mean_ms": statistics.mean(samples) * 1000,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+    }
+
+
+def run_backend(client, docs, queries):
+    embed = HashEmbedding()
+    try:
+        client.delete_collection(BENCH_COLLECTION)
+    except Exception:
+        pass
+    collection = client.create_collection(name=BENCH_COLLECTION, embedding_function=embed)
+
+    add_times = []
+    for i in range(docs):
+        text = f"Benchmark memory {i}: the quick brown fox jumps over lazy dog {i * 7}"
+        started = time.perf_counter()
+        memory.add_memory(client, text, {"type": "bench", "i": i}, collection=collection)
+        add_times.append(time.perf_counter() - started)
+
+    query_times = []
+    for i in range(queries):
+        started = time.perf_counter()
+        collection.query(query_texts=[f"quick fox {i}"], n_results=5)
+        query_times.append(time.perf_counter() - started)
+
+    client.delete_collection(BENCH_COLLECTION)
+    return {"add": summarize(add_times), "query": summarize(query_times)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark http vs embedded brain backends.")
+    parser.add_argument("--docs", type=int, default=200, help="Single-document adds per backend")
+    parser.add_argument("--queries", type=int, default=50, help="Queries per backend")
+    parser.add_argument("--host", default=memory.HOST)
+    parser.add_argument("--port", type=int, default=memory.PORT)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="brain-bench-") as store:
+        client = memory.get_client(backend="embedded", path=store)
+        results["embedded"] = run_backend(client, args.docs, args.queries)
+
+    client = memory.get_client(args.host, args.port, backend="http")
+    if client:
+        results["http"] = run_backend(client, args.docs, args.queries)
+    else:
+        print("Skipping http backend (no server).", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'backend':<10} {'op':<6} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for backend, ops in results.items():
+        for op, stats in ops.items():
+            print(f"{backend:<10} {op:<6} {stats['mean_ms']:>9.2f} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Synthetic ChatGPT and Claude exports for benchmarks.
+
+Conversations are generated from a seeded RNG, so the same arguments always
+produce the same file. ChatGPT conversations get a `mapping` tree in which
+some turns have abandoned sibling branches, as they do when a prompt is
+edited or an answer regenerated. Exports are written one conversation at a
+time, so large files do not have to fit in memory.
+
+    python3 benchmarks/synthetic.py chatgpt /tmp/export.json --conversations 5000
+"""
+import argparse
+import datetime
+import json
+import random
+import uuid
+
+WORDS = (
+    "alias bash brain branch cache chroma config cron daemon deploy docker dotfiles "
+    "embedding error export fzf git hook index ingest journal kernel launchd lint "
+    "memory merge metric model nvim path pipeline prompt python query recall regex "
+    "retry script shell socket sync task test timeout tmux token vector venv zsh"
+).split()
+
+BASE_TIME = 1_700_000_000.0
+
+
+def _sentence(rng, low=8, high=40):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high))).capitalize() + "."
+
+
+def _text(rng, sentences):
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128)))
+
+
+def chatgpt_conversation(rng, index, turns=6, branch_rate=0.3, answer_sentences=4):
+    """One ChatGPT-style conversation with a branching `mapping` tree."""
+    started = BASE_TIME + index * 3600
+    mapping = {}
+    root_id = _uuid(rng)
+    mapping[root_id] = {"id": root_id, "message": None, "parent": None, "children": []}
+    parent = root_id
+    ts = started
+
+    def node(role, text, parent_id, created):
+        node_id = _uuid(rng)
+        mapping[node_id] = {
+            "id": node_id,
+            "message": {
+                "id": node_id,
+                "author": {"role": role},
+                "create_time": created,
+                "content": {"content_type": "text", "parts": [text]},
+            },
+            "parent": parent_id,
+            "children": [],
+        }
+        mapping[parent_id]["children"].append(node_id)
+        return node_id
+
+    for _ in range(turns):
+        ts += rng.uniform(5, 120)
+        question = node("user", _text(rng, 1), parent, ts)
+        if rng.random() < branch_rate:
+            # Regenerated answer: the first attempt stays in the tree off the active path
+            ts += rng.uniform(1, 30)
+            node("assistant", _text(rng, answer_sentences), question, ts)
+        ts += rng.uniform(1, 30)
+        parent = node("assistant", _text(rng, answer_sentences), question, ts)
+
+    return {
+        "id": f"chatgpt-{index}",
+        "title": _sentence(rng, 2, 6),
+        "create_time": started,
+        "update_time": ts,
+        "mapping": mapping,
+        "current_node": parent,
+    }
+
+
+def _iso(ts):
+    return datetime.datetime.fromtimestamp(ts, tz=datetime.timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def claude_conversation(rng, index, turns=6, tool_rate=0.2, answer_sentences=4):
+    """One Claude-style conversation, occasionally with tool messages."""
+    started = BASE_TIME + index * 3600
+    ts = started
+    messages = []
+    for _ in range(turns):
+        ts += rng.uniform(5, 120)
+        messages.append({"uuid": _uuid(rng), "sender": "human", "text": _text(rng, 1), "created_at": _iso(ts)})
+        if rng.random() < tool_rate:
+            ts += rng.uniform(1, 5)
+            messages.append({"uuid": _uuid(rng), "sender": "tool", "text": "{}", "created_at": _iso(ts)})
+        ts += rng.uniform(1, 30)
+        messages.append({"uuid": _uuid(rng), "sender": "assistant", "text": _text(rng, answer_sentences),
+                         "created_at": _iso(ts)})
+    return {
+        "uuid": _uuid(rng),
+        "name": _sentence(rng, 2, 6),
+        "created_at": _iso(started),
+        "updated_at": _iso(ts),
+        "chat_messages": messages,
+    }
+
+
+GENERATORS = {"chatgpt": chatgpt_conversation, "claude": claude_conversation}
+
+
+def write_export(path, format_type="chatgpt", conversations=1000, turns=6, seed=0):
+    """Writes a synthetic export and returns its path."""
+    generate = GENERATORS[format_type]
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for i in range(conversations):
+            if i:
+                f.write(",\n")
+            json.dump(generate(rng, i, turns=turns), f)
+        f.write("]\n")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic chat export.")
+    parser.add_argument("format", choices=sorted(GENERATORS))
+    parser.add_argument("output", help="Export file to write")
+    parser.add_argument("--conversations", type=int, default=1000)
+    parser.add_argument("--turns", type=int, default=6, help="User/assistant turns per conversation")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_export(args.output, args.format, args.conversations, args.turns, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Resident Brain daemon.
+
+Keeps the Chroma client, collection handle and query embedding model warm
+and serves recall/ingest requests over a local Unix socket. Each request
+and response is one JSON object per line:
+
+    {"op": "recall", "query": "...", "n_results": 5, "where": {...}}
+    {"ok": true, "result": {...}}
+
+Use lib/daemon_client.py (stdlib only) to talk to it.
+"""
+import argparse
+import errno
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+
+# Add brain root to path to allow imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Note: We go up one level ("..") because daemon.py is in brain/ root.
+brain_root = os.path.abspath(os.path.join(current_dir, ".."))
+if brain_root not in sys.path:
+    sys.path.insert(0, brain_root)
+
+from brain.lib import memory
+from brain.lib.daemon_client import SOCKET_PATH
+from brain.ingestion.ingest_text import build_metadata
+from brain.ingestion.recall_text import recall_collapsed
+
+
+class BrainRequestHandler(socketserver.StreamRequestHandler):
+    """Answers newline-delimited JSON requests until the client disconnects."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                result = self.server.dispatch(request)
+                response = {"ok": True, "result": result}
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class BrainDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, client):
+        self.client = client
+        super().__init__(socket_path, BrainRequestHandler)
+
+    def warm_up(self):
+        """Resolves the collection and loads the embedding model once."""
+        memory.get_collection(self.client)
+        memory.recall(self.client, "warm up", n_results=1)
+
+    def dispatch(self, request):
+        op = request.get("op")
+        if op == "ping":
+            return "pong"
+        if op == "stats":
+            return {"recall_cache": memory.recall_cache_stats()}
+        if op == "recall" and request.get("collapse"):
+            return recall_collapsed(
+                self.client,
+                request["query"],
+                request.get("n_results", 5),
+                where=request.get("where") or None,
+                mode=request.get("mode", "vector"),
+            )
+        if op == "recall":
+            return memory.recall(
+                self.client,
+                request["query"],
+                n_results=request.get("n_results", 5),
+                where=request.get("where") or None,
+                where_document=request.get("where_document") or None,
+                collection_name=request.get("collection", memory.DEFAULT_COLLECTION),
+                mode=request.get("mode", "vector"),
+            )
+        if op == "recall_many":
+            return memory.recall_many(
+                self.client,
+                request["queries"],
+                n_results=request.get("n_results", 5),
+                where=request.get("where") or None,
+                where_document=request.get("where_document") or None,
+                collection_name=request.get("collection", memory.DEFAULT_COLLECTION),
+                mode=request.get("mode", "vector"),
+            )
+        if op == "add":
+            return memory.add_memory(
+                self.client,
+                request["content"],
+                request.get("metadata"),
+                collection_name=request.get("collection", memory.DEFAULT_COLLECTION),
+                ids=request.get("ids"),
+            )
+        if op == "ingest_text":
+            metadata = build_metadata(
+                request["title"],
+                request.get("tags", ""),
+                request.get("project", "generic"),
+                request.get("memory_type", "artifact"),
+            )
+            return memory.add_memory(self.client, request["content"], metadata)
+        raise ValueError(f"Unknown op: {op}")
+
+
+def _clear_stale_socket(socket_path):
+    """
+    Removes socket_path when nothing is listening on it (left by a crashed
+    daemon). Returns False, leaving it in place, when a daemon still answers.
+    """
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError as e:
+        if e.errno == errno.ENOENT:
+            return True
+        if e.errno != errno.ECONNREFUSED:
+            raise
+    else:
+        return False
+    finally:
+        probe.close()
+    os.unlink(socket_path)
+    return True
+
+
+def serve(socket_path=SOCKET_PATH, recall_cache_size=0, recall_cache_ttl=300.0):
+    if not _clear_stale_socket(socket_path):
+        print(f"Error: A Brain daemon is already listening on {socket_path}", file=sys.stderr)
+        return 1
+
+    if recall_cache_size > 0:
+        memory.enable_recall_cache(max_entries=recall_cache_size, ttl=recall_cache_ttl)
+    # Keeps BM25 current for writes made through the daemon and serves keyword/hybrid recall
+    memory.enable_lexical_index()
+
+    client = memory.get_client()
+    if not client:
+        print("Error: Could not connect to Hive Mind. Is start_brain.sh running?", file=sys.stderr)
+        return 1
+
+    server = BrainDaemon(socket_path, client)
+    os.chmod(socket_path, 0o600)
+    bound = os.stat(socket_path).st_ino
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.warm_up()
+        print(f"Brain daemon listening on {socket_path}")
+        sys.stdout.flush()
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+        # Only remove our own socket, never one a later daemon has bound
+        try:
+            if os.stat(socket_path).st_ino == bound:
+                os.unlink(socket_path)
+        except FileNotFoundError:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve Brain recall/ingest over a Unix socket.")
+    parser.add_argument("--socket", default=SOCKET_PATH, help=f"Socket path (default: {SOCKET_PATH})")
+    parser.add_argument("--recall-cache", type=int, default=0, metavar="N",
+                        help="Cache up to N recall results (0 disables)")
+    parser.add_argument("--recall-cache-ttl", type=float, default=300.0,
+                        help="Seconds a cached recall result stays valid (default: 300)")
+    args = parser.parse_args()
+    sys.exit(serve(args.socket, args.recall_cache, args.recall_cache_ttl))
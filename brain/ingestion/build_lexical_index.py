@@ -0,0 +1,22 @@
+import argparse
+import sys
+import os
+
+# Add brain root path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from brain.lib import memory
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the local BM25 index from a Brain collection.")
+    parser.add_argument("--collection", default=memory.DEFAULT_COLLECTION, help="Collection to index")
+    parser.add_argument("--page-size", type=int, default=500, help="Memories fetched per page")
+    args = parser.parse_args()
+
+    client = memory.get_client()
+    if not client:
+        print("Error: Could not connect to Hive Mind. Is start_brain.sh running?", file=sys.stderr)
+        sys.exit(1)
+
+    count = memory.rebuild_lexical_index(client, args.collection, args.page_size)
+    print(f"✓ Indexed {count} memories from '{args.collection}' for keyword/hybrid recall")
@@ -0,0 +1,143 @@
+"""
+Splits long Q&A memories into overlapping windows before embedding and
+stitches chunk hits back into their parent pair at recall time.
+
+Each chunk repeats the pair's "Context: <title>" line and records its
+parent in metadata (parent_id, chunk_index, chunk_count, chunk_start).
+"""
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+# Rough budget conversion for the default MiniLM-style embedding models
+CHARS_PER_TOKEN = 4
+DEFAULT_CHUNK_TOKENS = 256
+DEFAULT_OVERLAP_TOKENS = 32
+
+CHUNK_FIELDS = ("parent_id", "chunk_index", "chunk_count", "chunk_start")
+
+
+def split_text(text: str, max_chars: int, overlap: int) -> List[Tuple[int, str]]:
+    """
+    Returns (start_offset, window) pairs covering `text`.
+
+    Windows end on whitespace when one is available in the last quarter
+    of the window, and each window starts `overlap` chars before the
+    previous one ended.
+    """
+    if max_chars <= 0:
+        raise ValueError("max_chars must be positive")
+    overlap = max(0, min(overlap, max_chars // 2))
+    if len(text) <= max_chars:
+        return [(0, text)]
+
+    windows = []
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            cut = text.rfind(" ", start + (max_chars * 3) // 4, end)
+            if cut > start:
+                end = cut
+        windows.append((start, text[start:end]))
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return windows
+
+
+def chunk_pair(memory_id: str, content: str, metadata: Dict,
+               max_chars: int, overlap: int) -> List[Tuple[str, str, Dict]]:
+    """Splits one memory into linked chunks; short memories pass through unchanged."""
+    if len(content) <= max_chars:
+        return [(memory_id, content, metadata)]
+
+    header, sep, body = content.partition("\n")
+    if not sep or not header.startswith("Context:"):
+        header, body = "", content
+    else:
+        header += "\n"
+
+    windows = split_text(body, max(1, max_chars - len(header)), overlap)
+    chunks = []
+    for index, (start, window) in enumerate(windows):
+        chunk_meta = dict(metadata)
+        chunk_meta.update({
+            "parent_id": memory_id,
+            "chunk_index": index,
+            "chunk_count": len(windows),
+            "chunk_start": start,
+        })
+        chunks.append((f"{memory_id}#{index}", header + window, chunk_meta))
+    return chunks
+
+
+def chunk_pairs(pairs: Iterable[Tuple[str, str, Dict]], max_chars: int,
+                overlap: int) -> Iterator[Tuple[str, str, Dict]]:
+    for memory_id, content, metadata in pairs:
+        yield from chunk_pair(memory_id, content, metadata, max_chars, overlap)
+
+
+def merge_chunks(documents: List[str], metadatas: List[Dict]) -> str:
+    """Reassembles a parent memory from its chunks using the recorded offsets."""
+    ordered = sorted(zip(documents, metadatas), key=lambda item: item[1].get("chunk_index", 0))
+    header = ""
+    body = ""
+    for document, meta in ordered:
+        text = document
+        if document.startswith("Context:"):
+            first, _, text = document.partition("\n")
+            header = first + "\n"
+        start = meta.get("chunk_start", len(body))
+        body = body[:start] + text
+    return header + body
+
+
+def collapse_results(results: Dict, fetch_chunks: Callable[[List[str]], Dict],
+                     n_results: int) -> Dict:
+    """
+    Collapses chunk hits into one entry per parent pair, in rank order.
+
+    `fetch_chunks(parent_ids)` must return a Chroma get() style dict with
+    every chunk of those parents so the full pair can be rebuilt.
+    """
+    ids = results.get("ids", [[]])[0]
+    documents = results.get("documents", [[]])[0]
+    metadatas = results.get("metadatas", [[]])[0]
+    distances = (results.get("distances") or [[]])[0]
+
+    groups = []
+    by_key = {}
+    for i, doc in enumerate(documents):
+        meta = (metadatas[i] if i < len(metadatas) else None) or {}
+        key = meta.get("parent_id") or (ids[i] if i < len(ids) else f"hit-{i}")
+        if key in by_key:
+            continue
+        if len(groups) >= n_results:
+            break
+        by_key[key] = len(groups)
+        groups.append({
+            "id": key,
+            "document": doc,
+            "metadata": meta,
+            "distance": distances[i] if i < len(distances) else None,
+        })
+
+    parent_ids = [g["id"] for g in groups if "parent_id" in g["metadata"]]
+    if parent_ids:
+        fetched = fetch_chunks(parent_ids)
+        siblings = {}
+        for doc, meta in zip(fetched.get("documents", []), fetched.get("metadatas", [])):
+            siblings.setdefault(meta.get("parent_id"), []).append((doc, meta))
+        for group in groups:
+            parts = siblings.get(group["id"])
+            if not parts:
+                continue
+            docs, metas = zip(*parts)
+            group["document"] = merge_chunks(list(docs), list(metas))
+            group["metadata"] = {k: v for k, v in group["metadata"].items() if k not in CHUNK_FIELDS}
+
+    return {
+        "ids": [[g["id"] for g in groups]],
+        "documents": [[g["document"] for g in groups]],
+        "metadatas": [[g["metadata"] for g in groups]],
+        "distances": [[g["distance"] for g in groups]],
+    }
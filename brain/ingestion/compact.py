@@ -0,0 +1,202 @@
+"""
+Compacts a Brain collection by deleting empty, duplicate and near-duplicate memories.
+
+Scans the collection (and its partitions) page by page, then:
+  - drops memories whose document is blank,
+  - keeps one memory per exact content hash (whitespace-normalised),
+  - keeps one memory per group whose embeddings are within a cosine
+    similarity threshold of each other. Embeddings are compared page
+    against page, so only two pages of vectors are held at once.
+
+The newest memory (by metadata timestamp) of each group is kept. Chunks of
+long pairs (metadata parent_id) are left alone so parents can still be
+reassembled.
+
+    python3 ingestion/compact.py --dry-run
+    python3 ingestion/compact.py --threshold 0.98
+"""
+import argparse
+import hashlib
+import itertools
+import os
+import sys
+
+import numpy as np  # installed alongside chromadb
+
+# Add brain root path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from brain.lib import memory
+
+DEFAULT_THRESHOLD = 0.97
+
+
+def content_key(document):
+    normalised = " ".join(document.split())
+    return hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _unit_rows(vectors):
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def similar_pairs(pages, threshold):
+    """
+    Yields (id, id) pairs whose cosine similarity is at least `threshold`.
+
+    `pages()` returns a fresh iterator of (ids, vectors) blocks. Each block
+    is compared with itself and every block before it, so only two blocks
+    of embeddings are in memory at a time.
+    """
+    for index, (ids, vectors) in enumerate(pages()):
+        block = _unit_rows(vectors)
+        rows, cols = np.nonzero(np.triu(block @ block.T, k=1) >= threshold)
+        for r, c in zip(rows, cols):
+            yield ids[r], ids[c]
+        for earlier_ids, earlier_vectors in itertools.islice(pages(), index):
+            rows, cols = np.nonzero(block @ _unit_rows(earlier_vectors).T >= threshold)
+            for r, c in zip(rows, cols):
+                yield ids[r], earlier_ids[c]
+
+
+def find_near_duplicates(pairs, priority):
+    """
+    Greedy near-duplicate pass over similar (id, id) pairs.
+
+    Walking ids by `priority` (lower keeps first), every surviving id drops
+    its lower-priority neighbours. Returns the dropped ids in priority order.
+    """
+    neighbours = {}
+    for a, b in pairs:
+        neighbours.setdefault(a, []).append(b)
+        neighbours.setdefault(b, []).append(a)
+    removed = set()
+    for doc_id in sorted(neighbours, key=priority.__getitem__):
+        if doc_id in removed:
+            continue
+        removed.update(other for other in neighbours[doc_id] if priority[other] > priority[doc_id])
+    return sorted(removed, key=priority.__getitem__)
+
+
+def plan_compaction(client, collection_name=memory.DEFAULT_COLLECTION, threshold=DEFAULT_THRESHOLD,
+                    page_size=500):
+    """Scans the collection and returns (scanned, {reason: [ids]}) without deleting anything."""
+    entries = []
+    empty = []
+    scanned = 0
+    for _, page in memory.iter_pages(client, collection_name, page_size):
+        scanned += len(page["ids"])
+        for i, doc_id in enumerate(page["ids"]):
+            document = page["documents"][i] or ""
+            meta = page["metadatas"][i] or {}
+            if not document.strip():
+                empty.append(doc_id)
+            elif "parent_id" not in meta:
+                entries.append((str(meta.get("timestamp") or ""), doc_id, content_key(document)))
+
+    # Newest first, so the survivor of each group is the latest save
+    entries.sort(key=lambda e: e[0], reverse=True)
+
+    exact = []
+    seen = set()
+    priority = {}
+    for _, doc_id, key in entries:
+        if key in seen:
+            exact.append(doc_id)
+        else:
+            seen.add(key)
+            priority[doc_id] = len(priority)
+
+    near = []
+    if threshold and priority:
+        def pages():
+            for _, page in memory.iter_pages(client, collection_name, page_size, ("embeddings",)):
+                vectors = page.get("embeddings")
+                if vectors is None:
+                    continue
+                rows = [i for i, doc_id in enumerate(page["ids"]) if doc_id in priority and len(vectors[i])]
+                if rows:
+                    yield [page["ids"][i] for i in rows], [vectors[i] for i in rows]
+
+        near = find_near_duplicates(similar_pairs(pages, threshold), priority)
+
+    return scanned, {"empty": empty, "exact": exact, "near": near}
+
+
+def compact(client, collection_name=memory.DEFAULT_COLLECTION, threshold=DEFAULT_THRESHOLD,
+            page_size=500, dry_run=False, store_dir=None):
+    """
+    Deletes what plan_compaction() finds and returns a report. Store sizes
+    are only measured when `store_dir` (the embedded backend's data
+    directory) is given; an HTTP server's store is not visible from here.
+    """
+    before = sum(len(page["ids"]) for _, page in memory.iter_pages(client, collection_name, page_size, ()))
+    store_before = directory_size(store_dir) if store_dir else None
+
+    scanned, doomed = plan_compaction(client, collection_name, threshold, page_size)
+    ids = [doc_id for reason in ("empty", "exact", "near") for doc_id in doomed[reason]]
+    if ids and not dry_run:
+        memory.delete_memories(client, ids, collection_name, page_size)
+
+    after = before if dry_run else sum(
+        len(page["ids"]) for _, page in memory.iter_pages(client, collection_name, page_size, ())
+    )
+    return {
+        "scanned": scanned,
+        "empty": len(doomed["empty"]),
+        "exact_duplicates": len(doomed["exact"]),
+        "near_duplicates": len(doomed["near"]),
+        "reclaimed": len(ids) if not dry_run else 0,
+        "count_before": before,
+        "count_after": after,
+        "store_bytes_before": store_before,
+        "store_bytes_after": directory_size(store_dir) if store_dir else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete empty, duplicate and near-duplicate Brain memories.")
+    parser.add_argument("--collection", default=memory.DEFAULT_COLLECTION, help="Collection to compact")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Cosine similarity treated as a near duplicate (default: {DEFAULT_THRESHOLD}; "
+                             "0 disables the embedding pass)")
+    parser.add_argument("--page-size", type=int, default=500, help="Memories fetched/deleted per request")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be deleted")
+    parser.add_argument("--backend", choices=memory.BACKENDS, default=None,
+                        help="http (start_brain.sh server) or embedded; default: BRAIN_BACKEND or http")
+    args = parser.parse_args()
+
+    client = memory.get_client(backend=args.backend)
+    if not client:
+        print("Error: Could not connect to Hive Mind. Is start_brain.sh running?", file=sys.stderr)
+        sys.exit(1)
+
+    # Keep an existing BM25 index in step with the deletes
+    memory.enable_lexical_index_if_built()
+    store_dir = memory.DATA_DIR if (args.backend or memory.BACKEND) == "embedded" else None
+    report = compact(client, args.collection, args.threshold, args.page_size, args.dry_run, store_dir)
+
+    verb = "Would delete" if args.dry_run else "Deleted"
+    total = report["empty"] + report["exact_duplicates"] + report["near_duplicates"]
+    print(f"Scanned {report['scanned']} memories in '{args.collection}'.")
+    print(f"{verb} {total}: {report['empty']} empty, {report['exact_duplicates']} exact duplicates, "
+          f"{report['near_duplicates']} near duplicates (cosine >= {args.threshold}).")
+    if report["store_bytes_before"] is None:
+        store = "store size unavailable (the server's data directory is not local)"
+    else:
+        store = (f"store {report['store_bytes_before'] / 1e6:.1f} MB -> "
+                 f"{report['store_bytes_after'] / 1e6:.1f} MB")
+    print(f"✓ Collection size: {report['count_before']} -> {report['count_after']} memories; {store}")
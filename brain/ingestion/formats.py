@@ -0,0 +1,204 @@
+"""
+Streaming parsers for line-oriented chat logs.
+
+These formats are read line by line from the open file, so only the
+conversation being built is held in memory. parser.py registers them next
+to the JSON array exports and picks one with the sniffers below, which only
+see the first few KB of the file.
+"""
+import json
+import os
+import re
+from typing import Iterator, Optional, TextIO
+
+from brain.ingestion.model import Conversation, Message, Role, Timestamp
+
+_ROLE_ALIASES = {
+    "user": Role.USER,
+    "human": Role.USER,
+    "you": Role.USER,
+    "me": Role.USER,
+    "assistant": Role.ASSISTANT,
+    "ai": Role.ASSISTANT,
+    "model": Role.ASSISTANT,
+    "claude": Role.ASSISTANT,
+    "chatgpt": Role.ASSISTANT,
+    "gpt": Role.ASSISTANT,
+}
+
+_CONVERSATION_KEYS = ("conversation_id", "session_id", "sessionId", "conversation", "thread_id")
+_TIMESTAMP_KEYS = ("timestamp", "created_at", "create_time", "time")
+
+
+def _file_stem(stream: TextIO) -> str:
+    name = getattr(stream, "name", None)
+    if not isinstance(name, str):
+        return "stream"
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+def _file_mtime(stream: TextIO) -> Optional[float]:
+    name = getattr(stream, "name", None)
+    if isinstance(name, str) and os.path.exists(name):
+        return os.path.getmtime(name)
+    return None
+
+
+# --- JSONL chat logs -------------------------------------------------------
+
+def sniff_jsonl(head: str) -> bool:
+    lines = [line.strip() for line in head.splitlines() if line.strip()]
+    if not lines or not lines[0].startswith("{"):
+        return False
+    return any('"role"' in line or '"sender"' in line for line in lines[:10])
+
+
+def _message_text(content) -> str:
+    """Flattens string, block-list ({"type": "text", "text": ...}) or parts content."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, dict):
+        if "parts" in content:
+            return "".join(str(p) for p in content["parts"])
+        return content.get("text", "") if content.get("type", "text") == "text" else ""
+    if isinstance(content, list):
+        return "".join(_message_text(block) for block in content)
+    return ""
+
+
+def _timestamp(value) -> Timestamp:
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        # Millisecond epochs are common in JS-produced logs
+        return value / 1000.0 if value > 1e11 else float(value)
+    return str(value) or None
+
+
+def iter_jsonl(stream: TextIO) -> Iterator[Conversation]:
+    """
+    Streams conversations from a JSONL chat log with one message per line.
+
+    Lines are either flat ({"role", "content", "timestamp",
+    "conversation_id"}) or wrap the message ({"message": {"role",
+    "content"}, "timestamp", "sessionId"}). Consecutive lines with the same
+    conversation id form one conversation; lines without an id belong to a
+    conversation named after the file.
+    """
+    default_id = _file_stem(stream)
+    current = None
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            print(f"Warning: skipping malformed JSONL line {line_no}")
+            continue
+        if not isinstance(record, dict):
+            continue
+        message = record["message"] if isinstance(record.get("message"), dict) else record
+
+        conv_id = next((str(record[k]) for k in _CONVERSATION_KEYS if record.get(k)), default_id)
+        ts = _timestamp(next((record[k] for k in _TIMESTAMP_KEYS if record.get(k) is not None),
+                             next((message[k] for k in _TIMESTAMP_KEYS if message.get(k) is not None), None)))
+        if current is None or current.id != conv_id:
+            if current is not None and current.messages:
+                yield current
+            current = Conversation(conv_id, conv_id, ts, "jsonl")
+        if record.get("title"):
+            current.title = str(record["title"])
+
+        role = _ROLE_ALIASES.get(str(message.get("role") or message.get("sender") or "").lower())
+        if role is None:
+            # Skip tools, system, summaries, etc.
+            continue
+        text = _message_text(message.get("content", message.get("text", "")))
+        if not text.strip():
+            continue
+        current.messages.append(Message(role, text, ts))
+
+    if current is not None and current.messages:
+        yield current
+
+
+# --- Markdown transcripts --------------------------------------------------
+
+_SPEAKER = "user|human|you|me|assistant|ai|model|claude|chatgpt|gpt"
+# "## User", "### **Assistant**:"
+_HEADING_SPEAKER = re.compile(rf"^\s*#{{1,6}}\s*(?:\*\*)?({_SPEAKER})(?:\*\*)?\s*:?\s*$", re.IGNORECASE)
+# "**User:** text", "**Assistant**: text"
+_BOLD_SPEAKER = re.compile(rf"^\s*\*\*({_SPEAKER})\s*:?\s*\*\*\s*:?\s*(.*)$", re.IGNORECASE)
+# "User: text" (only unambiguous names, so prose starting with "You:" is left alone)
+_PLAIN_SPEAKER = re.compile(r"^(user|human|assistant|claude|chatgpt)\s*:\s*(.*)$", re.IGNORECASE)
+_TITLE = re.compile(r"^#\s+(.+?)\s*$")
+
+
+def _match_speaker(line: str):
+    """Returns (role, inline text) when the line starts a new turn."""
+    m = _HEADING_SPEAKER.match(line)
+    if m:
+        return _ROLE_ALIASES[m.group(1).lower()], ""
+    m = _BOLD_SPEAKER.match(line) or _PLAIN_SPEAKER.match(line)
+    if m:
+        return _ROLE_ALIASES[m.group(1).lower()], m.group(2)
+    return None
+
+
+def sniff_markdown(head: str) -> bool:
+    return any(_match_speaker(line) for line in head.splitlines())
+
+
+def iter_markdown(stream: TextIO) -> Iterator[Conversation]:
+    """
+    Streams conversations from a Markdown transcript.
+
+    A turn starts at a speaker heading ("## User"), a bold label
+    ("**Assistant:**") or a plain "User:" line and runs until the next one;
+    speaker-like lines inside ``` fences are left alone. Each "# Title"
+    heading starts a new conversation. Transcripts carry no per-message
+    times, so the file's mtime is used; ingest.py therefore rescans an
+    edited transcript in full instead of trusting conversation watermarks.
+    """
+    stem = _file_stem(stream)
+    mtime = _file_mtime(stream)
+    index = 0
+    current = Conversation(f"{stem}#{index}", stem, mtime, "markdown")
+    role = None
+    lines = []
+    in_fence = False
+
+    def flush():
+        text = "\n".join(lines).strip()
+        if role is not None and text:
+            current.messages.append(Message(role, text, mtime))
+        lines.clear()
+
+    for raw in stream:
+        line = raw.rstrip("\n")
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        elif not in_fence:
+            speaker = _match_speaker(line)
+            if speaker:
+                flush()
+                role, inline = speaker
+                if inline:
+                    lines.append(inline)
+                continue
+            title = _TITLE.match(line)
+            if title:
+                flush()
+                role = None
+                if current.messages:
+                    yield current
+                    index += 1
+                current = Conversation(f"{stem}#{index}", title.group(1), mtime, "markdown")
+                continue
+        if role is not None:
+            lines.append(line)
+
+    flush()
+    if current.messages:
+        yield current
@@ -1,6 +1,13 @@
 import argparse
+import glob
+import itertools
+import json
 import sys
 import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 # Add brain root to path to allow imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -8,46 +15,64 @@ brain_root = os.path.abspath(os.path.join(current_dir, "../.."))
 if brain_root not in sys.path:
     sys.path.insert(0, brain_root)
 
+from brain.ingestion import chunker
 from brain.ingestion.parser import ChatParser
 from brain.lib import memory
+from brain.lib.ingest_index import IngestIndex, Watermarks
 
-def ingest_file(file_path, project="generic", dry_run=False):
-    print(f"Reading {file_path}...")
-    parser = ChatParser()
-    try:
-        conversations = parser.parse_file(file_path)
-    except Exception as e:
-        print(f"Failed to parse file: {e}")
-        return
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_MAX_IN_FLIGHT = 4
+# File patterns picked up when a directory is passed
+EXPORT_PATTERNS = ("*.json", "*.jsonl")
+# Only with --markdown: export folders often hold READMEs and notes too
+MARKDOWN_PATTERNS = ("*.md",)
+# Sources without per-message times (the file mtime stands in): any edit would
+# move every conversation past its watermark, so they are always rescanned in
+# full and already-ingested pairs are skipped by ID instead
+UNTIMED_SOURCES = ("markdown",)
 
-    print(f"Found {len(conversations)} conversations. Connecting to Brain...")
-    
-    client = None
-    if not dry_run:
-        client = memory.get_client()
-        if not client:
-            print("Could not connect to Hive Mind. Aborting.")
-            return
 
-    total_memories = 0
+def iter_pairs(conversations, project="generic", watermarks=None):
+    """
+    Yields (memory_id, content, metadata) tuples for every User -> Assistant pair.
+
+    When `watermarks` ({conversation_id: timestamp}) is given, conversations
+    with no message newer than their watermark are skipped, only pairs
+    answered after it are yielded, and the dict is advanced in place.
+    """
+    # Compare against the watermarks as they were before this run, since a
+    # conversation can arrive in several pieces (e.g. interleaved JSONL logs)
+    baseline = dict(watermarks) if watermarks is not None else None
     for conv in conversations:
         title = conv['title']
         conv_id = conv['id']
         source = conv['source']
-        
+
         msgs = conv['messages']
+        since = None
+        if watermarks is not None and source not in UNTIMED_SOURCES:
+            since = baseline.get(conv_id)
+            latest = max((m['timestamp'] for m in msgs), default="")
+            if since and latest <= since:
+                continue
+            if latest > watermarks.get(conv_id, ""):
+                watermarks[conv_id] = latest
+
         # Simple pairing strategy: User -> Assistant
         for i in range(len(msgs) - 1):
             if msgs[i]['role'] == 'user' and msgs[i+1]['role'] == 'assistant':
+                # Keyed on the answer so a question answered after the last sync is kept
+                if since and msgs[i+1]['timestamp'] <= since:
+                    continue
                 q = msgs[i]['content']
                 a = msgs[i+1]['content']
-                
+
                 if len(q.strip()) < 5 or len(a.strip()) < 5:
                     continue
-                
+
                 # Content format: The "Memory" is the Q&A pair.
                 content = f"Context: {title}\nUser: {q}\nAssistant: {a}"
-                
+
                 metadata = {
                     "source": f"chat_export_{source}",
                     "project_context": project,
@@ -56,18 +81,390 @@ def ingest_file(file_path, project="generic", dry_run=False):
                     "timestamp": msgs[i]['timestamp'],
                     "type": "chat_pair"
                 }
-                
-                if not dry_run:
-                    memory.add_memory(client, content, metadata)
-                total_memories += 1
-                
-    print(f"Successfully ingested {total_memories} memory pairs from {len(conversations)} conversations.")
+                yield memory.memory_id(content, conv_id), content, metadata
+
+
+def sync_settings(project="generic", chunk_chars=None, chunk_overlap=0):
+    """Ingest settings a file's watermarks are only valid for."""
+    return {"project": project, "chunk_chars": chunk_chars, "chunk_overlap": chunk_overlap}
+
+
+def _settings_note(path, watermarks, settings):
+    if watermarks.settings_changed(path, settings):
+        print(f"{path} was last synced with other --project/--chunk-* settings; rescanning it in full "
+              f"(pairs already ingested are skipped unless --no-dedup).")
+
+
+def extract_memories(conversations, project="generic", chunk_chars=None, chunk_overlap=0, watermarks=None):
+    """Pairs conversations and, when a chunk budget is set, splits long pairs."""
+    pairs = iter_pairs(conversations, project, watermarks)
+    if chunk_chars:
+        return chunker.chunk_pairs(pairs, chunk_chars, chunk_overlap)
+    return pairs
+
+
+class _CountingIterator:
+    """Counts items as they stream past without materializing them."""
+
+    def __init__(self, iterable):
+        self._it = iter(iterable)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self._it)
+        self.count += 1
+        return item
+
+
+class BatchWriter:
+    """
+    Buffers memories and writes them in batches, keeping at most
+    `max_in_flight` batch inserts running against the server at once.
+    """
+
+    def __init__(self, client, batch_size=DEFAULT_BATCH_SIZE, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                 collection_name=memory.DEFAULT_COLLECTION, index=None, upsert=False):
+        self.client = client
+        self.index = index
+        self.upsert = upsert
+        self.batch_size = max(1, batch_size)
+        self.max_in_flight = max(1, max_in_flight)
+        self.collection_name = collection_name
+        # Resolve the collection once instead of per insert; partitioned
+        # stores route each batch through add_memory instead
+        self.collection = None if memory.partitioning_enabled() else memory.get_collection(client, collection_name)
+        self.written = 0
+        self._ids = []
+        self._docs = []
+        self._metas = []
+        self._in_flight = deque()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight)
+
+    def add(self, memory_id, content, metadata):
+        self._ids.append(memory_id)
+        self._docs.append(content)
+        self._metas.append(metadata)
+        if len(self._docs) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._docs:
+            return
+        ids, docs, metas = self._ids, self._docs, self._metas
+        self._ids, self._docs, self._metas = [], [], []
+
+        # Backpressure: wait for the oldest batch before queueing another
+        while len(self._in_flight) >= self.max_in_flight:
+            self._reap()
+
+        future = self._executor.submit(
+            memory.add_memory, self.client, docs, metas, collection_name=self.collection_name,
+            collection=self.collection, ids=ids, upsert=self.upsert
+        )
+        self._in_flight.append((future, ids))
+
+    def _reap(self):
+        future, ids = self._in_flight.popleft()
+        future.result()
+        self.written += len(ids)
+        if self.index is not None:
+            self.index.record(ids)
+
+    def close(self):
+        """Flushes remaining memories and waits for all in-flight batches."""
+        try:
+            self.flush()
+            while self._in_flight:
+                self._reap()
+        finally:
+            self._executor.shutdown(wait=True)
+
+
+def ingest_file(file_path, project="generic", dry_run=False, bulk=False,
+                batch_size=DEFAULT_BATCH_SIZE, max_in_flight=DEFAULT_MAX_IN_FLIGHT, dedup=True,
+                chunk_chars=None, chunk_overlap=0, backend=None, sync=True, parse_workers=None):
+    watermarks = Watermarks.for_collection() if sync else None
+    settings = sync_settings(project, chunk_chars, chunk_overlap)
+    if watermarks is not None:
+        if watermarks.unchanged(file_path, settings):
+            print(f"{file_path} is unchanged since the last sync. Nothing to do.")
+            return
+        _settings_note(file_path, watermarks, settings)
+    conv_marks = watermarks.conversations(file_path, settings) if watermarks is not None else None
+
+    print(f"Reading {file_path}...")
+    parser = ChatParser()
+    try:
+        conversations = parser.iter_file(file_path, workers=parse_workers)
+        # Pull the first conversation so format/IO errors surface before connecting
+        first = next(conversations, None)
+    except Exception as e:
+        print(f"Failed to parse file: {e}")
+        return
+
+    if first is None:
+        print("No conversations found.")
+        return
+    conversations = itertools.chain([first], conversations)
+
+    print("Streaming conversations. Connecting to Brain...")
+
+    client = None
+    if not dry_run:
+        client = memory.get_client(backend=backend)
+        if not client:
+            print("Could not connect to Hive Mind. Aborting.")
+            return
+
+    # Without dedup every pair is upserted, so memories already stored are rewritten
+    index = IngestIndex.for_collection() if dedup else None
+    # Pairs repeated within this run (same conversation in several exports) are
+    # always dropped: one batch cannot hold the same ID twice
+    seen = set()
+
+    writer = None
+    if bulk and not dry_run:
+        writer = BatchWriter(client, batch_size=batch_size, max_in_flight=max_in_flight, index=index,
+                             upsert=not dedup)
+
+    started = time.perf_counter()
+    total_memories = 0
+    skipped = 0
+    counted = _CountingIterator(conversations)
+    try:
+        for mem_id, content, metadata in extract_memories(counted, project, chunk_chars, chunk_overlap,
+                                                          conv_marks):
+            if mem_id in seen or (index is not None and mem_id in index):
+                skipped += 1
+                continue
+            seen.add(mem_id)
+            if writer:
+                writer.add(mem_id, content, metadata)
+            elif not dry_run:
+                memory.add_memory(client, content, metadata, ids=mem_id, upsert=not dedup)
+                if index is not None:
+                    index.record([mem_id])
+            total_memories += 1
+    finally:
+        if writer:
+            writer.close()
+    elapsed = time.perf_counter() - started
+    # Only advanced once every pair up to the new watermarks is written
+    if watermarks is not None and not dry_run:
+        watermarks.update(file_path, conv_marks, settings)
+        watermarks.save()
+
+    print(f"Successfully ingested {total_memories} memories from {counted.count} conversations.")
+    if skipped:
+        print(f"Skipped {skipped} duplicate or already-ingested pairs.")
+    if bulk:
+        rate = total_memories / elapsed if elapsed > 0 else 0.0
+        print(f"Throughput: {rate:.1f} pairs/sec ({elapsed:.2f}s, batch size {batch_size}, "
+              f"{max_in_flight} in flight)")
+
+def expand_inputs(inputs, markdown=False):
+    """
+    Expands files, directories and glob patterns into a sorted list of export
+    files. Directories contribute Markdown transcripts only with `markdown`.
+    """
+    patterns = EXPORT_PATTERNS + (MARKDOWN_PATTERNS if markdown else ())
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for pattern in patterns:
+                files.extend(glob.glob(os.path.join(item, pattern)))
+        elif os.path.exists(item):
+            files.append(item)
+        else:
+            files.extend(glob.glob(item))
+    # De-duplicate while keeping a stable order
+    return sorted({os.path.abspath(f) for f in files if os.path.isfile(f)})
+
+
+def _extract_file(file_path, project, chunk_chars=None, chunk_overlap=0, watermarks=None, spool_dir=None):
+    """
+    Worker: streams one export's memories into a JSONL spool file and returns
+    its path plus the advanced watermarks (runs in a child process). Pairs
+    never pile up in memory here or in the writer, whatever the file size.
+    """
+    started = time.perf_counter()
+    parser = ChatParser()
+    counted = _CountingIterator(parser.iter_file(file_path))
+    fd, spool = tempfile.mkstemp(suffix=".jsonl", dir=spool_dir)
+    try:
+        with open(fd, "w", encoding="utf-8") as f:
+            for pair in extract_memories(counted, project, chunk_chars, chunk_overlap, watermarks):
+                f.write(json.dumps(pair) + "\n")
+    except BaseException:
+        os.remove(spool)
+        raise
+    return spool, counted.count, time.perf_counter() - started, watermarks
+
+
+def _read_spool(spool):
+    """Yields the (memory_id, content, metadata) pairs of a spool file, then deletes it."""
+    try:
+        with open(spool, "r", encoding="utf-8") as f:
+            for line in f:
+                yield tuple(json.loads(line))
+    finally:
+        os.remove(spool)
+
+
+def ingest_files(file_paths, project="generic", dry_run=False, batch_size=DEFAULT_BATCH_SIZE,
+                 max_in_flight=DEFAULT_MAX_IN_FLIGHT, dedup=True, workers=None,
+                 chunk_chars=None, chunk_overlap=0, backend=None, sync=True):
+    """
+    Parses many exports in a process pool while this process acts as the
+    single writer, batching every file's pairs into the brain.
+    """
+    watermarks = Watermarks.for_collection() if sync else None
+    settings = sync_settings(project, chunk_chars, chunk_overlap)
+    if watermarks is not None:
+        unchanged = [path for path in file_paths if watermarks.unchanged(path, settings)]
+        if unchanged:
+            print(f"Skipping {len(unchanged)} files unchanged since the last sync.")
+            file_paths = [path for path in file_paths if path not in unchanged]
+        if not file_paths:
+            return
+        for path in file_paths:
+            _settings_note(path, watermarks, settings)
+    total_files = len(file_paths)
+    print(f"Ingesting {total_files} files with {workers or os.cpu_count()} workers...")
+
+    client = None
+    if not dry_run:
+        client = memory.get_client(backend=backend)
+        if not client:
+            print("Could not connect to Hive Mind. Aborting.")
+            return
+
+    index = IngestIndex.for_collection() if dedup else None
+    # Dropped even without dedup: one batch cannot hold the same ID twice
+    seen = set()
+    writer = None
+    if not dry_run:
+        writer = BatchWriter(client, batch_size=batch_size, max_in_flight=max_in_flight, index=index,
+                             upsert=not dedup)
+
+    started = time.perf_counter()
+    total_memories = 0
+    total_conversations = 0
+    skipped = 0
+    failed = 0
+    synced = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix="brain-ingest-") as spool_dir, \
+                ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_extract_file, path, project, chunk_chars, chunk_overlap,
+                            watermarks.conversations(path, settings) if watermarks is not None else None,
+                            spool_dir): path
+                for path in file_paths
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                path = futures[future]
+                name = os.path.basename(path)
+                try:
+                    spool, conversations, parse_secs, synced[path] = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"[{done}/{total_files}] {name}: failed to parse: {e}")
+                    continue
+
+                new_pairs = 0
+                for mem_id, content, metadata in _read_spool(spool):
+                    if mem_id in seen or (index is not None and mem_id in index):
+                        skipped += 1
+                        continue
+                    seen.add(mem_id)
+                    if writer:
+                        writer.add(mem_id, content, metadata)
+                    new_pairs += 1
+                total_memories += new_pairs
+                total_conversations += conversations
+                print(f"[{done}/{total_files}] {name}: {new_pairs} new memories from "
+                      f"{conversations} conversations (parsed in {parse_secs:.2f}s)")
+    finally:
+        if writer:
+            writer.close()
+    elapsed = time.perf_counter() - started
+    if watermarks is not None and not dry_run:
+        for path, conv_marks in synced.items():
+            watermarks.update(path, conv_marks, settings)
+        watermarks.save()
+
+    print(f"Successfully ingested {total_memories} memories from {total_conversations} conversations "
+          f"across {total_files - failed} files.")
+    if skipped:
+        print(f"Skipped {skipped} duplicate or already-ingested pairs.")
+    if failed:
+        print(f"{failed} files failed to parse.")
+    rate = total_memories / elapsed if elapsed > 0 else 0.0
+    print(f"Throughput: {rate:.1f} pairs/sec ({elapsed:.2f}s, batch size {batch_size}, "
+          f"{max_in_flight} in flight)")
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Ingest chat logs into the Hive Mind.")
-    parser.add_argument("file", help="Path to JSON chat export")
+    parser.add_argument("file", nargs="+", help="JSON chat export(s), directories or glob patterns")
     parser.add_argument("--project", default="generic", help="Project context tag")
     parser.add_argument("--dry-run", action="store_true", help="Parse but do not insert")
-    
+    parser.add_argument("--bulk", action="store_true", help="Batch inserts and pipeline them to the server")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Pairs per insert in --bulk mode (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help=f"Concurrent batch inserts in --bulk mode (default: {DEFAULT_MAX_IN_FLIGHT})")
+    parser.add_argument("--no-dedup", dest="dedup", action="store_false",
+                        help="Ignore the local ingest index and upsert every pair, rewriting stored ones")
+    parser.add_argument("--full", dest="sync", action="store_false",
+                        help="Ignore sync watermarks and rescan every conversation")
+    parser.add_argument("--markdown", action="store_true",
+                        help="Also read *.md transcripts from directories (named .md files are always read)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Parser processes when ingesting several files (default: CPU count)")
+    parser.add_argument("--parse-workers", type=int, default=None,
+                        help="Split a single large JSON export into byte ranges parsed by N processes")
+    parser.add_argument("--backend", choices=memory.BACKENDS, default=None,
+                        help="http (start_brain.sh server) or embedded (open brain/data in-process); "
+                             "default: BRAIN_BACKEND or http")
+    parser.add_argument("--chunk-tokens", type=int, default=None,
+                        help=f"Split pairs longer than N tokens (~{chunker.CHARS_PER_TOKEN} chars each) "
+                             f"into overlapping chunks (e.g. {chunker.DEFAULT_CHUNK_TOKENS})")
+    parser.add_argument("--chunk-chars", type=int, default=None,
+                        help="Split pairs longer than N characters into overlapping chunks")
+    parser.add_argument("--chunk-overlap", type=int, default=None,
+                        help=f"Overlap between chunks, in the same unit as the budget "
+                             f"(default: {chunker.DEFAULT_OVERLAP_TOKENS} tokens)")
+
     args = parser.parse_args()
-    ingest_file(args.file, args.project, args.dry_run)
+    # Once the BM25 index exists, keep it in step with what is ingested
+    memory.enable_lexical_index_if_built()
+    chunk_chars = None
+    chunk_overlap = 0
+    if args.chunk_tokens and args.chunk_chars:
+        parser.error("use either --chunk-tokens or --chunk-chars, not both")
+    if args.chunk_tokens:
+        chunk_chars = args.chunk_tokens * chunker.CHARS_PER_TOKEN
+        overlap = args.chunk_overlap if args.chunk_overlap is not None else chunker.DEFAULT_OVERLAP_TOKENS
+        chunk_overlap = overlap * chunker.CHARS_PER_TOKEN
+    elif args.chunk_chars:
+        chunk_chars = args.chunk_chars
+        chunk_overlap = (args.chunk_overlap if args.chunk_overlap is not None
+                         else chunker.DEFAULT_OVERLAP_TOKENS * chunker.CHARS_PER_TOKEN)
+
+    files = expand_inputs(args.file, markdown=args.markdown)
+    if not files:
+        print("No export files found.")
+        sys.exit(1)
+
+    # A single plain file keeps the streaming path; several files fan out to a process pool
+    if len(args.file) == 1 and os.path.isfile(args.file[0]):
+        ingest_file(files[0], args.project, args.dry_run, args.bulk, args.batch_size, args.max_in_flight,
+                    args.dedup, chunk_chars, chunk_overlap, args.backend, args.sync, args.parse_workers)
+    else:
+        ingest_files(files, args.project, args.dry_run, args.batch_size, args.max_in_flight,
+                     args.dedup, args.workers, chunk_chars, chunk_overlap, args.backend, args.sync)
@@ -8,13 +8,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.
 
 from brain.lib import memory
 
-def ingest_text(content, title, tags, project, memory_type):
-    client = memory.get_client()
-    if not client:
-        print("Error: Could not connect to Hive Mind. Is start_brain.sh running?", file=sys.stderr)
-        sys.exit(1)
-
-    metadata = {
+def build_metadata(title, tags, project, memory_type):
+    return {
         "source": "cli_ingest",
         "project_context": project,
         "type": memory_type,
@@ -22,7 +17,15 @@ def ingest_text(content, title, tags, project, memory_type):
         "conversation_title": title,
         "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
     }
-    
+
+def ingest_text(content, title, tags, project, memory_type):
+    client = memory.get_client()
+    if not client:
+        print("Error: Could not connect to Hive Mind. Is start_brain.sh running?", file=sys.stderr)
+        sys.exit(1)
+
+    metadata = build_metadata(title, tags, project, memory_type)
+
     try:
         memory.add_memory(client, content, metadata)
         print(f"✓ Saved to Brain: '{title}' ({project})")
@@ -39,6 +42,8 @@ if __name__ == "__main__":
     parser.add_argument("--type", default="artifact", dest="memory_type", help="Type of memory")
 
     args = parser.parse_args()
+    # Once the BM25 index exists, keep it in step with what is ingested
+    memory.enable_lexical_index_if_built()
 
     content = args.content
     if not content:
@@ -0,0 +1,124 @@
+"""
+Compact records for parsed conversations.
+
+ChatParser.iter_file streams Conversation and Message objects instead of
+one dict per message. Both use __slots__, roles are shared enum members,
+and epoch timestamps stay floats until a caller asks for the ISO string.
+Both classes are read-only Mappings with the original dict keys, so reads
+written against the dicts (conv["messages"], msg["role"] == "user") still
+work; assigning keys or json.dumps() needs to_dict(). ChatParser.parse_file
+still returns plain dicts.
+"""
+import datetime
+import enum
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Union
+
+Timestamp = Union[float, str, None]
+
+
+class Role(str, enum.Enum):
+    USER = "user"
+    ASSISTANT = "assistant"
+
+    def __str__(self):
+        return self.value
+
+
+def ts_to_iso(ts: Timestamp) -> str:
+    """Renders an epoch float as UTC ISO 8601; strings pass through."""
+    if isinstance(ts, str):
+        return ts
+    if not ts:
+        return ""
+    return datetime.datetime.fromtimestamp(ts, tz=datetime.timezone.utc).isoformat()
+
+
+class _Record(Mapping):
+    """Dict-compatible view over a slotted record."""
+
+    __slots__ = ()
+    _KEYS = ()
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, "_get_" + key)()
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class Message(_Record):
+    # `ts` is an epoch float (ChatGPT) or the export's own ISO string (Claude)
+    __slots__ = ("role", "content", "ts")
+    _KEYS = ("role", "content", "timestamp")
+
+    def __init__(self, role: Role, content: str, ts: Timestamp):
+        self.role = role
+        self.content = content
+        self.ts = ts
+
+    @property
+    def timestamp(self) -> str:
+        return ts_to_iso(self.ts)
+
+    def _get_role(self):
+        return self.role
+
+    def _get_content(self):
+        return self.content
+
+    def _get_timestamp(self):
+        return self.timestamp
+
+    def to_dict(self) -> Dict:
+        return {"role": self.role.value, "content": self.content, "timestamp": self.timestamp}
+
+
+class Conversation(_Record):
+    __slots__ = ("id", "title", "created", "messages", "source")
+    _KEYS = ("id", "title", "created_at", "messages", "source")
+
+    def __init__(self, id: Optional[str], title: str, created: Timestamp, source: str,
+                 messages: Optional[List[Message]] = None):
+        self.id = id
+        self.title = title
+        self.created = created
+        self.source = source
+        self.messages = messages if messages is not None else []
+
+    @property
+    def created_at(self) -> str:
+        return ts_to_iso(self.created)
+
+    def _get_id(self):
+        return self.id
+
+    def _get_title(self):
+        return self.title
+
+    def _get_created_at(self):
+        return self.created_at
+
+    def _get_messages(self):
+        return self.messages
+
+    def _get_source(self):
+        return self.source
+
+    def to_dict(self) -> Dict:
+        """The plain-dict form ChatParser used to return."""
+        return {
+            "id": self.id,
+            "title": self.title,
+            "created_at": self.created_at,
+            "messages": [m.to_dict() for m in self.messages],
+            "source": self.source,
+        }
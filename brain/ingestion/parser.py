@@ -1,25 +1,339 @@
 import json
-import datetime
-from typing import List, Dict, Any, Optional
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Callable, Optional, Iterator, TextIO
+
+from brain.ingestion import formats
+from brain.ingestion.model import Conversation, Message, Role, ts_to_iso
+
+# Characters read per refill when streaming a top-level JSON array
+STREAM_CHUNK_SIZE = 1 << 20
+# Characters stream-format sniffers get to look at
+SNIFF_CHARS = 4096
+# Target bytes per shard when parsing one array export in parallel; bounds
+# how much each worker holds at once
+PARALLEL_SHARD_BYTES = 32 << 20
+# Bytes scanned past a split point when looking for the next element
+BOUNDARY_WINDOW = 1 << 20
+_WHITESPACE = " \t\r\n"
+
+
+def iter_json_array(stream: TextIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yields the elements of a top-level JSON array one at a time.
+
+    Only the element currently being decoded is held in memory, so peak
+    usage is bounded by the largest single element rather than the file.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def read_more(size):
+        nonlocal buf, pos, eof
+        chunk = stream.read(size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def skip(chars):
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            read_more(chunk_size)
+
+    skip(_WHITESPACE)
+    if pos >= len(buf) or buf[pos] != "[":
+        raise ValueError("Expected a top-level JSON array")
+    pos += 1
+
+    read_size = chunk_size
+    while True:
+        skip(_WHITESPACE + ",")
+        if pos >= len(buf):
+            raise ValueError("Unterminated JSON array")
+        if buf[pos] == "]":
+            return
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # Element spans the buffer boundary; grow reads so huge
+            # elements are not re-decoded once per chunk
+            read_more(read_size)
+            read_size *= 2
+            continue
+        if end == len(buf) and not eof:
+            # A bare scalar could be truncated at the boundary
+            read_more(read_size)
+            continue
+        yield value
+        pos = end
+        read_size = chunk_size
+
+
+def _skip_separators(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in _WHITESPACE + ",":
+        pos += 1
+    return pos
+
+
+# A top-level element starts right after "[" or "," (multi-byte UTF-8 never
+# contains ASCII bytes, so byte matches are real characters)
+_ELEMENT_START = re.compile(rb"[\[,]\s*(\{)")
+
+
+def _decode_object_at(f, offset: int) -> Optional[Any]:
+    """
+    Decodes the JSON object starting at byte `offset`, or returns None when
+    no valid object starts there (e.g. a "{" inside a string).
+    """
+    decoder = json.JSONDecoder()
+    f.seek(offset)
+    raw = b""
+    read_size = BOUNDARY_WINDOW
+    while True:
+        chunk = f.read(read_size)
+        raw += chunk
+        text = raw.decode("utf-8", errors="ignore")
+        try:
+            value, end = decoder.raw_decode(text)
+        except json.JSONDecodeError as e:
+            truncated = e.msg.startswith("Unterminated") or e.pos >= len(text) - 1
+            if truncated and chunk:
+                read_size *= 2
+                continue
+            return None
+        # A top-level element is followed by "," or the closing "]"
+        rest = text[end:].lstrip(_WHITESPACE)
+        if rest and rest[0] not in ",]":
+            return None
+        return value
+
+
+def find_element_boundaries(file_path: str, sniff_element: Callable[[Any], bool], shards: int) -> List[int]:
+    """
+    Splits a top-level JSON array file into roughly equal byte ranges that
+    each start at an element.
+
+    Near every split point, "{" characters that follow "[" or "," are
+    candidates. A candidate is accepted once it decodes to an object that
+    the format's sniffer recognises; nested objects and "{" inside strings
+    fail that check.
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as f:
+        head = f.read(BOUNDARY_WINDOW)
+        start = head.find(b"[")
+        if start < 0:
+            raise ValueError("Expected a top-level JSON array")
+        boundaries = [start + 1]
+        for k in range(1, shards):
+            split = max(size * k // shards, boundaries[-1] + 1)
+            while split < size:
+                f.seek(split - 1)
+                window = f.read(BOUNDARY_WINDOW)
+                found = None
+                for m in _ELEMENT_START.finditer(window):
+                    candidate = split - 1 + m.start(1)
+                    value = _decode_object_at(f, candidate)
+                    if value is not None and sniff_element(value):
+                        found = candidate
+                        break
+                if found is not None:
+                    if found > boundaries[-1]:
+                        boundaries.append(found)
+                    break
+                split += len(window) - 1
+                if len(window) < 2:
+                    break
+    return boundaries + [size]
+
+
+def _parse_shard(file_path: str, start: int, end: int, format_type: str) -> List[Conversation]:
+    """Worker: parses every element whose first byte lies in [start, end)."""
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    parse = get_format(format_type).parse_element
+    decoder = json.JSONDecoder()
+    conversations = []
+    pos = _skip_separators(text, 0)
+    while pos < len(text) and text[pos] != "]":
+        value, pos = decoder.raw_decode(text, pos)
+        conversations.append(parse(value))
+        pos = _skip_separators(text, pos)
+    return conversations
+
+
+_ROLES = {"user": Role.USER, "assistant": Role.ASSISTANT}
+
+
+def parse_chatgpt_conversation(conv: Dict) -> Conversation:
+    # Epoch floats are kept as-is; the ISO form is rendered on access
+    standard_conv = Conversation(conv.get("id"), conv.get("title", "Untitled"),
+                                 conv.get("create_time") or None, "chatgpt")
+
+    mapping = conv.get("mapping", {})
+    current_node_id = conv.get("current_node")
+
+    if not current_node_id:
+        print(f"Warning: Conversation {conv.get('id')} has no 'current_node'. Skipping.")
+        return standard_conv
+
+    # Standard export always has current_node.
+
+    # Traverse backwards from current_node to root
+    messages = []
+    while current_node_id:
+        node = mapping.get(current_node_id)
+        if not node:
+            break
+
+        message = node.get("message")
+        if message:
+            role = message.get("author", {}).get("role")
+            if role in _ROLES:
+                content_obj = message.get("content", {})
+                if content_obj.get("content_type") == "text":
+                    parts = content_obj.get("parts", [])
+                    text = "".join([str(p) for p in parts])
+                    ts = message.get("create_time")
+                    if ts and text.strip():
+                        messages.append(Message(_ROLES[role], text, ts))
+
+        current_node_id = node.get("parent")
+
+    # Reverse in place to get chronological order
+    messages.reverse()
+    standard_conv.messages = messages
+    return standard_conv
+
+
+def parse_claude_conversation(conv: Dict) -> Conversation:
+    standard_conv = Conversation(conv.get("uuid"), conv.get("name", "Untitled"),
+                                 conv.get("created_at"), "claude")
+    messages = standard_conv.messages
+
+    for msg in conv.get("chat_messages", []):
+        sender = msg.get("sender")
+        if sender == "human":
+            role = Role.USER
+        elif sender == "assistant":
+            role = Role.ASSISTANT
+        else:
+            # Skip tools, system, etc.
+            continue
+
+        ts = msg.get("created_at")
+        content = msg.get("text", "")
+
+        if not ts or not content.strip():
+            continue
+
+        messages.append(Message(role, content, ts))
+
+    # Sort by timestamp (ISO 8601 strings sort correctly lexicographically)
+    messages.sort(key=lambda m: m.ts)
+    return standard_conv
+
+
+class ChatFormat:
+    """
+    A registered export format.
+
+    Array formats are top-level JSON arrays: they are recognised from their
+    first element and `parse_element` turns one element into a Conversation.
+    Stream formats are recognised from the first characters of the file and
+    `iter_stream` reads conversations from the open text stream itself.
+    """
+
+    def __init__(self, name: str, parse_element: Callable[[Any], Conversation] = None,
+                 sniff_element: Callable[[Any], bool] = None,
+                 iter_stream: Callable[[TextIO], Iterator[Conversation]] = None,
+                 sniff_head: Callable[[str], bool] = None):
+        if (parse_element is None) == (iter_stream is None):
+            raise ValueError(f"Format {name} needs exactly one of parse_element or iter_stream")
+        self.name = name
+        self.parse_element = parse_element
+        self.sniff_element = sniff_element
+        self.iter_stream = iter_stream
+        self.sniff_head = sniff_head
+
+    @property
+    def is_array(self) -> bool:
+        return self.parse_element is not None
+
+
+# Registered formats by name, in sniffing order
+FORMATS: Dict[str, ChatFormat] = {}
+
+
+def register_format(chat_format: ChatFormat) -> ChatFormat:
+    FORMATS[chat_format.name] = chat_format
+    return chat_format
+
+
+def get_format(format_type: str) -> ChatFormat:
+    try:
+        return FORMATS[format_type]
+    except KeyError:
+        raise ValueError(f"Unsupported or unknown format: {format_type}") from None
+
+
+register_format(ChatFormat(
+    "chatgpt", parse_element=parse_chatgpt_conversation,
+    sniff_element=lambda e: isinstance(e, dict) and 'mapping' in e and 'create_time' in e,
+))
+register_format(ChatFormat(
+    "claude", parse_element=parse_claude_conversation,
+    sniff_element=lambda e: isinstance(e, dict) and 'uuid' in e and 'chat_messages' in e,
+))
+register_format(ChatFormat("jsonl", iter_stream=formats.iter_jsonl, sniff_head=formats.sniff_jsonl))
+register_format(ChatFormat("markdown", iter_stream=formats.iter_markdown, sniff_head=formats.sniff_markdown))
+
 
 class ChatParser:
     def __init__(self):
         pass
 
     def detect_format(self, data: Any) -> str:
-        """Attempts to guess the format of the chat export."""
+        """
+        Attempts to guess the format of a JSON array chat export.
+
+        Accepts either the full top-level list or just its first element,
+        so streaming callers can detect the format without loading the file.
+        """
+        sample = data
         if isinstance(data, list):
-            if len(data) > 0 and 'mapping' in data[0] and 'create_time' in data[0]:
-                return 'chatgpt'
-            if len(data) > 0 and 'uuid' in data[0] and 'chat_messages' in data[0]:
-                return 'claude'
-        # Add more heuristics as needed
+            if len(data) == 0:
+                return 'unknown'
+            sample = data[0]
+        for chat_format in FORMATS.values():
+            if chat_format.is_array and chat_format.sniff_element and chat_format.sniff_element(sample):
+                return chat_format.name
         return 'unknown'
 
-    def parse_file(self, file_path: str, format_type: str = None) -> List[Dict]:
+    def detect_head(self, head: str) -> str:
+        """Guesses a stream format from the first characters of a file."""
+        for chat_format in FORMATS.values():
+            if not chat_format.is_array and chat_format.sniff_head and chat_format.sniff_head(head):
+                return chat_format.name
+        return 'unknown'
+
+    def parse_file(self, file_path: str, format_type: str = None, workers: int = None) -> List[Dict]:
         """
-        Parses a file and returns a list of standardized conversation objects.
-        Standard format:
+        Parses a file and returns a list of standardized conversation dicts
+        (mutable and JSON-serializable; iter_file streams the compact,
+        read-only records from model.py instead):
         {
             "id": "conv_id",
             "title": "Conversation Title",
@@ -30,111 +344,86 @@ class ChatParser:
             "source": "format_type"
         }
         """
+        return [conv.to_dict() if isinstance(conv, Conversation) else conv
+                for conv in self.iter_file(file_path, format_type, workers)]
+
+    def iter_file(self, file_path: str, format_type: str = None, workers: int = None) -> Iterator[Conversation]:
+        """
+        Streams standardized conversations from a file one at a time.
+
+        JSON arrays are detected from their first element; other formats
+        from the first SNIFF_CHARS characters. With workers > 1, JSON array
+        exports are split into byte ranges parsed in a process pool and
+        yielded in file order.
+        """
         with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+            chat_format = get_format(format_type) if format_type else None
+            if chat_format is None:
+                head = f.read(SNIFF_CHARS)
+                f.seek(0)
+                if not head.lstrip().startswith("["):
+                    format_type = self.detect_head(head)
+                    print(f"Detected format: {format_type}")
+                    chat_format = get_format(format_type)
 
-        if not format_type:
-            format_type = self.detect_format(data)
-            print(f"Detected format: {format_type}")
+            if chat_format is not None and not chat_format.is_array:
+                yield from chat_format.iter_stream(f)
+                return
 
-        if format_type == 'chatgpt':
-            return self._parse_chatgpt(data)
-        elif format_type == 'claude':
-            return self._parse_claude(data)
-        else:
-            raise ValueError(f"Unsupported or unknown format: {format_type}")
-
-    def _parse_chatgpt(self, data: List[Dict]) -> List[Dict]:
-        conversations = []
-        for conv in data:
-            standard_conv = {
-                "id": conv.get("id"),
-                "title": conv.get("title", "Untitled"),
-                "created_at": self._ts_to_iso(conv.get("create_time")),
-                "messages": [],
-                "source": "chatgpt"
-            }
-
-            mapping = conv.get("mapping", {})
-            current_node_id = conv.get("current_node")
-            
-            if not current_node_id:
-                print(f"Warning: Conversation {conv.get('id')} has no 'current_node'. Skipping.")
-                conversations.append(standard_conv)
-                continue
-            
-            # Standard export always has current_node.
-            
-            # Traverse backwards from current_node to root
-            messages = []
-            while current_node_id:
-                node = mapping.get(current_node_id)
-                if not node:
-                    break
-                
-                message = node.get("message")
-                if message:
-                    role = message.get("author", {}).get("role")
-                    if role in ("user", "assistant"):
-                        content_obj = message.get("content", {})
-                        if content_obj.get("content_type") == "text":
-                            parts = content_obj.get("parts", [])
-                            text = "".join([str(p) for p in parts])
-                            ts = message.get("create_time")
-                            if ts and text.strip():
-                                messages.append({
-                                    "role": role,
-                                    "content": text,
-                                    "timestamp": self._ts_to_iso(ts)
-                                })
-                
-                current_node_id = node.get("parent")
-            
-            # Reverse to get chronological order
-            standard_conv["messages"] = messages[::-1]
-            conversations.append(standard_conv)
-        return conversations
-
-    def _parse_claude(self, data: List[Dict]) -> List[Dict]:
-        conversations = []
-        for conv in data:
-            standard_conv = {
-                "id": conv.get("uuid"),
-                "title": conv.get("name", "Untitled"),
-                "created_at": conv.get("created_at"),
-                "messages": [],
-                "source": "claude"
-            }
-
-            for msg in conv.get("chat_messages", []):
-                sender = msg.get("sender")
-                if sender == "human":
-                    role = "user"
-                elif sender == "assistant":
-                    role = "assistant"
-                else:
-                    # Skip tools, system, etc.
-                    continue
-                
-                ts = msg.get("created_at")
-                content = msg.get("text", "")
-                
-                if not ts or not content.strip():
-                    continue
-                    
-                standard_conv["messages"].append({
-                    "role": role,
-                    "content": content,
-                    "timestamp": ts
-                })
-            
-            # Sort by timestamp (ISO 8601 strings sort correctly lexicographically)
-            standard_conv["messages"].sort(key=lambda x: x["timestamp"])
-            conversations.append(standard_conv)
-        return conversations
+            elements = iter_json_array(f)
+            first = next(elements, None)
+            if first is None:
+                return
+
+            if chat_format is None:
+                format_type = self.detect_format(first)
+                print(f"Detected format: {format_type}")
+                chat_format = get_format(format_type)
+
+            if workers and workers > 1:
+                f.close()
+                yield from self._iter_parallel(file_path, chat_format, workers)
+                return
+
+            parse_conversation = chat_format.parse_element
+            yield parse_conversation(first)
+            for raw in elements:
+                yield parse_conversation(raw)
+
+    def _iter_parallel(self, file_path: str, chat_format: ChatFormat, workers: int) -> Iterator[Conversation]:
+        size = os.path.getsize(file_path)
+        shards = max(workers, -(-size // PARALLEL_SHARD_BYTES))
+        boundaries = find_element_boundaries(file_path, chat_format.sniff_element, shards)
+        ranges = list(zip(boundaries, boundaries[1:]))
+
+        # Keep a bounded window of shards in flight so results are yielded in
+        # order without buffering the whole file
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for start, end in ranges:
+                pending.append(pool.submit(_parse_shard, file_path, start, end, chat_format.name))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def _conversation_parser(self, format_type: str):
+        chat_format = get_format(format_type)
+        if not chat_format.is_array:
+            raise ValueError(f"{format_type} is not a JSON array format")
+        return chat_format.parse_element
+
+    def _parse_chatgpt(self, data: List[Dict]) -> List[Conversation]:
+        return [parse_chatgpt_conversation(conv) for conv in data]
+
+    def _parse_chatgpt_conversation(self, conv: Dict) -> Conversation:
+        return parse_chatgpt_conversation(conv)
+
+    def _parse_claude(self, data: List[Dict]) -> List[Conversation]:
+        return [parse_claude_conversation(conv) for conv in data]
+
+    def _parse_claude_conversation(self, conv: Dict) -> Conversation:
+        return parse_claude_conversation(conv)
 
     def _ts_to_iso(self, ts: Optional[float]) -> str:
-        if not ts:
-            return ""
-        # Ensure UTC
-        return datetime.datetime.fromtimestamp(ts, tz=datetime.timezone.utc).isoformat()
+        return ts_to_iso(ts)
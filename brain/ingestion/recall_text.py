@@ -1,38 +1,164 @@
 import argparse
+import itertools
+import json
 import sys
 import os
 
 # Add brain root path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
+from brain.ingestion import chunker
 from brain.lib import memory
+from brain.lib.formatting import format_results
 
-def recall_text(query, n_results, where):
+# Over-fetch when collapsing so several chunks of one pair don't crowd out others
+COLLAPSE_OVERFETCH = 3
+# Input lines sent per batched query in --batch mode; results stream out after each block
+BATCH_BLOCK_SIZE = 32
+
+def enable_keyword_search(client):
+    """Opens the BM25 index for keyword/hybrid recall, warning when it lags the store."""
+    memory.enable_lexical_index()
+    indexed, stored = memory.lexical_index_counts(client)
+    if indexed != stored:
+        print(f"Warning: the keyword index covers {indexed} of {stored} memories; "
+              f"run ingestion/build_lexical_index.py to rebuild it.", file=sys.stderr)
+
+def recall_collapsed(client, query, n_results, where=None, mode="vector"):
+    """Recalls and merges chunk hits back into one result per parent pair."""
+    results = memory.recall(client, query, n_results=n_results * COLLAPSE_OVERFETCH, where=where or None,
+                            mode=mode)
+
+    def fetch_chunks(parent_ids):
+        return memory.get_memories(client, where={"parent_id": {"$in": parent_ids}})
+
+    return chunker.collapse_results(results, fetch_chunks, n_results)
+
+def recall_text(query, n_results, where, collapse=False, mode="vector"):
     client = memory.get_client()
     if not client:
         print("Error: Could not connect to Hive Mind. Is start_brain.sh running?", file=sys.stderr)
         sys.exit(1)
 
-    results = memory.recall(client, query, n_results=n_results, where=where or None)
+    if mode != "vector":
+        enable_keyword_search(client)
+
+    if collapse:
+        results = recall_collapsed(client, query, n_results, where, mode)
+    else:
+        results = memory.recall(client, query, n_results=n_results, where=where or None, mode=mode)
+    print(format_results(results))
+
+def build_where(project=None, memory_type=None, source=None):
+    where = {}
+    if project:
+        where["project_context"] = project
+    if memory_type:
+        where["type"] = memory_type
+    if source:
+        where["source"] = source
+    return where
+
+def parse_batch_line(line, defaults):
+    """
+    Turns one --batch input line into a request dict. Plain lines are the
+    query text; JSON lines may override n/where/project/type/source and
+    carry an "id" that is echoed back. A line that cannot be parsed yields
+    a request with an "error" message instead of a query.
+    """
+    request = dict(defaults)
+    stripped = line.strip()
+    if stripped.startswith("{"):
+        try:
+            item = json.loads(stripped)
+            if not isinstance(item, dict):
+                raise ValueError("expected a JSON object")
+            if "id" in item:
+                request["id"] = item["id"]
+            if not isinstance(item.get("query"), str) or not item["query"].strip():
+                raise ValueError('missing "query" string')
+            request["query"] = item["query"]
+            request["n"] = int(item.get("n", request["n"]))
+            if "where" in item:
+                if not isinstance(item["where"] or {}, dict):
+                    raise ValueError('"where" must be an object')
+                request["where"] = item["where"] or {}
+            elif any(k in item for k in ("project", "type", "source")):
+                request["where"] = build_where(item.get("project"), item.get("type"), item.get("source"))
+        except (ValueError, TypeError) as e:
+            # json.JSONDecodeError is a ValueError
+            request["query"] = None
+            request["error"] = f"invalid batch line: {e}"
+    else:
+        request["query"] = stripped
+    return request
+
+def _jsonl_hits(results):
+    ids = results.get("ids", [[]])[0]
     documents = results.get("documents", [[]])[0]
     metadatas = results.get("metadatas", [[]])[0]
+    distances = (results.get("distances") or [[]])[0]
+    return [
+        {
+            "id": ids[i] if i < len(ids) else None,
+            "document": doc,
+            "metadata": metadatas[i] if i < len(metadatas) else None,
+            "distance": distances[i] if i < len(distances) else None,
+        }
+        for i, doc in enumerate(documents)
+    ]
 
-    if not documents:
-        print("No results found.")
-        return
-
-    for i, doc in enumerate(documents):
-        meta = metadatas[i] if i < len(metadatas) else {}
-        print(f"Result {i + 1}")
-        print(f"Title: {meta.get('conversation_title', '(untitled)')}")
-        print(f"Project: {meta.get('project_context', '')}")
-        print(f"Type: {meta.get('type', '')}")
-        print(f"Tags: {meta.get('tags', '')}")
-        print(f"Source: {meta.get('source', '')}")
-        print(f"Timestamp: {meta.get('timestamp', '')}")
-        print("-" * 60)
-        print(doc)
-        print("\n" + "=" * 60 + "\n")
+def recall_batch(lines, defaults, collapse=False, mode="vector", out=sys.stdout):
+    """
+    Answers newline-delimited or JSONL queries, one JSON line per query in
+    input order. Queries sharing n/where within a block go out as one
+    batched recall.
+    """
+    client = memory.get_client()
+    if not client:
+        print("Error: Could not connect to Hive Mind. Is start_brain.sh running?", file=sys.stderr)
+        sys.exit(1)
+
+    if mode != "vector":
+        enable_keyword_search(client)
+
+    requests = (parse_batch_line(line, defaults) for line in lines if line.strip())
+    index = 0
+    while True:
+        block = list(itertools.islice(requests, BATCH_BLOCK_SIZE))
+        if not block:
+            return
+
+        answers = [None] * len(block)
+        valid = [i for i, req in enumerate(block) if "error" not in req]
+        if collapse:
+            for i in valid:
+                req = block[i]
+                answers[i] = recall_collapsed(client, req["query"], req["n"], req["where"] or None, mode)
+        else:
+            groups = {}
+            for i in valid:
+                req = block[i]
+                key = (req["n"], json.dumps(req["where"], sort_keys=True))
+                groups.setdefault(key, []).append(i)
+            for members in groups.values():
+                first = block[members[0]]
+                batch = memory.recall_many(client, [block[i]["query"] for i in members],
+                                           n_results=first["n"], where=first["where"] or None, mode=mode)
+                for i, results in zip(members, batch):
+                    answers[i] = results
+
+        for req, results in zip(block, answers):
+            record = {"index": index, "query": req["query"]}
+            if "error" in req:
+                record["error"] = req["error"]
+            else:
+                record["results"] = _jsonl_hits(results)
+            if "id" in req:
+                record["id"] = req["id"]
+            out.write(json.dumps(record) + "\n")
+            index += 1
+        out.flush()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Query the Brain.")
@@ -41,9 +167,19 @@ if __name__ == "__main__":
     parser.add_argument("--project", help="Filter by project_context")
     parser.add_argument("--type", dest="memory_type", help="Filter by type")
     parser.add_argument("--source", help="Filter by source")
+    parser.add_argument("--collapse", action="store_true", help="Merge chunk hits back into their parent pair")
+    parser.add_argument("--mode", choices=memory.RECALL_MODES, default="vector",
+                        help="vector (default), keyword (local BM25 only) or hybrid (BM25 + vector)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Read one query (or JSON object) per stdin line and write JSONL results")
 
     args = parser.parse_args()
 
+    if args.batch:
+        defaults = {"n": args.n, "where": build_where(args.project, args.memory_type, args.source)}
+        recall_batch(sys.stdin, defaults, args.collapse, args.mode)
+        sys.exit(0)
+
     query = args.query
     if not query and not sys.stdin.isatty():
         query = sys.stdin.read().strip()
@@ -52,12 +188,6 @@ if __name__ == "__main__":
         print("Error: No query provided", file=sys.stderr)
         sys.exit(1)
 
-    where = {}
-    if args.project:
-        where["project_context"] = args.project
-    if args.memory_type:
-        where["type"] = args.memory_type
-    if args.source:
-        where["source"] = args.source
-
-    recall_text(query, args.n, where)
+    where = build_where(args.project, args.memory_type, args.source)
+
+    recall_text(query, args.n, where, args.collapse, args.mode)
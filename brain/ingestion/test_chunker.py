@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+
+
+# Add brain root path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from brain.ingestion import chunker
+
+class TestChunker(unittest.TestCase):
+    def setUp(self):
+        words = " ".join(f"word{i}" for i in range(400))
+        self.content = f"Context: Long Thread\nUser: explain\nAssistant: {words}"
+        self.metadata = {"conversation_id": "c1", "type": "chat_pair"}
+
+    def test_short_pair_passes_through(self):
+        chunks = chunker.chunk_pair("c1:abc", "Context: t\nUser: hi\nAssistant: hello", self.metadata, 500, 50)
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0][0], "c1:abc")
+        self.assertNotIn("parent_id", chunks[0][2])
+
+    def test_long_pair_is_split_and_linked(self):
+        chunks = chunker.chunk_pair("c1:abc", self.content, self.metadata, 300, 40)
+        self.assertGreater(len(chunks), 1)
+        for index, (chunk_id, text, meta) in enumerate(chunks):
+            self.assertEqual(chunk_id, f"c1:abc#{index}")
+            self.assertLessEqual(len(text), 300)
+            self.assertTrue(text.startswith("Context: Long Thread\n"))
+            self.assertEqual(meta["parent_id"], "c1:abc")
+            self.assertEqual(meta["chunk_index"], index)
+            self.assertEqual(meta["chunk_count"], len(chunks))
+
+    def test_merge_restores_original(self):
+        chunks = chunker.chunk_pair("c1:abc", self.content, self.metadata, 300, 40)
+        # Order of fetched chunks must not matter
+        docs = [c[1] for c in reversed(chunks)]
+        metas = [c[2] for c in reversed(chunks)]
+        self.assertEqual(chunker.merge_chunks(docs, metas), self.content)
+
+    def test_collapse_groups_hits_by_parent(self):
+        chunks = chunker.chunk_pair("c1:abc", self.content, self.metadata, 300, 40)
+        results = {
+            "ids": [[chunks[2][0], "other", chunks[0][0]]],
+            "documents": [[chunks[2][1], "other doc", chunks[0][1]]],
+            "metadatas": [[chunks[2][2], {"type": "artifact"}, chunks[0][2]]],
+            "distances": [[0.1, 0.2, 0.3]],
+        }
+
+        def fetch_chunks(parent_ids):
+            self.assertEqual(parent_ids, ["c1:abc"])
+            return {"documents": [c[1] for c in chunks], "metadatas": [c[2] for c in chunks]}
+
+        collapsed = chunker.collapse_results(results, fetch_chunks, n_results=5)
+        self.assertEqual(collapsed["ids"][0], ["c1:abc", "other"])
+        self.assertEqual(collapsed["documents"][0][0], self.content)
+        self.assertNotIn("chunk_index", collapsed["metadatas"][0][0])
+
+if __name__ == "__main__":
+    unittest.main()
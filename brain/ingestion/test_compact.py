@@ -0,0 +1,74 @@
+import os
+import sys
+import unittest
+
+# Add brain root path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import chromadb
+
+from brain.ingestion.compact import compact, content_key, find_near_duplicates, plan_compaction, similar_pairs
+from brain.lib import memory
+
+
+def _near_duplicates(vectors, threshold, block=2):
+    ids = [str(i) for i in range(len(vectors))]
+
+    def pages():
+        for start in range(0, len(ids), block):
+            yield ids[start:start + block], vectors[start:start + block]
+
+    return find_near_duplicates(similar_pairs(pages, threshold), {doc_id: i for i, doc_id in enumerate(ids)})
+
+
+class TestCompact(unittest.TestCase):
+    def test_content_key_ignores_whitespace_layout(self):
+        self.assertEqual(content_key("alpha  note\n"), content_key("alpha note"))
+        self.assertNotEqual(content_key("alpha note"), content_key("alpha notes"))
+
+    def test_near_duplicates_keep_first_of_each_group(self):
+        vectors = [
+            [1.0, 0.0, 0.0],
+            [0.99, 0.01, 0.0],   # near row 0
+            [0.0, 1.0, 0.0],
+            [0.0, 2.0, 0.01],    # near row 2 (scale does not matter)
+            [0.0, 0.0, 1.0],
+        ]
+        self.assertEqual(_near_duplicates(vectors, 0.99), ["1", "3"])
+        self.assertEqual(_near_duplicates(vectors, 0.99, block=5), ["1", "3"])
+
+    def test_dropped_rows_do_not_remove_others(self):
+        # Row 2 is close to row 1 but not to row 0; row 1 goes, so row 2 survives
+        vectors = [[1.0, 0.0], [0.95, 0.31], [0.81, 0.59]]
+        self.assertEqual(_near_duplicates(vectors, 0.95, block=1), ["1"])
+
+
+class TestPlanCompaction(unittest.TestCase):
+    def setUp(self):
+        memory.clear_pool()
+        self.client = chromadb.EphemeralClient()
+        try:
+            self.client.delete_collection("compact_test")
+        except Exception:
+            pass
+        memory.get_collection(self.client, "compact_test").add(
+            ids=["old", "new", "copy", "blank", "other", "near"],
+            documents=["alpha note", "alpha  note", "alpha note", " ", "beta", "beta again"],
+            metadatas=[{"timestamp": "2024"}, {"timestamp": "2025"}, {"timestamp": "2023"},
+                       {"timestamp": "2025"}, {"timestamp": "2025"}, {"timestamp": "2024"}],
+            embeddings=[[1.0, 0.0], [1.0, 0.0], [1.0, 0.0], [0.5, 0.5], [0.0, 1.0], [0.01, 1.0]],
+        )
+
+    def test_pages_across_the_collection(self):
+        scanned, doomed = plan_compaction(self.client, "compact_test", threshold=0.99, page_size=2)
+        self.assertEqual(scanned, 6)
+        self.assertEqual(doomed, {"empty": ["blank"], "exact": ["old", "copy"], "near": ["near"]})
+
+    def test_store_size_needs_a_local_store(self):
+        report = compact(self.client, "compact_test", threshold=0.99, page_size=2, dry_run=True)
+        self.assertIsNone(report["store_bytes_before"])
+        self.assertIsNone(report["store_bytes_after"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add brain root path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import chromadb
+
+from brain.benchmarks.synthetic import claude_conversation
+from brain.ingestion import ingest
+from brain.ingestion.ingest import iter_pairs
+from brain.lib import memory
+from brain.lib.ingest_index import Watermarks
+
+
+def _conv(conv_id, *turns):
+    messages = []
+    for i, (role, text) in enumerate(turns):
+        messages.append({"role": role, "content": text, "timestamp": f"2025-01-01T00:00:{i:02d}+00:00"})
+    return {"id": conv_id, "title": "T", "source": "claude", "messages": messages}
+
+
+class TestWatermarks(unittest.TestCase):
+    def test_only_pairs_after_watermark_are_emitted(self):
+        conv = _conv("c1", ("user", "first question"), ("assistant", "first answer"),
+                     ("user", "second question"), ("assistant", "second answer"))
+        marks = {"c1": "2025-01-01T00:00:01+00:00"}
+        pairs = list(iter_pairs([conv], watermarks=marks))
+        self.assertEqual(len(pairs), 1)
+        self.assertIn("second answer", pairs[0][1])
+        self.assertEqual(marks["c1"], "2025-01-01T00:00:03+00:00")
+
+    def test_unchanged_conversation_is_skipped(self):
+        conv = _conv("c1", ("user", "first question"), ("assistant", "first answer"))
+        marks = {}
+        self.assertEqual(len(list(iter_pairs([conv], watermarks=marks))), 1)
+        self.assertEqual(list(iter_pairs([conv], watermarks=marks)), [])
+
+    def test_late_answer_to_trailing_question_is_kept(self):
+        marks = {}
+        list(iter_pairs([_conv("c1", ("user", "pending question"))], watermarks=marks))
+        conv = _conv("c1", ("user", "pending question"), ("assistant", "late answer"))
+        self.assertEqual(len(list(iter_pairs([conv], watermarks=marks))), 1)
+
+    def test_untimed_sources_ignore_watermarks(self):
+        conv = dict(_conv("c1", ("user", "first question"), ("assistant", "first answer")), source="markdown")
+        marks = {"c1": "2999-01-01T00:00:00+00:00"}
+        self.assertEqual(len(list(iter_pairs([conv], watermarks=marks))), 1)
+        self.assertEqual(marks, {"c1": "2999-01-01T00:00:00+00:00"})
+
+    def test_other_settings_invalidate_file_state(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            export = os.path.join(tmp, "export.json")
+            with open(export, "w", encoding="utf-8") as f:
+                f.write("[]")
+            marks = Watermarks(os.path.join(tmp, "watermarks.json"))
+            first = ingest.sync_settings("alpha")
+            marks.update(export, {"c1": "2025"}, first)
+            self.assertTrue(marks.unchanged(export, first))
+
+            second = ingest.sync_settings("beta", chunk_chars=1024, chunk_overlap=128)
+            self.assertTrue(marks.settings_changed(export, second))
+            self.assertFalse(marks.unchanged(export, second))
+            self.assertEqual(marks.conversations(export, second), {})
+            marks.update(export, {"c2": "2026"}, second)
+            self.assertEqual(marks.conversations(export, second), {"c2": "2026"})
+            self.assertFalse(marks.settings_changed(export, second))
+
+    def test_file_state_round_trips(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            export = os.path.join(tmp, "export.json")
+            with open(export, "w", encoding="utf-8") as f:
+                f.write("[]")
+            state = os.path.join(tmp, "watermarks.json")
+            marks = Watermarks(state)
+            self.assertFalse(marks.unchanged(export))
+            marks.update(export, {"c1": "2025"})
+            marks.save()
+
+            reloaded = Watermarks(state)
+            self.assertTrue(reloaded.unchanged(export))
+            self.assertEqual(reloaded.conversations(export), {"c1": "2025"})
+            with open(export, "a", encoding="utf-8") as f:
+                f.write("\n")
+            self.assertFalse(reloaded.unchanged(export))
+
+
+def _embed(texts):
+    return [[float(len(t) % 7), float(t.count(" ") % 5), 1.0] for t in texts]
+
+
+class _StoreCase(unittest.TestCase):
+    """In-process store with local embeddings and one export holding a repeated conversation."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        memory.enable_embedding_cache(os.path.join(self.tmp.name, "embeddings"), _embed)
+        self.addCleanup(memory.disable_embedding_cache)
+        self.client = chromadb.EphemeralClient()
+        try:
+            self.client.delete_collection(memory.DEFAULT_COLLECTION)
+        except Exception:
+            pass
+        memory.clear_pool()
+        # Same conversation in the export twice, as when exports overlap
+        conversation = claude_conversation(random.Random(0), 0, turns=3)
+        self.export = os.path.join(self.tmp.name, "export.json")
+        with open(self.export, "w", encoding="utf-8") as f:
+            json.dump([conversation, conversation], f)
+
+    def _ingest(self, project, bulk):
+        with mock.patch.object(memory, "get_client", return_value=self.client):
+            ingest.ingest_file(self.export, project=project, bulk=bulk, dedup=False, sync=False)
+        return memory.get_collection(self.client).get()
+
+
+class TestIngestNoDedup(_StoreCase):
+    def test_repeated_pairs_in_one_run_are_written_once(self):
+        for bulk in (True, False):
+            stored = self._ingest("first", bulk)
+            self.assertEqual(len(stored["ids"]), 3)
+            self.assertEqual(len(set(stored["ids"])), 3)
+
+    def test_no_dedup_rewrites_stored_memories(self):
+        self._ingest("first", bulk=True)
+        stored = self._ingest("second", bulk=True)
+        self.assertEqual({m["project_context"] for m in stored["metadatas"]}, {"second"})
+
+
+class TestIngestFiles(_StoreCase):
+    def test_directories_skip_markdown_unless_asked(self):
+        with open(os.path.join(self.tmp.name, "README.md"), "w", encoding="utf-8") as f:
+            f.write("# Notes\n\nUser: not a transcript\n")
+        self.assertEqual(ingest.expand_inputs([self.tmp.name]), [os.path.abspath(self.export)])
+        self.assertEqual(len(ingest.expand_inputs([self.tmp.name], markdown=True)), 2)
+
+    def test_worker_pairs_stream_through_spool_files(self):
+        other = os.path.join(self.tmp.name, "other.json")
+        with open(other, "w", encoding="utf-8") as f:
+            json.dump([claude_conversation(random.Random(1), 1, turns=2)], f)
+        with mock.patch.object(memory, "get_client", return_value=self.client):
+            ingest.ingest_files([self.export, other], project="p", dedup=False, workers=2, sync=False)
+        stored = memory.get_collection(self.client).get()
+        self.assertEqual(len(stored["ids"]), 5)
+        self.assertEqual({m["project_context"] for m in stored["metadatas"]}, {"p"})
+
+
+if __name__ == "__main__":
+    unittest.main()
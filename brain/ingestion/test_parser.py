@@ -1,12 +1,17 @@
+import io
+import json
 import unittest
 import sys
 import os
+import tempfile
 
 
 # Add brain root path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
-from brain.ingestion.parser import ChatParser
+from brain.ingestion import parser as parser_module
+from brain.ingestion.parser import (ChatFormat, ChatParser, FORMATS, find_element_boundaries,
+                                    iter_json_array, register_format)
 
 class TestParser(unittest.TestCase):
     def test_chatgpt_linearization(self):
@@ -48,5 +53,124 @@ class TestParser(unittest.TestCase):
         self.assertEqual(msgs[0]["role"], "user")
         self.assertEqual(msgs[1]["role"], "assistant")
 
+    def test_parse_file_returns_plain_dicts(self):
+        test_file = os.path.join(os.path.dirname(__file__), "../test_data/claude_tools.json")
+        conv = ChatParser().parse_file(test_file, "claude")[0]
+        self.assertIs(type(conv), dict)
+        self.assertIs(type(conv["messages"][0]), dict)
+        conv["title"] = "renamed"
+        self.assertEqual(json.loads(json.dumps(conv))["messages"][0]["role"], "user")
+
+    def test_streaming_matches_full_load(self):
+        """Streaming the top-level array must yield the same elements as json.load."""
+        data = [{"id": i, "text": "x" * (i * 7), "nested": [1, {"a": "]"}]} for i in range(20)]
+        data.append(12345)
+        raw = json.dumps(data, indent=2)
+        # Tiny chunks force elements and numbers to straddle buffer boundaries
+        streamed = list(iter_json_array(io.StringIO(raw), chunk_size=3))
+        self.assertEqual(streamed, data)
+
+    def test_streaming_rejects_non_array(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(io.StringIO('{"mapping": {}}')))
+
+    def test_detect_format_from_first_element(self):
+        parser = ChatParser()
+        test_file = os.path.join(os.path.dirname(__file__), "../test_data/claude_tools.json")
+        with open(test_file, encoding="utf-8") as f:
+            first = json.load(f)[0]
+        self.assertEqual(parser.detect_format(first), "claude")
+
+    def test_iter_file_is_lazy(self):
+        parser = ChatParser()
+        test_file = os.path.join(os.path.dirname(__file__), "../test_data/branching_chatgpt.json")
+        conversations = parser.iter_file(test_file, "chatgpt")
+        self.assertFalse(isinstance(conversations, list))
+        self.assertEqual(list(conversations), parser.parse_file(test_file, "chatgpt"))
+
+    def _write(self, suffix, text):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_jsonl_groups_messages_by_conversation(self):
+        lines = [
+            {"conversation_id": "a", "role": "user", "content": "Hi there", "timestamp": 1700000000},
+            {"conversation_id": "a", "role": "assistant", "content": [{"type": "text", "text": "Hello"}],
+             "timestamp": 1700000001000},
+            {"conversation_id": "a", "role": "tool", "content": "{}"},
+            {"sessionId": "b", "type": "user", "message": {"role": "user", "content": "Next"},
+             "timestamp": "2025-01-01T00:00:00Z"},
+        ]
+        path = self._write(".jsonl", "\n".join(json.dumps(line) for line in lines) + "\n")
+        conversations = ChatParser().parse_file(path)
+        self.assertEqual([c["id"] for c in conversations], ["a", "b"])
+        self.assertEqual([m["role"] for m in conversations[0]["messages"]], ["user", "assistant"])
+        self.assertEqual(conversations[0]["messages"][1]["content"], "Hello")
+        self.assertEqual(conversations[0]["messages"][1]["timestamp"], "2023-11-14T22:13:21+00:00")
+        self.assertEqual(conversations[1]["source"], "jsonl")
+
+    def test_markdown_transcript(self):
+        text = (
+            "# Shell help\n\n"
+            "## User\nHow do I list files?\n\n"
+            "## Assistant\nUse ls:\n```\nUser: not a turn\n```\n"
+            "# Second\n"
+            "**User:** inline question\n"
+            "**Assistant:** inline answer\n"
+        )
+        path = self._write(".md", text)
+        conversations = ChatParser().parse_file(path)
+        self.assertEqual([c["title"] for c in conversations], ["Shell help", "Second"])
+        first = conversations[0]["messages"]
+        self.assertEqual([m["role"] for m in first], ["user", "assistant"])
+        self.assertIn("User: not a turn", first[1]["content"])
+        self.assertEqual(conversations[1]["messages"][0]["content"], "inline question")
+
+    def test_registered_format_is_detected(self):
+        register_format(ChatFormat(
+            "test_array", parse_element=lambda e: e,
+            sniff_element=lambda e: isinstance(e, dict) and "test_marker" in e,
+        ))
+        self.addCleanup(FORMATS.pop, "test_array")
+        path = self._write(".json", json.dumps([{"test_marker": 1}]))
+        self.assertEqual(ChatParser().parse_file(path), [{"test_marker": 1}])
+
+    def test_unknown_format_is_rejected(self):
+        path = self._write(".txt", "just some notes\n")
+        with self.assertRaises(ValueError):
+            ChatParser().parse_file(path)
+
+    def _claude_export(self, count):
+        # Message text that looks like element boundaries must not fool the splitter
+        tricky = '],{"uuid": "x", "chat_messages": []},{ '
+        return [
+            {"uuid": f"c{i}", "name": f"Conv {i}", "created_at": "2025-01-01T00:00:00Z",
+             "chat_messages": [
+                 {"sender": "human", "text": f"Question {i} {tricky}", "created_at": "2025-01-01T00:00:01Z"},
+                 {"sender": "assistant", "text": "Answer " * 50, "created_at": "2025-01-01T00:00:02Z"},
+             ]}
+            for i in range(count)
+        ]
+
+    def test_boundaries_start_at_top_level_elements(self):
+        path = self._write(".json", json.dumps(self._claude_export(40), indent=1))
+        boundaries = find_element_boundaries(path, FORMATS["claude"].sniff_element, 8)
+        self.assertGreater(len(boundaries), 3)
+        with open(path, "rb") as f:
+            for offset in boundaries[1:-1]:
+                f.seek(offset)
+                self.assertTrue(f.read(12).startswith(b'{\n  "uuid"'))
+
+    def test_parallel_parse_matches_sequential(self):
+        path = self._write(".json", json.dumps(self._claude_export(60)))
+        original = parser_module.PARALLEL_SHARD_BYTES
+        parser_module.PARALLEL_SHARD_BYTES = 2048
+        self.addCleanup(setattr, parser_module, "PARALLEL_SHARD_BYTES", original)
+        parser = ChatParser()
+        self.assertEqual(parser.parse_file(path, "claude", workers=2), parser.parse_file(path, "claude"))
+
 if __name__ == "__main__":
     unittest.main()
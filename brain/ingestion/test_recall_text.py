@@ -0,0 +1,94 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add brain root path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import chromadb
+
+from brain.ingestion import recall_text
+from brain.lib import memory
+
+DEFAULTS = {"n": 5, "where": {}}
+
+
+def _results(query):
+    return {"ids": [[f"id-{query}"]], "documents": [[f"doc for {query}"]],
+            "metadatas": [[{}]], "distances": [[0.1]]}
+
+
+class TestParseBatchLine(unittest.TestCase):
+    def test_plain_and_json_lines(self):
+        self.assertEqual(recall_text.parse_batch_line("git tips\n", DEFAULTS)["query"], "git tips")
+        request = recall_text.parse_batch_line('{"query": "q", "n": 2, "project": "p", "id": 7}', DEFAULTS)
+        self.assertEqual((request["query"], request["n"], request["where"], request["id"]),
+                         ("q", 2, {"project_context": "p"}, 7))
+
+    def test_malformed_lines_become_errors(self):
+        for line in ('{"query": ', '{"n": 3}', '{"query": "q", "n": "many"}', '{"query": "q", "where": [1]}'):
+            request = recall_text.parse_batch_line(line, DEFAULTS)
+            self.assertIn("error", request, line)
+            self.assertIsNone(request["query"])
+
+
+class TestRecallBatch(unittest.TestCase):
+    def test_bad_line_does_not_drop_the_rest_of_the_block(self):
+        lines = ["first\n", '{"query": \n', '{"id": "x"}\n', "second\n"]
+        out = io.StringIO()
+        with mock.patch.object(recall_text.memory, "get_client", return_value=object()), \
+                mock.patch.object(recall_text.memory, "recall_many",
+                                  side_effect=lambda client, queries, **kw: [_results(q) for q in queries]):
+            recall_text.recall_batch(lines, DEFAULTS, out=out)
+
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([r["index"] for r in records], [0, 1, 2, 3])
+        self.assertEqual(records[0]["results"][0]["id"], "id-first")
+        self.assertIn("error", records[1])
+        self.assertEqual((records[2]["id"], "error" in records[2]), ("x", True))
+        self.assertEqual(records[3]["results"][0]["id"], "id-second")
+
+
+class TestLexicalIndexUpkeep(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.object(memory, "STATE_DIR", self.tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(memory.disable_lexical_index)
+        memory.disable_lexical_index()
+        memory.clear_pool()
+        self.client = chromadb.EphemeralClient()
+        try:
+            self.client.delete_collection(memory.DEFAULT_COLLECTION)
+        except Exception:
+            pass
+        memory.get_collection(self.client).add(ids=["a", "b"], documents=["retry backoff", "utc timestamps"],
+                                               embeddings=[[1.0, 0.0], [0.0, 1.0]])
+
+    def test_writers_only_keep_an_index_that_exists(self):
+        self.assertIsNone(memory.enable_lexical_index_if_built())
+        memory.enable_lexical_index()
+        memory.disable_lexical_index()
+        self.assertIsNotNone(memory.enable_lexical_index_if_built())
+
+    def test_keyword_search_warns_when_the_index_lags(self):
+        err = io.StringIO()
+        with mock.patch.object(sys, "stderr", err):
+            recall_text.enable_keyword_search(self.client)
+        self.assertIn("covers 0 of 2 memories", err.getvalue())
+
+        memory.rebuild_lexical_index(self.client)
+        err = io.StringIO()
+        with mock.patch.object(sys, "stderr", err):
+            recall_text.enable_keyword_search(self.client)
+        self.assertEqual(err.getvalue(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+"""
+asyncio variant of the memory.py client API.
+
+For agents that run many tasks on one event loop (e.g. dhp-swarm with
+--max-parallel): recalls and writes are awaited instead of blocking, so
+several tasks can talk to the Hive Mind concurrently without threads.
+
+    client = await async_memory.get_client()
+    results = await asyncio.gather(*(async_memory.recall(client, q) for q in queries))
+
+Clients (each with its own HTTP connection pool) and collection handles are
+pooled per event loop and server. At most MAX_CONCURRENCY requests per loop
+are in flight at once. The recall cache, embedding cache, lexical index and
+partition settings are shared with memory.py, whose public write/read-path
+helpers this module builds on. Their local blocking work (embedding, SQLite,
+the locked partition registry) runs in worker threads.
+"""
+import asyncio
+import os
+import time
+
+import chromadb
+
+from brain.lib import memory
+from brain.lib.memory import DEFAULT_COLLECTION, HOST, PORT
+
+# Max in-flight server requests per event loop; BRAIN_ASYNC_CONCURRENCY overrides
+MAX_CONCURRENCY = int(os.environ.get("BRAIN_ASYNC_CONCURRENCY", "8") or 8)
+
+# Per event loop: {"clients": {(host, port): (client, created)}, "collections": {...}, "semaphore": ...}
+_loop_state = {}
+
+
+def configure(max_concurrency):
+    """Sets the per-loop request limit; applies to loops that have not started yet."""
+    global MAX_CONCURRENCY
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+    MAX_CONCURRENCY = max_concurrency
+
+
+def _state():
+    loop = asyncio.get_running_loop()
+    state = _loop_state.get(loop)
+    if state is None:
+        # Drop state for loops that have finished (e.g. repeated asyncio.run calls)
+        for stale in [l for l in _loop_state if l.is_closed()]:
+            del _loop_state[stale]
+        state = {"clients": {}, "collections": {}, "servers": {},
+                 "semaphore": asyncio.Semaphore(MAX_CONCURRENCY)}
+        _loop_state[loop] = state
+    return state
+
+
+def _pooled(pool, key):
+    entry = pool.get(key)
+    if entry is None:
+        return None
+    handle, created = entry
+    if memory.POOL_TTL <= 0 or time.monotonic() - created > memory.POOL_TTL:
+        del pool[key]
+        return None
+    return handle
+
+
+async def get_client(host=HOST, port=PORT, fresh=False):
+    """
+    Returns an AsyncHttpClient for the Hive Mind, or None when the server is
+    unreachable. Clients are pooled per event loop for memory.POOL_TTL seconds.
+    """
+    state = _state()
+    key = (host, port)
+    if not fresh:
+        client = _pooled(state["clients"], key)
+        if client is not None:
+            return client
+
+    try:
+        client = await chromadb.AsyncHttpClient(host=host, port=port)
+        await client.heartbeat()
+    except Exception as e:
+        if memory.is_connection_error(e):
+            print(f"Error connecting to Hive Mind at {host}:{port}. Is start_brain.sh running?")
+            print(f"Details: {e}")
+            return None
+        raise
+    if memory.POOL_TTL > 0:
+        state["clients"][key] = (client, time.monotonic())
+    state["servers"][id(client)] = key
+    for cached in [k for k in state["collections"] if k[:2] == key]:
+        del state["collections"][cached]
+    return client
+
+
+async def get_collection(client, collection_name=DEFAULT_COLLECTION):
+    state = _state()
+    server = state["servers"].get(id(client))
+    key = (server or (id(client),)) + (collection_name,)
+    collection = _pooled(state["collections"], key)
+    if collection is None:
+        collection = await client.get_or_create_collection(name=collection_name)
+        state["collections"][key] = (collection, time.monotonic())
+    return collection
+
+
+async def _with_collection(client, collection_name, operation):
+    """
+    Awaits `operation(collection)` under the concurrency limit, retrying
+    once on a fresh client after a connection error.
+    """
+    state = _state()
+    async with state["semaphore"]:
+        try:
+            return await operation(await get_collection(client, collection_name))
+        except Exception as e:
+            server = state["servers"].get(id(client))
+            if server is None or not memory.is_connection_error(e):
+                raise
+            fresh = await get_client(*server, fresh=True)
+            if fresh is None:
+                raise
+            return await operation(await get_collection(fresh, collection_name))
+
+
+async def _fan_out(client, names, operation):
+    return await asyncio.gather(*(_with_collection(client, name, operation) for name in names))
+
+
+async def add_memory(client, content, metadata=None, collection_name=DEFAULT_COLLECTION, ids=None,
+                     upsert=False):
+    """Adds one or more memories; same arguments and return value as memory.add_memory."""
+    content, metadata, ids = memory.normalize_batch(content, metadata, ids)
+    # Embedding runs the model on misses; keep it off the event loop
+    embeddings = await asyncio.to_thread(memory.embed, content)
+
+    def _adder(rows):
+        async def _add(target):
+            write = target.upsert if upsert else target.add
+            await write(
+                documents=[content[i] for i in rows],
+                metadatas=[metadata[i] for i in rows],
+                ids=[ids[i] for i in rows],
+                embeddings=[embeddings[i] for i in rows] if embeddings is not None else None
+            )
+        return _add
+
+    if memory.PARTITION_BY:
+        routes = memory.route_partitions(collection_name, metadata)
+        await asyncio.gather(*(_with_collection(client, name, _adder(rows))
+                               for name, (_, rows) in routes.items()))
+        for name, (values, _) in routes.items():
+            # flock plus a JSON rewrite
+            await asyncio.to_thread(memory.register_partition, collection_name, name, values)
+    else:
+        await _with_collection(client, collection_name, _adder(range(len(content))))
+    await asyncio.to_thread(memory.after_write, collection_name, ids, content, metadata)
+    return ids
+
+
+async def _vector_recall(client, queries, n_results, where, where_document, collection_name):
+    embeddings = await asyncio.to_thread(memory.embed, queries)
+    search = {"query_embeddings": embeddings} if embeddings is not None else {"query_texts": queries}
+
+    async def _query(collection):
+        return await collection.query(n_results=n_results, where=where, where_document=where_document, **search)
+
+    if memory.PARTITION_BY:
+        partitions = memory.partitions_for_query(collection_name, where)
+        return memory.merge_query_results(await _fan_out(client, partitions, _query), n_results)
+    return await _with_collection(client, collection_name, _query)
+
+
+async def recall(client, query, n_results=5, where=None, where_document=None,
+                 collection_name=DEFAULT_COLLECTION, mode="vector"):
+    """Awaitable memory.recall(): same arguments, modes and result shape."""
+    memory.check_recall_mode(mode)
+    cache_key, cached = memory.recall_cache_lookup(collection_name, query, n_results, where, where_document, mode)
+    if cached is not None:
+        return cached
+
+    if mode == "keyword":
+        # Local SQLite lookup; no server round trip to overlap
+        results = await asyncio.to_thread(memory.keyword_recall, collection_name, query, n_results,
+                                          where, where_document)
+    elif mode == "hybrid":
+        fetch = n_results * memory.HYBRID_OVERFETCH
+        vector, hits = await asyncio.gather(
+            _vector_recall(client, [query], fetch, where, where_document, collection_name),
+            asyncio.to_thread(memory.lexical_search, collection_name, query, fetch, where, where_document)
+        )
+        results = memory.fuse_hybrid(vector, hits, n_results)
+    else:
+        results = await _vector_recall(client, [query], n_results, where, where_document, collection_name)
+
+    memory.recall_cache_store(cache_key, results)
+    return results
+
+
+async def recall_many(client, queries, n_results=5, where=None, where_document=None,
+                      collection_name=DEFAULT_COLLECTION, mode="vector"):
+    """Recalls several queries concurrently; one result dict per query, in input order."""
+    return await asyncio.gather(*(
+        recall(client, q, n_results, where, where_document, collection_name, mode) for q in queries
+    ))
@@ -0,0 +1,191 @@
+"""
+Thin client for the brain daemon (brain/daemon.py).
+
+Stdlib only, so the shell wrappers can run it with the system python3
+instead of importing chromadb in the Brain virtualenv on every call.
+Exits with EX_UNAVAILABLE when the daemon is not reachable so callers
+can fall back to the direct scripts.
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+
+# Add brain root path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from brain.lib.formatting import format_results
+
+BRAIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOCKET_PATH = os.environ.get("BRAIN_SOCKET", os.path.join(BRAIN_DIR, "brain.sock"))
+TIMEOUT = float(os.environ.get("BRAIN_SOCKET_TIMEOUT", "30"))
+EX_UNAVAILABLE = 69
+
+
+class DaemonUnavailable(Exception):
+    """Raised when the daemon socket cannot be reached."""
+
+
+class DaemonError(Exception):
+    """Raised when the daemon reports a failed request."""
+
+
+class DaemonClient:
+    """Sends newline-delimited JSON requests over the daemon's Unix socket."""
+
+    def __init__(self, socket_path=SOCKET_PATH, timeout=TIMEOUT):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            raise DaemonUnavailable(f"Brain daemon not reachable at {self.socket_path}: {e}")
+        self._sock = sock
+        self._reader = sock.makefile("r", encoding="utf-8")
+        return self
+
+    def close(self):
+        if self._reader:
+            self._reader.close()
+        if self._sock:
+            self._sock.close()
+        self._sock = self._reader = None
+
+    def __enter__(self):
+        return self.connect() if self._sock is None else self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def request(self, op, **params):
+        if self._sock is None:
+            self.connect()
+        payload = json.dumps(dict(params, op=op)) + "\n"
+        self._sock.sendall(payload.encode("utf-8"))
+        line = self._reader.readline()
+        if not line:
+            raise DaemonError("Brain daemon closed the connection")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise DaemonError(response.get("error", "unknown error"))
+        return response.get("result")
+
+    def ping(self):
+        return self.request("ping")
+
+    def stats(self):
+        return self.request("stats")
+
+    def recall(self, query, n_results=5, where=None, where_document=None, collapse=False, mode="vector"):
+        return self.request("recall", query=query, n_results=n_results, where=where,
+                            where_document=where_document, collapse=collapse, mode=mode)
+
+    def recall_many(self, queries, n_results=5, where=None, where_document=None, mode="vector"):
+        return self.request("recall_many", queries=list(queries), n_results=n_results, where=where,
+                            where_document=where_document, mode=mode)
+
+    def ingest_text(self, content, title, tags="", project="generic", memory_type="artifact"):
+        return self.request("ingest_text", content=content, title=title, tags=tags,
+                            project=project, memory_type=memory_type)
+
+
+def _read_stdin():
+    if not sys.stdin.isatty():
+        return sys.stdin.read()
+    return ""
+
+
+def _recall_command(client, args):
+    query = args.query or _read_stdin().strip()
+    if not query:
+        print("Error: No query provided", file=sys.stderr)
+        return 1
+
+    where = {}
+    if args.project:
+        where["project_context"] = args.project
+    if args.memory_type:
+        where["type"] = args.memory_type
+    if args.source:
+        where["source"] = args.source
+
+    results = client.recall(query, n_results=args.n, where=where or None, collapse=args.collapse,
+                            mode=args.mode)
+    print(format_results(results))
+    return 0
+
+
+def _ingest_command(client, args):
+    content = args.content or _read_stdin()
+    if not content or not content.strip():
+        print("Error: No content provided", file=sys.stderr)
+        return 1
+
+    client.ingest_text(content, args.title, args.tags, args.project, args.memory_type)
+    print(f"✓ Saved to Brain: '{args.title}' ({args.project})")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Talk to the resident brain daemon.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("ping", help="Check that the daemon is up")
+    subparsers.add_parser("stats", help="Show daemon cache counters as JSON")
+
+    recall_parser = subparsers.add_parser("recall", help="Query the Brain")
+    recall_parser.add_argument("query", nargs="?", help="Search query (or stdin)")
+    recall_parser.add_argument("--n", type=int, default=5, help="Number of results")
+    recall_parser.add_argument("--project", help="Filter by project_context")
+    recall_parser.add_argument("--type", dest="memory_type", help="Filter by type")
+    recall_parser.add_argument("--source", help="Filter by source")
+    recall_parser.add_argument("--collapse", action="store_true", help="Merge chunk hits back into their parent pair")
+    recall_parser.add_argument("--mode", choices=("vector", "keyword", "hybrid"), default="vector",
+                               help="vector (default), keyword (local BM25 only) or hybrid (BM25 + vector)")
+
+    ingest_parser = subparsers.add_parser("ingest", help="Save text to the Brain")
+    ingest_parser.add_argument("content", nargs="?", help="Content to ingest (or stdin)")
+    ingest_parser.add_argument("--title", required=True, help="Title of the memory")
+    ingest_parser.add_argument("--tags", default="", help="Comma separated tags")
+    ingest_parser.add_argument("--project", default="generic", help="Project context")
+    ingest_parser.add_argument("--type", default="artifact", dest="memory_type", help="Type of memory")
+
+    args = parser.parse_args(argv)
+
+    client = DaemonClient()
+    try:
+        # Connect before touching stdin so a fallback caller can still read it
+        client.connect()
+    except DaemonUnavailable as e:
+        # Wrappers that fall back to the direct scripts ask for silence here
+        if not os.environ.get("BRAIN_DAEMON_FALLBACK"):
+            print(f"Error: {e}", file=sys.stderr)
+        return EX_UNAVAILABLE
+
+    try:
+        if args.command == "ping":
+            print(client.ping())
+            return 0
+        if args.command == "stats":
+            print(json.dumps(client.stats(), indent=2))
+            return 0
+        if args.command == "recall":
+            return _recall_command(client, args)
+        return _ingest_command(client, args)
+    except (DaemonError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
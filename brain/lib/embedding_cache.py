@@ -0,0 +1,175 @@
+"""
+On-disk embedding cache keyed by content hash.
+
+Vectors live in a memory-mapped float32 matrix (vectors.f32), one row per
+cached text; index.tsv maps sha256(text) to its row. Both files are
+append-only and the vectors are written before the index, so a crash can
+never leave an index entry pointing past the end of the matrix.
+
+Several processes (the daemon, ingest.py) may share one cache directory.
+Appends hold an flock on cache.lock and take their row numbers from the
+size of vectors.f32, and index lines written by other processes are picked
+up from the tail of index.tsv.
+"""
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np  # installed alongside chromadb
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, directory):
+        self.directory = directory
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.index_path = os.path.join(directory, "index.tsv")
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.lock_path = os.path.join(directory, "cache.lock")
+        self.dim = None
+        self.hits = 0
+        self.misses = 0
+        self._rows = {}
+        self._row_count = 0
+        self._index_offset = 0
+        self._matrix = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.vectors_path) and self._read_meta():
+            with self._file_lock():
+                # Drop a partially written trailing row (crashed writer) so appends stay aligned
+                self._truncate_partial_row()
+        self._refresh()
+
+    def _read_meta(self):
+        if self.dim is None and os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+        return self.dim is not None
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared with every process using this cache directory."""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _truncate_partial_row(self):
+        """Returns the number of whole rows in vectors.f32; call with the file lock held."""
+        row_bytes = 4 * self.dim
+        size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        if size % row_bytes:
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(size - size % row_bytes)
+        return size // row_bytes
+
+    def _refresh(self):
+        """Reads index lines appended (by any process) since the last refresh."""
+        if not self._read_meta() or not os.path.exists(self.index_path):
+            return
+        available = os.path.getsize(self.vectors_path) // (4 * self.dim)
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Index line still being written; pick it up next time
+                    break
+                self._index_offset += len(line)
+                key, _, row = line.decode("utf-8").rstrip("\n").partition("\t")
+                if row and int(row) < available:
+                    self._rows[key] = int(row)
+        self._row_count = max(self._row_count, available)
+
+    def _map(self):
+        """(Re)maps the matrix when rows were appended since the last map."""
+        if self._matrix is None or self._matrix.shape[0] < self._row_count:
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                     shape=(self._row_count, self.dim))
+        return self._matrix
+
+    def __len__(self):
+        return len(self._rows)
+
+    def get_many(self, texts):
+        """Returns a list aligned with `texts`: a vector on hit, None on miss."""
+        keys = [content_hash(t) for t in texts]
+        with self._lock:
+            if any(k not in self._rows for k in keys):
+                # Another process may have cached them since we last looked
+                self._refresh()
+            rows = [self._rows.get(k) for k in keys]
+            matrix = self._map() if any(r is not None for r in rows) else None
+            found = []
+            for row in rows:
+                if row is None:
+                    self.misses += 1
+                    found.append(None)
+                else:
+                    self.hits += 1
+                    found.append(matrix[row].tolist())
+            return found
+
+    def put_many(self, texts, vectors):
+        if len(texts) == 0:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock, self._file_lock():
+            if not self._read_meta():
+                self.dim = int(vectors.shape[1])
+                with open(self.meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"dim": self.dim}, f)
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match cache ({self.dim})")
+            self._refresh()
+
+            new_keys = []
+            new_rows = []
+            pending = set()
+            for text, vector in zip(texts, vectors):
+                key = content_hash(text)
+                if key in self._rows or key in pending:
+                    continue
+                pending.add(key)
+                new_keys.append(key)
+                new_rows.append(vector)
+            if not new_keys:
+                return
+
+            # Row numbers come from the file, not our count: other processes append too
+            start = self._truncate_partial_row()
+            if os.path.exists(self.index_path) and os.path.getsize(self.index_path) > self._index_offset:
+                # Torn line from a writer that crashed mid-append
+                with open(self.index_path, "r+b") as f:
+                    f.truncate(self._index_offset)
+            with open(self.vectors_path, "ab") as f:
+                f.write(np.stack(new_rows).tobytes())
+            entries = "".join(f"{key}\t{start + i}\n" for i, key in enumerate(new_keys)).encode("utf-8")
+            with open(self.index_path, "ab") as f:
+                f.write(entries)
+            # _refresh() read the index up to its end under this lock, so ours are the next bytes
+            self._index_offset += len(entries)
+            self._row_count = start + len(new_keys)
+            for i, key in enumerate(new_keys):
+                self._rows[key] = start + i
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._rows),
+            "dim": self.dim,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
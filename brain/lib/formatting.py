@@ -0,0 +1,25 @@
+"""Plain-text rendering of recall results (stdlib only, shared by CLI and daemon client)."""
+
+
+def format_results(results):
+    """Renders a Chroma query result dict the way dhp-memory-search prints it."""
+    documents = results.get("documents", [[]])[0]
+    metadatas = results.get("metadatas", [[]])[0]
+
+    if not documents:
+        return "No results found."
+
+    lines = []
+    for i, doc in enumerate(documents):
+        meta = (metadatas[i] if i < len(metadatas) else None) or {}
+        lines.append(f"Result {i + 1}")
+        lines.append(f"Title: {meta.get('conversation_title', '(untitled)')}")
+        lines.append(f"Project: {meta.get('project_context', '')}")
+        lines.append(f"Type: {meta.get('type', '')}")
+        lines.append(f"Tags: {meta.get('tags', '')}")
+        lines.append(f"Source: {meta.get('source', '')}")
+        lines.append(f"Timestamp: {meta.get('timestamp', '')}")
+        lines.append("-" * 60)
+        lines.append(doc)
+        lines.append("\n" + "=" * 60 + "\n")
+    return "\n".join(lines)
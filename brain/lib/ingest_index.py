@@ -0,0 +1,111 @@
+"""On-disk records of what has already been ingested into a collection."""
+import json
+import os
+
+from brain.lib import memory
+
+
+class IngestIndex:
+    """
+    Append-only set of memory IDs, one per line.
+
+    Lets a re-import skip pairs it has already sent without asking the
+    server, so only the delta is embedded and inserted.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._known = set()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self._known.update(line.rstrip('\n') for line in f if line.strip())
+
+    @classmethod
+    def for_collection(cls, collection_name=memory.DEFAULT_COLLECTION):
+        return cls(os.path.join(memory.STATE_DIR, f"ingested_{collection_name}.ids"))
+
+    def __contains__(self, memory_id):
+        return memory_id in self._known
+
+    def __len__(self):
+        return len(self._known)
+
+    def record(self, ids):
+        """Persists IDs that were successfully written to the brain."""
+        new_ids = [i for i in ids if i not in self._known]
+        if not new_ids:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write("".join(f"{i}\n" for i in new_ids))
+        self._known.update(new_ids)
+
+
+class Watermarks:
+    """
+    Per-source-file sync state for incremental re-imports.
+
+    For every export file it keeps the size/mtime seen on the last
+    completed run, the ingest settings that run used (project, chunking)
+    and, per conversation, the timestamp of the newest message already
+    ingested. Unchanged files are skipped without parsing; changed files
+    only emit pairs answered after their watermark. A file synced with
+    other settings counts as never synced.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._files = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self._files = json.load(f).get("files", {})
+
+    @classmethod
+    def for_collection(cls, collection_name=memory.DEFAULT_COLLECTION):
+        return cls(os.path.join(memory.STATE_DIR, f"watermarks_{collection_name}.json"))
+
+    @staticmethod
+    def _stamp(file_path):
+        st = os.stat(file_path)
+        return {"size": st.st_size, "mtime": st.st_mtime}
+
+    def _entry(self, file_path, settings):
+        """The file's entry, or None when it was last synced with other settings."""
+        entry = self._files.get(os.path.abspath(file_path))
+        if not entry or entry.get("settings") != (settings or {}):
+            return None
+        return entry
+
+    def settings_changed(self, file_path, settings=None):
+        """True when the file was synced before, but with other settings."""
+        entry = self._files.get(os.path.abspath(file_path))
+        return bool(entry) and entry.get("settings") != (settings or {})
+
+    def unchanged(self, file_path, settings=None):
+        """True when the file matches the size/mtime and settings of the last completed sync."""
+        entry = self._entry(file_path, settings)
+        if not entry:
+            return False
+        return {"size": entry.get("size"), "mtime": entry.get("mtime")} == self._stamp(file_path)
+
+    def conversations(self, file_path, settings=None):
+        """Returns {conversation_id: last ingested message timestamp} for a file."""
+        entry = self._entry(file_path, settings) or {}
+        return dict(entry.get("conversations", {}))
+
+    def update(self, file_path, conversations, settings=None):
+        """Records a completed sync of `file_path` with its advanced watermarks."""
+        key = os.path.abspath(file_path)
+        if self._entry(file_path, settings) is None:
+            # Watermarks from other settings say nothing about this run
+            self._files[key] = {"conversations": {}, "settings": settings or {}}
+        entry = self._files[key]
+        entry.update(self._stamp(file_path))
+        entry["conversations"].update(conversations)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"files": self._files}, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,197 @@
+"""
+Local BM25 inverted index kept alongside the vector store.
+
+Backed by SQLite (stdlib), so exact-term lookups such as error strings,
+function names and ticket numbers never touch the embedding model or the
+Chroma server. memory.py feeds it from add_memory when enabled and fuses
+its ranking with vector search for hybrid recall.
+"""
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+
+# Okapi BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Reciprocal rank fusion constant (Cormack et al.)
+RRF_K = 60
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    collection TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    document TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    PRIMARY KEY (collection, doc_id)
+);
+CREATE TABLE IF NOT EXISTS postings (
+    collection TEXT NOT NULL,
+    term TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (collection, term, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_doc ON postings (collection, doc_id);
+"""
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def matches_where(metadata, where):
+    """Evaluates a Chroma-style metadata filter against one metadata dict."""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+            continue
+        value = metadata.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for op, expected in condition.items():
+            if op == "$eq" and value != expected:
+                return False
+            if op == "$ne" and value == expected:
+                return False
+            if op == "$in" and value not in expected:
+                return False
+            if op == "$nin" and value in expected:
+                return False
+            if op in ("$gt", "$gte", "$lt", "$lte"):
+                if value is None:
+                    return False
+                if op == "$gt" and not value > expected:
+                    return False
+                if op == "$gte" and not value >= expected:
+                    return False
+                if op == "$lt" and not value < expected:
+                    return False
+                if op == "$lte" and not value <= expected:
+                    return False
+    return True
+
+
+def matches_where_document(document, where_document):
+    if not where_document:
+        return True
+    if "$contains" in where_document:
+        return where_document["$contains"] in document
+    if "$not_contains" in where_document:
+        return where_document["$not_contains"] not in document
+    if "$and" in where_document:
+        return all(matches_where_document(document, c) for c in where_document["$and"])
+    if "$or" in where_document:
+        return any(matches_where_document(document, c) for c in where_document["$or"])
+    raise ValueError(f"Unsupported where_document filter: {where_document}")
+
+
+class LexicalIndex:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._conn.close()
+
+    def add(self, collection, ids, documents, metadatas):
+        """Indexes (or re-indexes) documents under their memory IDs."""
+        with self._lock, self._conn:
+            for doc_id, document, metadata in zip(ids, documents, metadatas):
+                terms = Counter(tokenize(document))
+                self._conn.execute(
+                    "DELETE FROM postings WHERE collection = ? AND doc_id = ?", (collection, doc_id)
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?, ?)",
+                    (collection, doc_id, sum(terms.values()), document, json.dumps(metadata or {})),
+                )
+                self._conn.executemany(
+                    "INSERT INTO postings VALUES (?, ?, ?, ?)",
+                    [(collection, term, doc_id, tf) for term, tf in terms.items()],
+                )
+
+    def delete(self, collection, ids):
+        with self._lock, self._conn:
+            for doc_id in ids:
+                self._conn.execute("DELETE FROM docs WHERE collection = ? AND doc_id = ?", (collection, doc_id))
+                self._conn.execute(
+                    "DELETE FROM postings WHERE collection = ? AND doc_id = ?", (collection, doc_id)
+                )
+
+    def count(self, collection):
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM docs WHERE collection = ?", (collection,)).fetchone()
+        return row[0]
+
+    def search(self, collection, query, n_results=5, where=None, where_document=None):
+        """
+        Returns up to n_results (doc_id, score, document, metadata) tuples
+        ranked by BM25.
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            total_docs, avg_len = self._conn.execute(
+                "SELECT COUNT(*), AVG(length) FROM docs WHERE collection = ?", (collection,)
+            ).fetchone()
+            if not total_docs:
+                return []
+            avg_len = avg_len or 1.0
+
+            scores = {}
+            for term in terms:
+                postings = self._conn.execute(
+                    "SELECT p.doc_id, p.tf, d.length FROM postings p "
+                    "JOIN docs d ON d.collection = p.collection AND d.doc_id = p.doc_id "
+                    "WHERE p.collection = ? AND p.term = ?",
+                    (collection, term),
+                ).fetchall()
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf, length in postings:
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            hits = []
+            for doc_id, score in ranked:
+                document, metadata = self._conn.execute(
+                    "SELECT document, metadata FROM docs WHERE collection = ? AND doc_id = ?",
+                    (collection, doc_id),
+                ).fetchone()
+                metadata = json.loads(metadata)
+                if not matches_where(metadata, where) or not matches_where_document(document, where_document):
+                    continue
+                hits.append((doc_id, score, document, metadata))
+                if len(hits) >= n_results:
+                    break
+        return hits
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    """Fuses several ranked ID lists into one ranking of (id, score)."""
+    fused = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
@@ -1,32 +1,518 @@
 import chromadb
+import copy
+import fcntl
+import hashlib
+import json
 import os
+import re
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 # Configuration - derive path relative to this module
 BRAIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DEFAULT_COLLECTION = "hive_mind"
+# Local bookkeeping (ingest indexes, caches) lives outside the Chroma data dir
+STATE_DIR = os.environ.get("BRAIN_STATE_DIR", os.path.join(BRAIN_DIR, "state"))
 HOST = "localhost"
 PORT = 8000
+# Chroma store opened in-process by the "embedded" backend (same dir start_brain.sh serves)
+DATA_DIR = os.environ.get("BRAIN_DATA_DIR", os.path.join(BRAIN_DIR, "data"))
+# "http" talks to start_brain.sh; "embedded" opens DATA_DIR in-process with no server
+BACKEND = os.environ.get("BRAIN_BACKEND", "http")
+BACKENDS = ("http", "embedded")
+# Seconds a pooled client/collection handle is reused before it is rebuilt (0 disables pooling)
+POOL_TTL = float(os.environ.get("BRAIN_POOL_TTL", "300"))
 
-def get_client():
-    """Returns a HttpClient connected to the Hive Mind server."""
+# Module-level handle pool so long-running callers pay the handshake once.
+# Clients are keyed by (host, port), or ("embedded", path) for the in-process
+# backend; collections by that key plus the collection name.
+_pool_lock = threading.Lock()
+_client_pool = {}
+_collection_pool = {}
+_client_servers = {}
+
+def configure_pool(ttl=None):
+    """Sets the pool TTL in seconds. A TTL of 0 disables pooling."""
+    global POOL_TTL
+    if ttl is not None:
+        POOL_TTL = float(ttl)
+
+def clear_pool(host=None, port=None):
+    """Drops pooled handles, either for one server or for all of them."""
+    with _pool_lock:
+        for key in list(_client_pool):
+            if host is None or key == (host, port):
+                client, _ = _client_pool.pop(key)
+                _client_servers.pop(id(client), None)
+        for key in list(_collection_pool):
+            if host is None or key[:2] == (host, port):
+                del _collection_pool[key]
+
+def _pool_get(pool, key):
+    with _pool_lock:
+        entry = pool.get(key)
+        if entry is None:
+            return None
+        handle, created_at = entry
+        if POOL_TTL <= 0 or time.monotonic() - created_at > POOL_TTL:
+            del pool[key]
+            return None
+        return handle
+
+def is_connection_error(e):
+    """True when e looks like the server being unreachable (worth one retry on a fresh client)."""
+    # ChromaDB HTTP client can raise various exceptions (httpx, requests, etc.)
+    # so we catch broadly but check for connection-related keywords if not obvious
+    err_str = str(e).lower()
+    return isinstance(e, (ConnectionError, OSError)) or "connection" in err_str or "refused" in err_str
+
+def get_client(host=HOST, port=PORT, fresh=False, backend=None, path=None):
+    """
+    Returns a client for the Hive Mind.
+
+    The "http" backend (default) connects to the start_brain.sh server; the
+    "embedded" backend opens the persistent store at `path` (DATA_DIR by
+    default) in-process, for batch jobs that should not depend on the
+    server or pay HTTP serialization. Don't point it at a directory a
+    running server is using.
+
+    Clients are pooled per server/store for POOL_TTL seconds; pass
+    fresh=True to force a new connection and heartbeat.
+    """
+    backend = backend or BACKEND
+    if backend == "embedded":
+        key = ("embedded", path or DATA_DIR)
+    elif backend == "http":
+        key = (host, port)
+    else:
+        raise ValueError(f"Unknown brain backend: {backend} (expected one of {', '.join(BACKENDS)})")
+
+    if not fresh:
+        client = _pool_get(_client_pool, key)
+        if client is not None:
+            return client
+
+    if backend == "embedded":
+        os.makedirs(key[1], exist_ok=True)
+        client = chromadb.PersistentClient(path=key[1])
+    else:
+        try:
+            client = chromadb.HttpClient(host=host, port=port)
+            # Fast heartbeat check
+            client.heartbeat()
+        except Exception as e:
+            if is_connection_error(e):
+                print(f"Error connecting to Hive Mind at {host}:{port}. Is start_brain.sh running?")
+                print(f"Details: {e}")
+                return None
+            # If it's something else, re-raise
+            raise
+    if POOL_TTL > 0:
+        with _pool_lock:
+            stale = _client_pool.get(key)
+            if stale is not None:
+                _client_servers.pop(id(stale[0]), None)
+            _client_pool[key] = (client, time.monotonic())
+            _client_servers[id(client)] = key
+    return client
+
+def _reconnect(server):
+    if server[0] == "embedded":
+        return get_client(backend="embedded", path=server[1], fresh=True)
+    return get_client(*server, fresh=True, backend="http")
+
+def get_collection(client, collection_name=DEFAULT_COLLECTION):
+    """Resolves a collection handle, reusing the pooled one for pooled clients."""
+    with _pool_lock:
+        server = _client_servers.get(id(client))
+    if server is None:
+        return client.get_or_create_collection(name=collection_name)
+
+    key = server + (collection_name,)
+    collection = _pool_get(_collection_pool, key)
+    if collection is None:
+        collection = client.get_or_create_collection(name=collection_name)
+        with _pool_lock:
+            _collection_pool[key] = (collection, time.monotonic())
+    return collection
+
+def _with_collection(client, collection_name, operation):
+    """
+    Runs operation(collection) on the pooled handle. On a connection error
+    the server's pool entries are dropped and the call is retried once on
+    a fresh client.
+    """
     try:
-        client = chromadb.HttpClient(host=HOST, port=PORT)
-        # Fast heartbeat check
-        client.heartbeat()
-        return client
+        return operation(get_collection(client, collection_name))
     except Exception as e:
-        # ChromaDB HTTP client can raise various exceptions (httpx, requests, etc.)
-        # so we catch broadly but check for connection-related keywords if not obvious
-        err_str = str(e).lower()
-        if isinstance(e, (ConnectionError, OSError)) or "connection" in err_str or "refused" in err_str:
-            print(f"Error connecting to Hive Mind at {HOST}:{PORT}. Is start_brain.sh running?")
-            print(f"Details: {e}")
-            return None
-        # If it's something else, re-raise
-        raise
+        with _pool_lock:
+            server = _client_servers.get(id(client))
+        if server is None or not is_connection_error(e):
+            raise
+        clear_pool(*server)
+        fresh_client = _reconnect(server)
+        if fresh_client is None:
+            raise
+        return operation(get_collection(fresh_client, collection_name))
+
+class RecallCache:
+    """
+    LRU cache of recall results with TTL expiry.
 
-def add_memory(client, content, metadata=None, collection_name=DEFAULT_COLLECTION):
+    Keyed on (collection, query, n_results, where, where_document); every
+    write to a collection drops that collection's entries.
+    """
+
+    def __init__(self, max_entries=256, ttl=300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(collection_name, query, n_results, where, where_document, mode="vector"):
+        return (
+            collection_name,
+            query,
+            n_results,
+            json.dumps(where, sort_keys=True),
+            json.dumps(where_document, sort_keys=True),
+            mode,
+        )
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] > self.ttl:
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[0])
+
+    def put(self, key, results):
+        with self._lock:
+            self._entries[key] = (copy.deepcopy(results), time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, collection_name):
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == collection_name]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+            }
+
+_recall_cache = None
+
+def enable_recall_cache(max_entries=256, ttl=300.0):
+    """Turns on the opt-in recall result cache for this process."""
+    global _recall_cache
+    _recall_cache = RecallCache(max_entries=max_entries, ttl=ttl)
+    return _recall_cache
+
+def disable_recall_cache():
+    global _recall_cache
+    _recall_cache = None
+
+def recall_cache_stats():
+    """Returns hit/miss counters, or None when the cache is disabled."""
+    return _recall_cache.stats() if _recall_cache is not None else None
+
+_embedding_cache = None
+_embedding_function = None
+
+def enable_embedding_cache(directory=None, embedding_function=None):
+    """
+    Embeds locally through an on-disk cache and hands Chroma precomputed
+    vectors, so repeated documents and queries skip the model entirely.
+
+    The embedding function must match the one the collections were built
+    with; the default is Chroma's own default (all-MiniLM-L6-v2).
+    """
+    global _embedding_cache, _embedding_function
+    from brain.lib.embedding_cache import EmbeddingCache
+    if embedding_function is None:
+        from chromadb.utils import embedding_functions
+        embedding_function = embedding_functions.DefaultEmbeddingFunction()
+    if directory is None:
+        # One cache per model so vectors from different models never mix
+        directory = os.path.join(STATE_DIR, "embeddings", type(embedding_function).__name__)
+    _embedding_function = embedding_function
+    _embedding_cache = EmbeddingCache(directory)
+    return _embedding_cache
+
+def disable_embedding_cache():
+    global _embedding_cache, _embedding_function
+    _embedding_cache = None
+    _embedding_function = None
+
+def embedding_cache_stats():
+    """Returns hit/miss counters, or None when the cache is disabled."""
+    return _embedding_cache.stats() if _embedding_cache is not None else None
+
+def embed(texts):
+    """
+    Returns embeddings for texts through the embedding cache, computing only
+    the misses; None when the cache is disabled and Chroma embeds instead.
+    """
+    if _embedding_cache is None:
+        return None
+    vectors = _embedding_cache.get_many(texts)
+    missing = [i for i, v in enumerate(vectors) if v is None]
+    if missing:
+        computed = _embedding_function([texts[i] for i in missing])
+        _embedding_cache.put_many([texts[i] for i in missing], computed)
+        for i, vector in zip(missing, computed):
+            vectors[i] = [float(x) for x in vector]
+    return vectors
+
+RECALL_MODES = ("vector", "keyword", "hybrid")
+# Candidates pulled from each ranking before reciprocal rank fusion
+HYBRID_OVERFETCH = 2
+_lexical_index = None
+
+def enable_lexical_index(path=None):
+    """
+    Maintains a local BM25 index alongside add_memory, enabling
+    recall(mode="keyword") and recall(mode="hybrid"). Existing memories can
+    be backfilled with rebuild_lexical_index().
+    """
+    global _lexical_index
+    from brain.lib.lexical import LexicalIndex
+    _lexical_index = LexicalIndex(path or lexical_index_path())
+    return _lexical_index
+
+def lexical_index_path():
+    return os.path.join(STATE_DIR, "lexical.sqlite3")
+
+def enable_lexical_index_if_built():
+    """
+    Keeps an existing BM25 index current without creating one, so writers
+    that call it never leave keyword and hybrid recall a stale subset.
+    """
+    if _lexical_index is None and os.path.exists(lexical_index_path()):
+        enable_lexical_index()
+    return _lexical_index
+
+def lexical_index_counts(client, collection_name=DEFAULT_COLLECTION):
+    """Returns (indexed, stored) memory counts; they differ when the BM25 index is stale."""
+    stored = sum(_fan_out(client, partitions_for_query(collection_name), lambda c: c.count()))
+    return _lexical_index.count(collection_name), stored
+
+def disable_lexical_index():
+    global _lexical_index
+    if _lexical_index is not None:
+        _lexical_index.close()
+    _lexical_index = None
+
+def rebuild_lexical_index(client, collection_name=DEFAULT_COLLECTION, page_size=500):
+    """Backfills the BM25 index from a collection, page by page. Returns the count."""
+    if _lexical_index is None:
+        enable_lexical_index()
+    indexed = 0
+    # Partitions are indexed under their logical collection name
+    for _, page in iter_pages(client, collection_name, page_size):
+        _lexical_index.add(collection_name, page["ids"], page["documents"], page["metadatas"])
+        indexed += len(page["ids"])
+    return indexed
+
+# Optional partitioning: route writes to per-project and/or per-year
+# sub-collections ("hive_mind__p_dotfiles__y_2025") so filtered recalls only
+# search the partitions their filter can match. Set with configure_partitions()
+# or BRAIN_PARTITION_BY=project,year.
+PARTITION_SCHEMES = ("project", "year")
+PARTITION_BY = ()
+# Max partitions queried concurrently during a fan-out recall
+PARTITION_FANOUT_WORKERS = 8
+_partition_lock = threading.Lock()
+_partition_registry = None
+_partition_registry_stamp = None
+
+def configure_partitions(by=()):
+    """Enables partitioning by "project", "year" or both; an empty value disables it."""
+    global PARTITION_BY
+    if isinstance(by, str):
+        by = [part.strip() for part in by.split(",") if part.strip()]
+    unknown = [part for part in by if part not in PARTITION_SCHEMES]
+    if unknown:
+        raise ValueError(f"Unknown partition scheme(s): {', '.join(unknown)}")
+    PARTITION_BY = tuple(part for part in PARTITION_SCHEMES if part in by)
+
+def partitioning_enabled():
+    return bool(PARTITION_BY)
+
+def _registry_path():
+    return os.path.join(STATE_DIR, "partitions.json")
+
+def _registry_stamp(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return (path, None)
+    return (path, st.st_mtime_ns, st.st_size)
+
+def _load_registry(force=False):
+    """
+    Partition registry: {base: {partition: {"project_context": ..., "year": ...}}}.
+
+    Other processes (the daemon, ingest.py) add partitions too, so the file
+    is re-read whenever its mtime or size changes. Call with _partition_lock held.
+    """
+    global _partition_registry, _partition_registry_stamp
+    path = _registry_path()
+    stamp = _registry_stamp(path)
+    if force or _partition_registry is None or stamp != _partition_registry_stamp:
+        registry = {}
+        if stamp[1] is not None:
+            with open(path, "r", encoding="utf-8") as f:
+                registry = json.load(f)
+        _partition_registry, _partition_registry_stamp = registry, stamp
+    return _partition_registry
+
+def register_partition(base, name, values):
+    """Records a partition of `base` and its routing values in the shared registry file."""
+    with _partition_lock:
+        if name in _load_registry().get(base, {}):
+            return
+        os.makedirs(STATE_DIR, exist_ok=True)
+        with open(_registry_path() + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                # Merge into what is on disk now, not our cached copy
+                registry = _load_registry(force=True)
+                if name in registry.get(base, {}):
+                    return
+                registry.setdefault(base, {})[name] = values
+                tmp_path = f"{_registry_path()}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(registry, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, _registry_path())
+                _load_registry(force=True)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+def _slug(value):
+    # Chroma collection names allow [A-Za-z0-9._-]
+    return re.sub(r"[^A-Za-z0-9_-]+", "-", str(value)).strip("-_") or "none"
+
+def _metadata_year(metadata):
+    year = metadata.get("year")
+    if isinstance(year, int):
+        return year
+    timestamp = str(metadata.get("timestamp") or "")
+    if len(timestamp) >= 4 and timestamp[:4].isdigit():
+        return int(timestamp[:4])
+    return None
+
+def partition_for(collection_name, metadata):
+    """Returns (partition name, routing values) for one memory's metadata."""
+    parts = [collection_name]
+    values = {}
+    if "project" in PARTITION_BY:
+        project = metadata.get("project_context") or "none"
+        parts.append(f"p_{_slug(project)}")
+        values["project_context"] = project
+    if "year" in PARTITION_BY:
+        year = _metadata_year(metadata)
+        parts.append(f"y_{year if year is not None else 'unknown'}")
+        values["year"] = year
+    return "__".join(parts), values
+
+def _partition_may_match(values, where):
+    """False only when the filter provably excludes every memory in the partition."""
+    from brain.lib.lexical import matches_where
+    for key, condition in (where or {}).items():
+        if key == "$and":
+            if not all(_partition_may_match(values, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(_partition_may_match(values, clause) for clause in condition):
+                return False
+        elif key in values and values[key] is not None:
+            if not matches_where({key: values[key]}, {key: condition}):
+                return False
+    return True
+
+def partitions_for_query(collection_name, where=None):
+    """Physical collections a recall must search: the base plus matching partitions."""
+    if not PARTITION_BY:
+        return [collection_name]
+    with _partition_lock:
+        partitions = dict(_load_registry().get(collection_name, {}))
+    # The base collection holds anything written before partitioning was enabled
+    return [collection_name] + sorted(
+        name for name, values in partitions.items() if _partition_may_match(values, where)
+    )
+
+def merge_query_results(results, n_results):
+    """Merges per-partition query results into one top-k by distance, per query row."""
+    rows = max((len(r.get("ids") or []) for r in results), default=0)
+    merged = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+    for row in range(rows):
+        hits = []
+        for r in results:
+            ids = r["ids"][row]
+            distances = (r.get("distances") or [[]] * rows)[row] or [None] * len(ids)
+            for i, doc_id in enumerate(ids):
+                hits.append((distances[i] if distances[i] is not None else float("inf"),
+                             doc_id, r["documents"][row][i], r["metadatas"][row][i], distances[i]))
+        hits.sort(key=lambda hit: hit[0])
+        hits = hits[:n_results]
+        merged["ids"].append([h[1] for h in hits])
+        merged["documents"].append([h[2] for h in hits])
+        merged["metadatas"].append([h[3] for h in hits])
+        merged["distances"].append([h[4] for h in hits])
+    return merged
+
+def _fan_out(client, names, operation):
+    if len(names) == 1:
+        return [_with_collection(client, names[0], operation)]
+    with ThreadPoolExecutor(max_workers=min(PARTITION_FANOUT_WORKERS, len(names))) as pool:
+        return list(pool.map(lambda name: _with_collection(client, name, operation), names))
+
+if os.environ.get("BRAIN_PARTITION_BY"):
+    configure_partitions(os.environ["BRAIN_PARTITION_BY"])
+
+def memory_id(content, conversation_id=None):
+    """
+    Returns a deterministic ID for a memory: the conversation ID plus a hash
+    of the content, so re-ingesting the same pair always maps to the same ID.
+    """
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+    if conversation_id:
+        return f"{conversation_id}:{digest}"
+    return digest
+
+def add_memory(client, content, metadata=None, collection_name=DEFAULT_COLLECTION, collection=None, ids=None,
+               upsert=False):
     """
     Adds a memory to the brain.
 
@@ -36,12 +522,42 @@ def add_memory(client, content, metadata=None, collection_name=DEFAULT_COLLECTIO
         metadata: Dict or list of dicts. If a single dict is provided with a list
                   of content, it will be replicated for each document.
         collection_name: Target collection
+        collection: Optional pre-resolved collection handle (skips the lookup)
+        ids: Optional ID or list of IDs (see memory_id). Random UUIDs otherwise.
+        upsert: Overwrite memories whose ID already exists (add() silently keeps the old one)
     """
+    content, metadata, ids = normalize_batch(content, metadata, ids)
+    embeddings = embed(content)
+
+    def _adder(rows):
+        def _add(target):
+            write = target.upsert if upsert else target.add
+            write(
+                documents=[content[i] for i in rows],
+                metadatas=[metadata[i] for i in rows],
+                ids=[ids[i] for i in rows],
+                embeddings=[embeddings[i] for i in rows] if embeddings is not None else None
+            )
+        return _add
+
+    all_rows = range(len(content))
+    if collection is not None:
+        _adder(all_rows)(collection)
+        collection_name = collection.name
+    elif PARTITION_BY:
+        for name, (values, rows) in route_partitions(collection_name, metadata).items():
+            _with_collection(client, name, _adder(rows))
+            register_partition(collection_name, name, values)
+    else:
+        _with_collection(client, collection_name, _adder(all_rows))
+    after_write(collection_name, ids, content, metadata)
+    return ids
+
+def normalize_batch(content, metadata, ids):
+    """Normalizes add_memory arguments to parallel lists of documents, metadatas and IDs."""
     if metadata is None:
         metadata = {}
 
-    collection = client.get_or_create_collection(name=collection_name)
-
     # Normalize to lists
     if isinstance(content, str):
         content = [content]
@@ -50,17 +566,33 @@ def add_memory(client, content, metadata=None, collection_name=DEFAULT_COLLECTIO
         # Replicate single metadata dict for each document
         metadata = [metadata.copy() for _ in content]
 
-    # Generate UUIDs
-    ids = [str(uuid.uuid4()) for _ in content]
+    if ids is None:
+        # Generate UUIDs
+        ids = [str(uuid.uuid4()) for _ in content]
+    elif isinstance(ids, str):
+        ids = [ids]
+    return content, metadata, ids
 
-    collection.add(
-        documents=content,
-        metadatas=metadata,
-        ids=ids
-    )
-    return ids
+def route_partitions(collection_name, metadata):
+    """Groups row indexes by partition: {partition: (routing values, rows)}."""
+    routes = {}
+    for i in range(len(metadata)):
+        name, values = partition_for(collection_name, metadata[i])
+        if "year" in PARTITION_BY and values["year"] is not None:
+            # Stored so year filters also work inside a partition
+            metadata[i] = dict(metadata[i], year=values["year"])
+        routes.setdefault(name, (values, []))[1].append(i)
+    return routes
 
-def recall(client, query, n_results=5, where=None, where_document=None, collection_name=DEFAULT_COLLECTION):
+def after_write(collection_name, ids, content, metadata):
+    """Keeps the lexical index and recall cache in step with a completed write."""
+    if _lexical_index is not None:
+        _lexical_index.add(collection_name, ids, content, metadata)
+    if _recall_cache is not None:
+        _recall_cache.invalidate(collection_name)
+
+def recall(client, query, n_results=5, where=None, where_document=None, collection_name=DEFAULT_COLLECTION,
+           mode="vector"):
     """
     Retrieves memories from the brain.
     
@@ -69,19 +601,191 @@ def recall(client, query, n_results=5, where=None, where_document=None, collecti
         query: Search string
         n_results: Max results
         where: Metadata filter (e.g. {"source": "project_alpha"})
+        mode: "vector" (default), "keyword" (local BM25 only, no embedding)
+              or "hybrid" (BM25 and vector rankings fused with RRF).
+              The last two need enable_lexical_index().
         
     Returns:
         Query results dictionary
     """
-    collection = client.get_or_create_collection(name=collection_name)
-    results = collection.query(
-        query_texts=[query],
-        n_results=n_results,
-        where=where,
-        where_document=where_document
-    )
+    check_recall_mode(mode)
+    cache_key, cached = recall_cache_lookup(collection_name, query, n_results, where, where_document, mode)
+    if cached is not None:
+        return cached
+
+    if mode == "keyword":
+        results = keyword_recall(collection_name, query, n_results, where, where_document)
+    elif mode == "hybrid":
+        results = _hybrid_recall(client, query, n_results, where, where_document, collection_name)
+    else:
+        results = _vector_recall(client, query, n_results, where, where_document, collection_name)
+
+    recall_cache_store(cache_key, results)
+    return results
+
+def check_recall_mode(mode):
+    """Raises unless `mode` is a recall mode this process can serve."""
+    if mode not in RECALL_MODES:
+        raise ValueError(f"Unknown recall mode: {mode} (expected one of {', '.join(RECALL_MODES)})")
+    if mode != "vector" and _lexical_index is None:
+        raise RuntimeError(f"recall(mode={mode!r}) needs the lexical index; call enable_lexical_index()")
+
+def recall_cache_lookup(collection_name, query, n_results, where, where_document, mode):
+    """Returns (cache key, cached results); the key is None when the recall cache is disabled."""
+    if _recall_cache is None:
+        return None, None
+    key = RecallCache.make_key(collection_name, query, n_results, where, where_document, mode)
+    return key, _recall_cache.get(key)
+
+def recall_cache_store(key, results):
+    """Stores results under a key from recall_cache_lookup (a no-op for None)."""
+    if key is not None and _recall_cache is not None:
+        _recall_cache.put(key, results)
+
+def lexical_search(collection_name, query, n_results, where=None, where_document=None):
+    """BM25 hits from the local lexical index as (id, score, document, metadata)."""
+    return _lexical_index.search(collection_name, query, n_results, where, where_document)
+
+def keyword_recall(collection_name, query, n_results, where=None, where_document=None):
+    """recall(mode="keyword") without the cache: a local BM25 lookup, no server round trip."""
+    hits = lexical_search(collection_name, query, n_results, where, where_document)
+    return _as_results([(doc_id, doc, meta, None, score) for doc_id, score, doc, meta in hits])
+
+# Query result fields that hold one list per query text
+_PER_QUERY_KEYS = ("ids", "documents", "metadatas", "distances", "embeddings", "uris", "data")
+
+def recall_many(client, queries, n_results=5, where=None, where_document=None,
+                collection_name=DEFAULT_COLLECTION, mode="vector"):
+    """
+    Recalls several queries that share the same filters. In vector mode the
+    uncached queries go to the server as one batched query.
+
+    Returns one result dict per query, in input order, each shaped like the
+    return value of recall().
+    """
+    if mode != "vector":
+        return [recall(client, q, n_results, where, where_document, collection_name, mode) for q in queries]
+
+    results = [None] * len(queries)
+    keys = [None] * len(queries)
+    for i, query in enumerate(queries):
+        keys[i], results[i] = recall_cache_lookup(collection_name, query, n_results, where, where_document, mode)
+
+    pending = [i for i, r in enumerate(results) if r is None]
+    if pending:
+        batch = _vector_recall(client, [queries[i] for i in pending], n_results, where, where_document,
+                               collection_name)
+        for row, i in enumerate(pending):
+            # Split the batched response back into single-query result dicts
+            results[i] = {
+                key: ([value[row]] if key in _PER_QUERY_KEYS and value is not None else value)
+                for key, value in batch.items()
+            }
+            recall_cache_store(keys[i], results[i])
     return results
 
+def _vector_recall(client, query, n_results, where, where_document, collection_name):
+    queries = [query] if isinstance(query, str) else list(query)
+    embeddings = embed(queries)
+    search = {"query_embeddings": embeddings} if embeddings is not None else {"query_texts": queries}
+
+    def _query(collection):
+        return collection.query(
+            n_results=n_results,
+            where=where,
+            where_document=where_document,
+            **search
+        )
+
+    if PARTITION_BY:
+        partitions = partitions_for_query(collection_name, where)
+        return merge_query_results(_fan_out(client, partitions, _query), n_results)
+    return _with_collection(client, collection_name, _query)
+
+def _hybrid_recall(client, query, n_results, where, where_document, collection_name):
+    fetch = n_results * HYBRID_OVERFETCH
+    vector = _vector_recall(client, query, fetch, where, where_document, collection_name)
+    lexical = lexical_search(collection_name, query, fetch, where, where_document)
+    return fuse_hybrid(vector, lexical, n_results)
+
+def fuse_hybrid(vector, lexical, n_results):
+    """Fuses a vector query result and BM25 hits with reciprocal rank fusion."""
+    from brain.lib.lexical import reciprocal_rank_fusion
+    entries = {}
+    vector_ids = vector.get("ids", [[]])[0]
+    distances = (vector.get("distances") or [[]])[0]
+    for i, doc_id in enumerate(vector_ids):
+        entries[doc_id] = [vector["documents"][0][i], vector["metadatas"][0][i],
+                           distances[i] if i < len(distances) else None]
+    for doc_id, _, document, metadata in lexical:
+        entries.setdefault(doc_id, [document, metadata, None])
+
+    fused = reciprocal_rank_fusion([vector_ids, [hit[0] for hit in lexical]])[:n_results]
+    return _as_results([(doc_id, *entries[doc_id], score) for doc_id, score in fused])
+
+def _as_results(entries):
+    """Shapes (id, document, metadata, distance, score) tuples like a Chroma query result."""
+    return {
+        "ids": [[e[0] for e in entries]],
+        "documents": [[e[1] for e in entries]],
+        "metadatas": [[e[2] for e in entries]],
+        "distances": [[e[3] for e in entries]],
+        "scores": [[e[4] for e in entries]],
+    }
+
+def get_memories(client, ids=None, where=None, collection_name=DEFAULT_COLLECTION):
+    """Fetches memories by ID and/or metadata filter without a vector search."""
+    def _get(collection):
+        return collection.get(ids=ids, where=where, include=["documents", "metadatas"])
+
+    if PARTITION_BY:
+        merged = {"ids": [], "documents": [], "metadatas": []}
+        for part in _fan_out(client, partitions_for_query(collection_name, where), _get):
+            for key in merged:
+                merged[key].extend(part[key])
+        return merged
+    return _with_collection(client, collection_name, _get)
+
+def iter_pages(client, collection_name=DEFAULT_COLLECTION, page_size=500, include=("documents", "metadatas")):
+    """Yields (physical collection name, get() page) for every memory, partitions included."""
+    for physical in partitions_for_query(collection_name):
+        offset = 0
+        while True:
+            page = _with_collection(
+                client, physical,
+                lambda c: c.get(include=list(include), limit=page_size, offset=offset)
+            )
+            if not page["ids"]:
+                break
+            yield physical, page
+            offset += page_size
+
+def delete_memories(client, ids, collection_name=DEFAULT_COLLECTION, page_size=500):
+    """Deletes memories by ID in batches, keeping the lexical index and recall cache in sync."""
+    ids = list(ids)
+    for start in range(0, len(ids), page_size):
+        batch = ids[start:start + page_size]
+        # IDs missing from a partition are ignored by Chroma
+        _fan_out(client, partitions_for_query(collection_name), lambda c: c.delete(ids=batch))
+        if _lexical_index is not None:
+            _lexical_index.delete(collection_name, batch)
+    if _recall_cache is not None:
+        _recall_cache.invalidate(collection_name)
+    return len(ids)
+
+# Opt in from the environment, e.g. BRAIN_RECALL_CACHE_SIZE=256 BRAIN_RECALL_CACHE_TTL=300
+if int(os.environ.get("BRAIN_RECALL_CACHE_SIZE", "0") or 0) > 0:
+    enable_recall_cache(
+        max_entries=int(os.environ["BRAIN_RECALL_CACHE_SIZE"]),
+        ttl=float(os.environ.get("BRAIN_RECALL_CACHE_TTL", "300")),
+    )
+
+if os.environ.get("BRAIN_EMBEDDING_CACHE", "").lower() in ("1", "true", "yes"):
+    enable_embedding_cache()
+
+if os.environ.get("BRAIN_LEXICAL_INDEX", "").lower() in ("1", "true", "yes"):
+    enable_lexical_index()
+
 if __name__ == "__main__":
     # Simple test
     print("Testing connection...")
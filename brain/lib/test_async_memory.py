@@ -0,0 +1,110 @@
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+# Add brain root path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from brain.lib import async_memory, memory
+
+
+class TestAsyncMemory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_embedding_runs_off_the_event_loop(self):
+        threads = []
+
+        def embed(texts):
+            threads.append(threading.get_ident())
+            return [[1.0, 0.0] for _ in texts]
+
+        async def fake_with_collection(client, collection_name, operation):
+            return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+
+        memory.enable_embedding_cache(os.path.join(self.tmp.name, "embeddings"), embed)
+        self.addCleanup(memory.disable_embedding_cache)
+
+        async def run():
+            await async_memory.recall(object(), "query")
+            return threading.get_ident()
+
+        with mock.patch.object(async_memory, "_with_collection", fake_with_collection):
+            loop_thread = asyncio.run(run())
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], loop_thread)
+
+    def test_keyword_recall_checks_the_cache_once(self):
+        index = memory.enable_lexical_index(os.path.join(self.tmp.name, "lexical.sqlite3"))
+        self.addCleanup(memory.disable_lexical_index)
+        index.add(memory.DEFAULT_COLLECTION, ["a"], ["retry with backoff"], [{"type": "note"}])
+        cache = memory.enable_recall_cache()
+        self.addCleanup(memory.disable_recall_cache)
+
+        first = asyncio.run(async_memory.recall(None, "backoff", mode="keyword"))
+        second = asyncio.run(async_memory.recall(None, "backoff", mode="keyword"))
+        self.assertEqual(first["ids"], [["a"]])
+        self.assertEqual(second, first)
+        self.assertEqual((cache.stats()["misses"], cache.stats()["hits"]), (1, 1))
+
+    def test_registry_and_lexical_work_run_off_the_event_loop(self):
+        threads = {}
+        for name in ("register_partition", "after_write", "lexical_search"):
+            def record(*args, _name=name, **kwargs):
+                threads[_name] = threading.get_ident()
+                return []
+            patcher = mock.patch.object(memory, name, record)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        async def fake_with_collection(client, collection_name, operation):
+            return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+
+        memory.enable_lexical_index(os.path.join(self.tmp.name, "lexical.sqlite3"))
+        self.addCleanup(memory.disable_lexical_index)
+        saved = memory.PARTITION_BY
+        memory.configure_partitions("project")
+        self.addCleanup(setattr, memory, "PARTITION_BY", saved)
+
+        async def run():
+            await async_memory.add_memory(object(), "note", {"project_context": "p"},
+                                          collection_name="async_test")
+            await async_memory.recall(object(), "note", mode="hybrid", collection_name="async_test")
+            return threading.get_ident()
+
+        with mock.patch.object(async_memory, "_with_collection", fake_with_collection), \
+                mock.patch.object(memory, "partitions_for_query", return_value=["async_test"]):
+            loop_thread = asyncio.run(run())
+        self.assertEqual(set(threads), {"register_partition", "after_write", "lexical_search"})
+        self.assertNotIn(loop_thread, threads.values())
+
+    def test_add_memory_upsert_uses_collection_upsert(self):
+        calls = []
+
+        class Collection:
+            async def add(self, **kwargs):
+                calls.append("add")
+
+            async def upsert(self, **kwargs):
+                calls.append("upsert")
+
+        async def fake_with_collection(client, collection_name, operation):
+            return await operation(Collection())
+
+        async def run():
+            await async_memory.add_memory(object(), "a", ids="x")
+            await async_memory.add_memory(object(), "a", ids="x", upsert=True)
+
+        with mock.patch.object(async_memory, "_with_collection", fake_with_collection), \
+                mock.patch.object(memory, "PARTITION_BY", ()):
+            asyncio.run(run())
+        self.assertEqual(calls, ["add", "upsert"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Add brain root path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from brain.lib.embedding_cache import EmbeddingCache
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_round_trip_after_reload(self):
+        cache = EmbeddingCache(self.tmp.name)
+        cache.put_many(["x", "y"], [[1.0, 1.0], [2.0, 2.0]])
+        self.assertEqual(EmbeddingCache(self.tmp.name).get_many(["y", "x", "z"]),
+                         [[2.0, 2.0], [1.0, 1.0], None])
+
+    def test_two_instances_sharing_a_directory_get_distinct_rows(self):
+        a = EmbeddingCache(self.tmp.name)
+        b = EmbeddingCache(self.tmp.name)
+        a.put_many(["x"], [[1.0, 1.0]])
+        b.put_many(["y"], [[2.0, 2.0]])
+        a.put_many(["z"], [[3.0, 3.0]])
+
+        reloaded = EmbeddingCache(self.tmp.name)
+        self.assertEqual(reloaded.get_many(["x", "y", "z"]), [[1.0, 1.0], [2.0, 2.0], [3.0, 3.0]])
+        # Each instance also sees what the other wrote
+        self.assertEqual(a.get_many(["y"]), [[2.0, 2.0]])
+        self.assertEqual(b.get_many(["x", "z"]), [[1.0, 1.0], [3.0, 3.0]])
+
+    def test_torn_index_line_is_dropped_before_appending(self):
+        cache = EmbeddingCache(self.tmp.name)
+        cache.put_many(["x"], [[1.0, 1.0]])
+        with open(cache.index_path, "a", encoding="utf-8") as f:
+            f.write("deadbeef")
+        EmbeddingCache(self.tmp.name).put_many(["y"], [[2.0, 2.0]])
+        self.assertEqual(EmbeddingCache(self.tmp.name).get_many(["x", "y"]), [[1.0, 1.0], [2.0, 2.0]])
+
+
+if __name__ == "__main__":
+    unittest.main()
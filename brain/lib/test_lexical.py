@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+import unittest
+
+
+# Add brain root path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from brain.lib.lexical import LexicalIndex, matches_where, reciprocal_rank_fusion
+
+class TestLexicalIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = LexicalIndex(os.path.join(self.tmp.name, "lexical.sqlite3"))
+        self.index.add(
+            "hive_mind",
+            ["a", "b", "c"],
+            [
+                "Error: ECONNREFUSED when calling get_client on port 8000",
+                "Use UTC timestamps in API responses",
+                "Retry get_client with backoff after ECONNREFUSED ECONNREFUSED",
+            ],
+            [{"type": "error_log"}, {"type": "best_practice"}, {"type": "solution"}],
+        )
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def test_exact_term_lookup(self):
+        hits = self.index.search("hive_mind", "ECONNREFUSED", n_results=5)
+        self.assertEqual([h[0] for h in hits], ["c", "a"])
+
+    def test_where_filter_and_collection_scope(self):
+        hits = self.index.search("hive_mind", "get_client", n_results=5, where={"type": "error_log"})
+        self.assertEqual([h[0] for h in hits], ["a"])
+        self.assertEqual(self.index.search("other", "get_client"), [])
+
+    def test_reindex_replaces_postings(self):
+        self.index.add("hive_mind", ["b"], ["nothing relevant"], [{}])
+        self.assertEqual(self.index.search("hive_mind", "UTC"), [])
+        self.assertEqual(self.index.count("hive_mind"), 3)
+
+    def test_matches_where_operators(self):
+        meta = {"project_context": "dotfiles", "year": 2025}
+        self.assertTrue(matches_where(meta, {"$and": [{"project_context": "dotfiles"}, {"year": {"$gte": 2024}}]}))
+        self.assertFalse(matches_where(meta, {"project_context": {"$in": ["work"]}}))
+
+    def test_rrf_rewards_agreement(self):
+        fused = reciprocal_rank_fusion([["x", "y", "z"], ["y", "x"]])
+        self.assertEqual({fused[0][0], fused[1][0]}, {"x", "y"})
+        self.assertEqual(fused[-1][0], "z")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+import uuid
+
+# Add brain root path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import chromadb
+
+from brain.lib import memory
+
+# Topic words -> fixed directions, so distances are predictable without a model
+_AXES = ("git", "shell", "python")
+
+
+def _embed(texts):
+    vectors = []
+    for text in texts:
+        words = text.lower().split()
+        vectors.append([float(words.count(axis)) + 0.01 for axis in _AXES])
+    return vectors
+
+
+class PartitionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self._saved = (memory.STATE_DIR, memory.PARTITION_BY, memory._partition_registry,
+                       memory._partition_registry_stamp)
+        memory.STATE_DIR = self.tmp.name
+        memory._partition_registry = None
+        memory._partition_registry_stamp = None
+        memory.configure_partitions("project,year")
+
+    def tearDown(self):
+        (memory.STATE_DIR, memory.PARTITION_BY, memory._partition_registry,
+         memory._partition_registry_stamp) = self._saved
+
+
+class TestPartitionRegistry(PartitionTestCase):
+    def _write_registry(self, registry):
+        with open(memory._registry_path(), "w", encoding="utf-8") as f:
+            json.dump(registry, f)
+
+    def test_register_merges_partitions_added_by_other_processes(self):
+        memory.register_partition("hive", "hive__p_a", {"project_context": "a"})
+        # Another process registers B behind this process's cached copy
+        on_disk = json.load(open(memory._registry_path(), encoding="utf-8"))
+        on_disk["hive"]["hive__p_b"] = {"project_context": "b"}
+        self._write_registry(on_disk)
+        memory.register_partition("hive", "hive__p_c", {"project_context": "c"})
+
+        on_disk = json.load(open(memory._registry_path(), encoding="utf-8"))
+        self.assertEqual(sorted(on_disk["hive"]), ["hive__p_a", "hive__p_b", "hive__p_c"])
+
+    def test_queries_see_partitions_registered_elsewhere(self):
+        self.assertEqual(memory.partitions_for_query("hive"), ["hive"])
+        self._write_registry({"hive": {"hive__p_b": {"project_context": "b"}}})
+        self.assertEqual(memory.partitions_for_query("hive"), ["hive", "hive__p_b"])
+
+    def test_filters_prune_partitions(self):
+        self._write_registry({"hive": {
+            "hive__p_a__y_2024": {"project_context": "a", "year": 2024},
+            "hive__p_a__y_2025": {"project_context": "a", "year": 2025},
+            "hive__p_b__y_2025": {"project_context": "b", "year": 2025},
+            "hive__p_b__y_unknown": {"project_context": "b", "year": None},
+        }})
+        self.assertEqual(memory.partitions_for_query("hive", {"project_context": "a"}),
+                         ["hive", "hive__p_a__y_2024", "hive__p_a__y_2025"])
+        self.assertEqual(memory.partitions_for_query("hive", {"year": {"$gte": 2025}}),
+                         ["hive", "hive__p_a__y_2025", "hive__p_b__y_2025", "hive__p_b__y_unknown"])
+        self.assertEqual(
+            memory.partitions_for_query("hive", {"$and": [{"project_context": "b"}, {"year": 2024}]}),
+            ["hive", "hive__p_b__y_unknown"])
+        self.assertEqual(len(memory.partitions_for_query("hive", {"type": "note"})), 5)
+
+
+class TestMergeQueryResults(unittest.TestCase):
+    def test_top_k_by_distance_per_query_row(self):
+        a = {"ids": [["a1", "a2"], ["a3"]], "documents": [["A1", "A2"], ["A3"]],
+             "metadatas": [[{}, {}], [{}]], "distances": [[0.1, 0.5], [0.9]]}
+        b = {"ids": [["b1"], ["b2", "b3"]], "documents": [["B1"], ["B2", "B3"]],
+             "metadatas": [[{}], [{}, {}]], "distances": [[0.3], [0.2, 0.4]]}
+        merged = memory.merge_query_results([a, b], 2)
+        self.assertEqual(merged["ids"], [["a1", "b1"], ["b2", "b3"]])
+        self.assertEqual(merged["documents"], [["A1", "B1"], ["B2", "B3"]])
+        self.assertEqual(merged["distances"], [[0.1, 0.3], [0.2, 0.4]])
+
+
+class TestFanOutRecall(PartitionTestCase):
+    def setUp(self):
+        super().setUp()
+        memory.enable_embedding_cache(os.path.join(self.tmp.name, "embeddings"), _embed)
+        self.addCleanup(memory.disable_embedding_cache)
+        self.client = chromadb.EphemeralClient()
+        self.base = f"test_{uuid.uuid4().hex[:8]}"
+
+    def test_writes_are_routed_and_recall_merges_partitions(self):
+        memory.add_memory(
+            self.client,
+            ["git rebase tips", "shell quoting rules", "python packaging", "git bisect git"],
+            [{"project_context": "dotfiles", "timestamp": "2024-05-01"},
+             {"project_context": "dotfiles", "timestamp": "2025-01-01"},
+             {"project_context": "brain", "timestamp": "2025-02-01"},
+             {"project_context": "brain", "timestamp": "2025-03-01"}],
+            collection_name=self.base,
+            ids=["g1", "s1", "p1", "g2"],
+        )
+        partitions = memory.partitions_for_query(self.base)
+        self.assertEqual(len(partitions), 4)
+
+        results = memory.recall(self.client, "git", n_results=2, collection_name=self.base)
+        self.assertEqual(results["ids"], [["g1", "g2"]])
+
+        filtered = memory.recall(self.client, "git", n_results=2, collection_name=self.base,
+                                 where={"project_context": "dotfiles"})
+        self.assertEqual(filtered["ids"][0][0], "g1")
+        self.assertNotIn("g2", filtered["ids"][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
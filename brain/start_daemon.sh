@@ -0,0 +1,28 @@
+#!/usr/bin/env bash
+# dotfiles/brain/start_daemon.sh
+# Starts the resident Brain daemon (Unix socket) in the background
+set -euo pipefail
+
+BRAIN_DIR="$(cd "$(dirname "$0")" && pwd)"
+VENV_DIR="$BRAIN_DIR/.venv"
+SOCKET="${BRAIN_SOCKET:-$BRAIN_DIR/brain.sock}"
+LOG_FILE="$BRAIN_DIR/daemon.log"
+
+if [ ! -x "$VENV_DIR/bin/python3" ]; then
+    echo "Error: Brain virtualenv not found. Run start_brain.sh first." >&2
+    exit 1
+fi
+
+if [ -S "$SOCKET" ] && python3 "$BRAIN_DIR/lib/daemon_client.py" ping &> /dev/null; then
+    echo "Brain daemon already running on $SOCKET."
+    exit 0
+fi
+
+echo "Starting Brain daemon on $SOCKET..."
+# The recall cache is opt-in: it only sees writes made through this daemon, so
+# results written by ingest.py or over HTTP can be served stale for up to the TTL.
+nohup "$VENV_DIR/bin/python3" "$BRAIN_DIR/daemon.py" --socket "$SOCKET" \
+    --recall-cache "${BRAIN_RECALL_CACHE_SIZE:-0}" \
+    --recall-cache-ttl "${BRAIN_RECALL_CACHE_TTL:-300}" > "$LOG_FILE" 2>&1 &
+PID=$!
+echo "Brain daemon started with PID $PID. Logs at $LOG_FILE"
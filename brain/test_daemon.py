@@ -0,0 +1,45 @@
+import os
+import socket
+import sys
+import tempfile
+import unittest
+
+# Add brain root path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from brain import daemon
+
+
+class TestClearStaleSocket(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "brain.sock")
+
+    def _bind(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(sock.close)
+        sock.bind(self.path)
+        return sock
+
+    def test_live_socket_is_kept(self):
+        self._bind().listen(1)
+        self.assertFalse(daemon._clear_stale_socket(self.path))
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_stale_socket_is_removed(self):
+        self._bind()  # bound but not listening: connect() is refused
+        self.assertTrue(daemon._clear_stale_socket(self.path))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_missing_socket_is_fine(self):
+        self.assertTrue(daemon._clear_stale_socket(self.path))
+
+    def test_serve_refuses_to_replace_a_running_daemon(self):
+        self._bind().listen(1)
+        self.assertEqual(daemon.serve(self.path), 1)
+        self.assertTrue(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
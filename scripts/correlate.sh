@@ -72,7 +72,7 @@ validate_correlate_path() {
 }
 
 show_help() {
-    echo "Usage: $(basename "$0") {run|find-patterns|explain}"
+    echo "Usage: $(basename "$0") {run|matrix|lags|rolling|find-patterns|explain}"
     echo ""
     echo "Commands:"
     echo "  run <file1> <file2> [d1] [v1] [d2] [v2]"
@@ -80,9 +80,23 @@ show_help() {
     echo "       d1/v1: Date/Value column index for file 1 (0-based)"
     echo "       d2/v2: Date/Value column index for file 2 (0-based)"
     echo ""
+    echo "  matrix [--format tsv|json] [--method pearson|spearman|both] <file[:d:v]>..."
+    echo "       Correlation matrix across many datasets, aligned on shared dates."
+    echo "       Columns default to --d 1 --v 2; override per file with file:d:v."
+    echo ""
+    echo "  lags <file1> <file2> [--max-lag N] [--d1 N --v1 N --d2 N --v2 N]"
+    echo "       Correlate file1 on day t-lag with file2 on day t for lags 0..N (default 7)."
+    echo ""
+    echo "  rolling <file1> <file2> [--window DAYS] [--lag N] [--min-periods N]"
+    echo "       Correlation over a sliding window of days (default 30)."
+    echo ""
     echo "  find-patterns <file> [d] [v]"
     echo "       Find recurring patterns in a single dataset."
     echo ""
+    echo "  find-patterns --all [--config FILE] [--workers N] [--d N --v N] <file[:d:v]>..."
+    echo "       Summarise many datasets in one run and print a single JSON document."
+    echo "       FILE lists one dataset per line (relative to FILE's directory)."
+    echo ""
     echo "  explain <r|file>"
     echo "       Explain a correlation coefficient (r) or read it from a file."
 }
@@ -115,7 +129,143 @@ case "${1:-}" in
         correlate_two_datasets "$file1" "$file2" "$d1" "$v1" "$d2" "$v2"
         ;;
 
+    matrix)
+        shift
+        matrix_args=()
+        matrix_files=0
+        while [[ $# -gt 0 ]]; do
+            case "$1" in
+                --format|--method|--d|--v|--delimiter)
+                    if [[ -z "${2:-}" ]]; then
+                        echo "Error: $1 requires a value" >&2
+                        exit 1
+                    fi
+                    matrix_args+=("$1" "$2")
+                    shift 2
+                    ;;
+                *)
+                    # Strip an optional :date_col:value_col suffix before validating the path
+                    spec_path="$1"
+                    if [[ "$spec_path" =~ ^(.+):[0-9]+:[0-9]+$ ]]; then
+                        spec_path="${BASH_REMATCH[1]}"
+                    fi
+                    validate_correlate_path "$spec_path" || exit 1
+                    matrix_args+=("$1")
+                    matrix_files=$((matrix_files + 1))
+                    shift
+                    ;;
+            esac
+        done
+        if [[ "$matrix_files" -lt 2 ]]; then
+            echo "Error: At least two datasets required" >&2
+            echo "Usage: $(basename "$0") matrix <file1> <file2> [file...]" >&2
+            exit 1
+        fi
+
+        correlation_matrix "${matrix_args[@]}"
+        ;;
+
+    lags|rolling)
+        command="$1"
+        shift
+        pair_args=()
+        pair_files=()
+        while [[ $# -gt 0 ]]; do
+            case "$1" in
+                --d1|--v1|--d2|--v2|--max-lag|--min-lag|--window|--lag|--min-periods)
+                    validate_numeric "${2:-}" "$1" || exit 1
+                    pair_args+=("$1" "$2")
+                    shift 2
+                    ;;
+                --format|--delimiter)
+                    if [[ -z "${2:-}" ]]; then
+                        echo "Error: $1 requires a value" >&2
+                        exit 1
+                    fi
+                    pair_args+=("$1" "$2")
+                    shift 2
+                    ;;
+                *)
+                    validate_correlate_path "$1" || exit 1
+                    pair_files+=("$1")
+                    shift
+                    ;;
+            esac
+        done
+        if [[ "${#pair_files[@]}" -ne 2 ]]; then
+            echo "Error: Exactly two datasets required" >&2
+            echo "Usage: $(basename "$0") $command <file1> <file2> [options]" >&2
+            exit 1
+        fi
+
+        "correlation_$command" "${pair_files[@]}" "${pair_args[@]}"
+        ;;
+
     find-patterns)
+        if [[ "${2:-}" == "--all" ]]; then
+            shift 2
+            all_args=()
+            all_datasets=0
+            while [[ $# -gt 0 ]]; do
+                case "$1" in
+                    --d|--v|--workers)
+                        validate_numeric "${2:-}" "$1" || exit 1
+                        all_args+=("$1" "$2")
+                        shift 2
+                        ;;
+                    --delimiter)
+                        if [[ -z "${2:-}" ]]; then
+                            echo "Error: $1 requires a value" >&2
+                            exit 1
+                        fi
+                        all_args+=("$1" "$2")
+                        shift 2
+                        ;;
+                    --config)
+                        config="${2:-}"
+                        validate_correlate_path "$config" || exit 1
+                        config_dir="$(cd "$(dirname "$config")" && pwd)"
+                        # Hold listed datasets to the same directory rules as direct arguments
+                        while IFS= read -r line || [[ -n "$line" ]]; do
+                            spec="${line%%#*}"
+                            spec="${spec#"${spec%%[![:space:]]*}"}"
+                            spec="${spec%"${spec##*[![:space:]]}"}"
+                            [[ -z "$spec" ]] && continue
+                            if [[ "$spec" =~ ^(.+):[0-9]+:[0-9]+$ ]]; then
+                                spec="${BASH_REMATCH[1]}"
+                            fi
+                            spec="${spec/#\~/$HOME}"
+                            [[ "$spec" != /* ]] && spec="$config_dir/$spec"
+                            if [[ -f "$spec" ]]; then
+                                validate_correlate_path "$spec" || exit 1
+                            fi
+                            all_datasets=$((all_datasets + 1))
+                        done < "$config"
+                        all_args+=("$1" "$config")
+                        shift 2
+                        ;;
+                    *)
+                        spec_path="$1"
+                        if [[ "$spec_path" =~ ^(.+):[0-9]+:[0-9]+$ ]]; then
+                            spec_path="${BASH_REMATCH[1]}"
+                        fi
+                        validate_correlate_path "$spec_path" || exit 1
+                        all_args+=("$1")
+                        all_datasets=$((all_datasets + 1))
+                        shift
+                        ;;
+                esac
+            done
+            if [[ "$all_datasets" -lt 1 ]]; then
+                echo "Error: At least one dataset required" >&2
+                echo "Usage: $(basename "$0") find-patterns --all [--config FILE] <file>..." >&2
+                exit 1
+            fi
+
+            find_patterns_all "${all_args[@]}"
+            exit $?
+        fi
+
         if [[ -z "${2:-}" ]]; then
             echo "Error: File required" >&2
             exit 1
@@ -3,8 +3,14 @@ import sys
 import math
 import argparse
 import csv
+import hashlib
+import json
+import mmap
 import os
-from datetime import datetime
+import struct
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
 
 def calculate_pearson(x, y):
     n = len(x)
@@ -26,35 +32,246 @@ def calculate_pearson(x, y):
         return 0.0
     return numerator / denominator
 
-def load_dataset(filepath, date_col, value_col, delimiter='|'):
-    if not os.path.exists(filepath):
-        print(f"Error: File not found: {filepath}", file=sys.stderr)
-        sys.exit(1)
+# Parsed datasets are cached as binary columns: the per-day accumulators
+# (int64 count; float64 sum, sum of squares, min, max) then int32 date
+# ordinals. Entries are keyed on the source path, columns and delimiter, and
+# stamped with the source's size, mtime and inode so any edit invalidates
+# them. Each entry also records the byte offset its accumulators cover and a
+# digest of every byte before it, which is what resumable mode checks.
+# Columns are read as memoryview casts over the mmap, so the 8-byte columns
+# come first after a 72-byte header to keep every view aligned.
+CACHE_MAGIC = b'CORRCOL4'
+CACHE_HEADER = struct.Struct('<8sqqqqI20s8x')
+CACHE_COLUMNS = (('count', 'q'), ('total', 'd'), ('total_sq', 'd'), ('low', 'd'), ('high', 'd'), ('ordinals', 'i'))
+DIGEST_CHUNK = 1 << 20
+
+# Resumable mode trusts that sources only grow (logs that are appended to)
+# and folds just the bytes written since the cached offset into the cache.
+RESUME = os.environ.get('CORRELATE_RESUME') == '1'
+
+class DayStats:
+    """Streaming accumulator for one day's values."""
+
+    __slots__ = ('count', 'total', 'total_sq', 'low', 'high')
+
+    def __init__(self, count=0, total=0.0, total_sq=0.0, low=math.inf, high=-math.inf):
+        self.count = count
+        self.total = total
+        self.total_sq = total_sq
+        self.low = low
+        self.high = high
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.total_sq += value * value
+        if value < self.low:
+            self.low = value
+        if value > self.high:
+            self.high = value
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.low = min(self.low, other.low)
+        self.high = max(self.high, other.high)
+
+    @property
+    def mean(self):
+        return self.total / self.count
+
+def cache_dir():
+    configured = os.environ.get('CORRELATE_CACHE_DIR')
+    if configured:
+        return configured
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'dotfiles', 'correlate')
+
+def cache_enabled():
+    return os.environ.get('CORRELATE_CACHE', '1') != '0'
+
+def _cache_path(filepath, date_col, value_col, delimiter):
+    key = f"{os.path.realpath(filepath)}|{date_col}|{value_col}|{delimiter}|{sys.byteorder}"
+    return os.path.join(cache_dir(), hashlib.sha1(key.encode('utf-8')).hexdigest() + '.bin')
 
-    data = {}
-    with open(filepath, 'r') as f:
-        reader = csv.reader(f, delimiter=delimiter)
-        for row in reader:
+def _source_stamp(filepath):
+    st = os.stat(filepath)
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+def _prefix_digest(filepath, offset):
+    """sha1 of the first `offset` bytes, read in chunks (hashing is far cheaper than re-parsing)."""
+    digest = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        remaining = offset
+        while remaining > 0:
+            chunk = f.read(min(remaining, DIGEST_CHUNK))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.digest()
+
+def read_column_cache(filepath, date_col, value_col, delimiter='|'):
+    """
+    Returns the cache entry for filepath as a dict with the source 'stamp',
+    the 'offset' and 'digest' of the bytes folded in, and one memoryview per
+    CACHE_COLUMNS name cast straight over the mapped file (no copy); None when
+    there is no readable entry. The mapping lives as long as the views do.
+    """
+    try:
+        with open(_cache_path(filepath, date_col, value_col, delimiter), 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, size, mtime_ns, ino, offset, count, digest = CACHE_HEADER.unpack_from(mm)
+        if magic != CACHE_MAGIC:
+            mm.close()
+            return None
+        entry = {'stamp': (size, mtime_ns, ino), 'offset': offset, 'digest': digest}
+        view = memoryview(mm)
+        position = CACHE_HEADER.size
+        for name, typecode in CACHE_COLUMNS:
+            width = struct.calcsize(typecode) * count
+            if position + width > len(view):
+                return None
+            entry[name] = view[position:position + width].cast(typecode)
+            position += width
+        return entry
+    except (OSError, ValueError, struct.error):
+        return None
+
+def write_column_cache(filepath, date_col, value_col, stats, offset, stamp, delimiter='|'):
+    """
+    Writes {ordinal: DayStats} covering the first `offset` bytes of filepath;
+    failures only cost the next run a re-parse.
+    """
+    ordinals = sorted(stats)
+    path = _cache_path(filepath, date_col, value_col, delimiter)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        size, mtime_ns, ino = stamp
+        header = CACHE_HEADER.pack(CACHE_MAGIC, size, mtime_ns, ino, offset, len(ordinals),
+                                   _prefix_digest(filepath, offset))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, 'wb') as f:
+            f.write(header)
+            for name, typecode in CACHE_COLUMNS[:-1]:
+                f.write(array(typecode, (getattr(stats[o], name) for o in ordinals)).tobytes())
+            f.write(array('i', ordinals).tobytes())
+        os.replace(tmp, path)
+    except (OSError, OverflowError):
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+def to_ordinal(date_str):
+    """Ordinal for a canonical YYYY-MM-DD string, else None."""
+    if len(date_str) != 10 or date_str[4] != '-' or date_str[7] != '-':
+        return None
+    try:
+        return date(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:])).toordinal()
+    except ValueError:
+        return None
+
+def scan_dataset(filepath, date_col, value_col, delimiter='|', stats=None, offset=0):
+    """
+    Folds rows from byte `offset` onward into per-day DayStats keyed by date
+    string, so memory grows with the number of days rather than rows.
+
+    Rows on newline-terminated lines go into `stats`. An unterminated last
+    line may still be mid-write, so its row goes into a separate `pending`
+    dict that is never cached. Returns (stats, pending, end) where `end` is
+    the offset just past the last complete line.
+    """
+    stats = {} if stats is None else stats
+    pending = {}
+    position = {'end': offset, 'complete': True}
+
+    def lines(f):
+        for raw in f:
+            position['complete'] = raw.endswith(b'\n')
+            if position['complete']:
+                position['end'] += len(raw)
+            yield raw.decode('utf-8', errors='replace')
+
+    with open(filepath, 'rb') as f:
+        f.seek(offset)
+        for row in csv.reader(lines(f), delimiter=delimiter):
             if len(row) > max(date_col, value_col):
                 try:
                     # Simple date normalization
-                    date_str = row[date_col].split(' ')[0] 
+                    date_str = row[date_col].split(' ')[0]
                     value = float(row[value_col])
-                    
-                    # Handle multiple entries per day by averaging? 
-                    # For now, let's just append to list and process later
-                    if date_str not in data:
-                        data[date_str] = []
-                    data[date_str].append(value)
                 except ValueError:
                     continue
-    
-    # Average daily values
-    averaged_data = {}
-    for date, values in data.items():
-        averaged_data[date] = sum(values) / len(values)
-        
-    return averaged_data
+                target = stats if position['complete'] else pending
+                day = target.get(date_str)
+                if day is None:
+                    day = target[date_str] = DayStats()
+                day.add(value)
+    return stats, pending, position['end']
+
+def _load(filepath, date_col, value_col, delimiter):
+    """
+    Returns (data, days): data is {date_str: daily mean} when the file was
+    scanned (None on a full cache hit), days is {ordinal: daily mean}.
+    """
+    if not os.path.exists(filepath):
+        print(f"Error: File not found: {filepath}", file=sys.stderr)
+        sys.exit(1)
+
+    stamp = _source_stamp(filepath)
+    cached = read_column_cache(filepath, date_col, value_col, delimiter) if cache_enabled() else None
+    if cached is not None and cached['stamp'] != stamp:
+        # Changed since caching; with RESUME, accept it if it only grew past the cached offset
+        if not (RESUME and stamp[0] >= cached['offset']
+                and _prefix_digest(filepath, cached['offset']) == cached['digest']):
+            cached = None
+
+    if cached is not None and cached['offset'] == stamp[0]:
+        return None, {o: total / count for o, count, total in
+                      zip(cached['ordinals'], cached['count'], cached['total'])}
+
+    stats = {}
+    start = 0
+    if cached is not None:
+        start = cached['offset']
+        for *values, o in zip(*(cached[name] for name, _ in CACHE_COLUMNS)):
+            stats[date.fromordinal(o).isoformat()] = DayStats(*values)
+    stats, pending, end = scan_dataset(filepath, date_col, value_col, delimiter, stats, start)
+
+    committed = {}
+    for date_str, day in stats.items():
+        ordinal = to_ordinal(date_str)
+        if ordinal is not None:
+            committed[ordinal] = day
+    # Files with non-ISO date keys are not cached: they would not round-trip through ordinals
+    stale = cached is None or end > start or cached['stamp'] != stamp
+    if cache_enabled() and stale and len(committed) == len(stats):
+        write_column_cache(filepath, date_col, value_col, committed, end, stamp, delimiter)
+
+    for date_str, day in pending.items():
+        if date_str in stats:
+            stats[date_str].merge(day)
+        else:
+            stats[date_str] = day
+    data = {date_str: day.mean for date_str, day in stats.items()}
+    days = {}
+    for date_str, mean in data.items():
+        ordinal = to_ordinal(date_str)
+        if ordinal is not None:
+            days[ordinal] = mean
+    return data, days
+
+def load_dataset(filepath, date_col, value_col, delimiter='|'):
+    data, days = _load(filepath, date_col, value_col, delimiter)
+    if data is None:
+        return {date.fromordinal(o).isoformat(): v for o, v in days.items()}
+    return data
+
+def load_days(filepath, date_col, value_col, delimiter='|'):
+    """Daily means keyed by date ordinal; rows whose date is not YYYY-MM-DD are dropped."""
+    return _load(filepath, date_col, value_col, delimiter)[1]
 
 def linear_regression_slope(xs, ys):
     n = len(xs)
@@ -68,19 +285,19 @@ def linear_regression_slope(xs, ys):
         return 0.0
     return num / den
 
-def patterns(file1, date_col=1, val_col=2, delimiter='|'):
+WEEKDAY_LABELS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+def pattern_summary(file1, date_col=1, val_col=2, delimiter='|'):
+    """Daily mean/min/max, trend and weekday averages for one dataset; None when it has no usable rows."""
     data = load_dataset(file1, date_col, val_col, delimiter=delimiter)
     if not data:
-        print("No usable data found.")
-        return
+        return None
 
     dates = sorted(data.keys())
     values = [data[d] for d in dates]
 
     count = len(values)
     mean_val = sum(values) / count
-    min_val = min(values)
-    max_val = max(values)
 
     # Weekday averages
     weekday_values = {i: [] for i in range(7)}  # Monday=0
@@ -101,20 +318,327 @@ def patterns(file1, date_col=1, val_col=2, delimiter='|'):
     else:
         trend = "decreasing"
 
+    weekdays = {}
+    for i, label in enumerate(WEEKDAY_LABELS):
+        vals = weekday_values[i]
+        weekdays[label] = {'mean': sum(vals) / len(vals), 'n': len(vals)} if vals else None
+
+    return {
+        'file': file1,
+        'days': count,
+        'first_date': dates[0],
+        'last_date': dates[-1],
+        'mean': mean_val,
+        'min': min(values),
+        'max': max(values),
+        'trend': trend,
+        'slope': slope,
+        'weekdays': weekdays,
+    }
+
+def patterns(file1, date_col=1, val_col=2, delimiter='|'):
+    summary = pattern_summary(file1, date_col, val_col, delimiter)
+    if summary is None:
+        print("No usable data found.")
+        return
+
     print(f"Patterns for {file1}")
-    print(f"Days: {count}")
-    print(f"Mean: {mean_val:.2f}  Min: {min_val:.2f}  Max: {max_val:.2f}")
-    print(f"Trend: {trend} (slope {slope:+.4f} per day)")
+    print(f"Days: {summary['days']}")
+    print(f"Mean: {summary['mean']:.2f}  Min: {summary['min']:.2f}  Max: {summary['max']:.2f}")
+    print(f"Trend: {summary['trend']} (slope {summary['slope']:+.4f} per day)")
     print("")
     print("By weekday:")
-    labels = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-    for i in range(7):
-        vals = weekday_values[i]
-        if vals:
-            avg = sum(vals) / len(vals)
-            print(f"  {labels[i]}: {avg:.2f} (n={len(vals)})")
+    for label, day in summary['weekdays'].items():
+        if day:
+            print(f"  {label}: {day['mean']:.2f} (n={day['n']})")
         else:
-            print(f"  {labels[i]}: N/A")
+            print(f"  {label}: N/A")
+
+def read_dataset_config(config_path):
+    """
+    Dataset specs from a config file: one path[:date_col:val_col] per line,
+    blank lines and # comments ignored. Relative paths are resolved against
+    the config file's directory.
+    """
+    base = os.path.dirname(os.path.abspath(config_path))
+    specs = []
+    with open(config_path, 'r') as f:
+        for line in f:
+            spec = line.split('#', 1)[0].strip()
+            if not spec:
+                continue
+            spec = os.path.expanduser(spec)
+            specs.append(spec if os.path.isabs(spec) else os.path.join(base, spec))
+    return specs
+
+def _init_worker(resume):
+    global RESUME
+    RESUME = resume
+
+def _summary_task(task):
+    path, date_col, val_col, delimiter = task
+    if not os.path.exists(path):
+        return {'file': path, 'error': 'File not found'}
+    try:
+        summary = pattern_summary(path, date_col, val_col, delimiter)
+    except (OSError, UnicodeError) as e:
+        return {'file': path, 'error': str(e)}
+    return summary if summary is not None else {'file': path, 'error': 'No usable data found'}
+
+def patterns_all(specs, date_col=1, val_col=2, delimiter='|', workers=1):
+    """
+    Pattern summaries for many datasets in one process, or fanned out over
+    `workers` processes, printed as a single JSON document. A dataset that
+    is missing or empty gets an "error" entry instead of stopping the run.
+    """
+    if not specs:
+        print("Error: patterns --all needs at least one dataset", file=sys.stderr)
+        sys.exit(1)
+    tasks = [parse_dataset_spec(spec, date_col, val_col) + (delimiter,) for spec in specs]
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                 initializer=_init_worker, initargs=(RESUME,)) as pool:
+            results = list(pool.map(_summary_task, tasks))
+    else:
+        results = [_summary_task(task) for task in tasks]
+
+    datasets = [r for r in results if 'error' not in r]
+    errors = [r for r in results if 'error' in r]
+    print(json.dumps({'datasets': datasets, 'errors': errors}, indent=2))
+
+def pearson_from_sums(n, sum_x, sum_y, sum_x_sq, sum_y_sq, sum_xy):
+    if n < 2:
+        return 0.0
+    numerator = sum_xy - sum_x * sum_y / n
+    # Clamp: running sums can leave tiny negative variances after many removals
+    denominator = math.sqrt(max(0.0, (sum_x_sq - sum_x ** 2 / n) * (sum_y_sq - sum_y ** 2 / n)))
+    return max(-1.0, min(1.0, numerator / denominator)) if denominator > 1e-12 else 0.0
+
+class RunningPearson:
+    """Pearson r over a sliding set of (x, y) pairs with O(1) add/remove."""
+
+    def __init__(self):
+        self.n = 0
+        self.sum_x = self.sum_y = 0.0
+        self.sum_x_sq = self.sum_y_sq = self.sum_xy = 0.0
+
+    def add(self, x, y):
+        self.n += 1
+        self.sum_x += x
+        self.sum_y += y
+        self.sum_x_sq += x * x
+        self.sum_y_sq += y * y
+        self.sum_xy += x * y
+
+    def remove(self, x, y):
+        self.n -= 1
+        self.sum_x -= x
+        self.sum_y -= y
+        self.sum_x_sq -= x * x
+        self.sum_y_sq -= y * y
+        self.sum_xy -= x * y
+
+    def value(self):
+        return pearson_from_sums(self.n, self.sum_x, self.sum_y, self.sum_x_sq, self.sum_y_sq, self.sum_xy)
+
+def lagged_pairs(x_days, y_days, lag):
+    """
+    Pairs x on day t - lag with y on day t (both keyed by date ordinal).
+
+    A positive lag asks whether x leads y, e.g. last night's sleep against
+    today's output. Returns (ordinals, xs, ys) sorted by the y day.
+    """
+    ordinals = sorted(t for t in y_days if t - lag in x_days)
+    return ordinals, [x_days[t - lag] for t in ordinals], [y_days[t] for t in ordinals]
+
+def lag_sweep(x_days, y_days, max_lag=7, min_lag=0):
+    """Returns [(lag, r, n)] for every lag in min_lag..max_lag."""
+    results = []
+    for lag in range(min_lag, max_lag + 1):
+        _, xs, ys = lagged_pairs(x_days, y_days, lag)
+        results.append((lag, calculate_pearson(xs, ys), len(xs)))
+    return results
+
+def rolling_correlation(ordinals, xs, ys, window=30, min_periods=5):
+    """
+    Pearson r over a trailing window of `window` calendar days ending on
+    each paired day. Pairs enter and leave a RunningPearson as the window
+    slides, so each step is O(1) however long the window is.
+
+    Returns [(ordinal, r, n)] for windows holding at least min_periods pairs.
+    """
+    stats = RunningPearson()
+    results = []
+    start = 0
+    for end, day in enumerate(ordinals):
+        stats.add(xs[end], ys[end])
+        while ordinals[start] <= day - window:
+            stats.remove(xs[start], ys[start])
+            start += 1
+        if stats.n >= min_periods:
+            results.append((day, stats.value(), stats.n))
+    return results
+
+def _load_pair(file1, file2, date_col_1, val_col_1, date_col_2, val_col_2, delimiter):
+    x_days = load_days(file1, date_col_1, val_col_1, delimiter=delimiter)
+    y_days = load_days(file2, date_col_2, val_col_2, delimiter=delimiter)
+    if not x_days or not y_days:
+        print("Error: No usable dated rows (expected YYYY-MM-DD dates)", file=sys.stderr)
+        sys.exit(1)
+    return x_days, y_days
+
+def lags(file1, file2, date_col_1=1, val_col_1=2, date_col_2=1, val_col_2=2, delimiter='|',
+         max_lag=7, min_lag=0, fmt='tsv'):
+    x_days, y_days = _load_pair(file1, file2, date_col_1, val_col_1, date_col_2, val_col_2, delimiter)
+    results = lag_sweep(x_days, y_days, max_lag, min_lag)
+    scored = [res for res in results if res[2] >= 2]
+    best = max(scored, key=lambda res: (abs(res[1]), res[2])) if scored else None
+
+    if fmt == 'json':
+        doc = {
+            'x': file1,
+            'y': file2,
+            'lags': [{'lag': lag, 'r': r, 'n': n} for lag, r, n in results],
+            'best_lag': best[0] if best else None,
+        }
+        print(json.dumps(doc, indent=2))
+        return
+
+    print("lag\tr\tn")
+    for lag, r, n in results:
+        print(f"{lag}\t{r:.4f}\t{n}")
+    if best:
+        print(f"Strongest: lag {best[0]} (r={best[1]:.4f}, n={best[2]})")
+
+def rolling(file1, file2, date_col_1=1, val_col_1=2, date_col_2=1, val_col_2=2, delimiter='|',
+            window=30, lag=0, min_periods=5, fmt='tsv'):
+    x_days, y_days = _load_pair(file1, file2, date_col_1, val_col_1, date_col_2, val_col_2, delimiter)
+    ordinals, xs, ys = lagged_pairs(x_days, y_days, lag)
+    results = rolling_correlation(ordinals, xs, ys, window, min_periods)
+    if not results:
+        print(f"Error: No {window}-day window has {min_periods} paired days", file=sys.stderr)
+        sys.exit(1)
+
+    if fmt == 'json':
+        doc = {
+            'window': window,
+            'lag': lag,
+            'points': [{'date': date.fromordinal(day).isoformat(), 'r': r, 'n': n} for day, r, n in results],
+        }
+        print(json.dumps(doc, indent=2))
+        return
+
+    print("date\tr\tn")
+    for day, r, n in results:
+        print(f"{date.fromordinal(day).isoformat()}\t{r:.4f}\t{n}")
+
+def rank(values):
+    """1-based ranks with ties sharing their average rank (for Spearman)."""
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        avg = (i + j) / 2.0 + 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = avg
+        i = j + 1
+    return ranks
+
+def parse_dataset_spec(spec, date_col, val_col):
+    """Splits "path[:date_col:val_col]" into (path, date_col, val_col)."""
+    parts = spec.rsplit(':', 2)
+    if len(parts) == 3 and parts[1].isdigit() and parts[2].isdigit():
+        return parts[0], int(parts[1]), int(parts[2])
+    return spec, date_col, val_col
+
+def dataset_labels(paths):
+    """Short labels (file name without extension), falling back to the path when names clash."""
+    names = [os.path.splitext(os.path.basename(p))[0] for p in paths]
+    return [n if names.count(n) == 1 else p for n, p in zip(names, paths)]
+
+def align_datasets(datasets):
+    """
+    Aligns daily datasets on the dates they all share.
+
+    Returns (dates, columns) where columns[i][k] is dataset i on dates[k].
+    """
+    if not datasets:
+        return [], []
+    shared = set(datasets[0])
+    for data in datasets[1:]:
+        shared &= set(data)
+    dates = sorted(shared)
+    return dates, [[data[d] for d in dates] for data in datasets]
+
+def correlation_matrix(columns):
+    """
+    Pearson and Spearman matrices for aligned columns.
+
+    Spearman is Pearson over ranks, so each column is ranked once and both
+    matrices come out of a single pass over the rows accumulating sums,
+    sums of squares and cross products for every pair.
+    """
+    k = len(columns)
+    n = len(columns[0]) if columns else 0
+    series = columns + [rank(c) for c in columns]
+    m = len(series)
+    sums = [0.0] * m
+    sums_sq = [0.0] * m
+    cross = [[0.0] * m for _ in range(m)]
+    for row in zip(*series):
+        for i in range(m):
+            xi = row[i]
+            sums[i] += xi
+            sums_sq[i] += xi * xi
+            cross_i = cross[i]
+            for j in range(i + 1, m):
+                cross_i[j] += xi * row[j]
+
+    def r(i, j):
+        if i == j:
+            return 1.0
+        if i > j:
+            i, j = j, i
+        return pearson_from_sums(n, sums[i], sums[j], sums_sq[i], sums_sq[j], cross[i][j])
+
+    pearson = [[r(i, j) for j in range(k)] for i in range(k)]
+    spearman = [[r(k + i, k + j) for j in range(k)] for i in range(k)]
+    return pearson, spearman
+
+def matrix(specs, date_col=1, val_col=2, delimiter='|', methods=('pearson', 'spearman'), fmt='tsv'):
+    if len(specs) < 2:
+        print("Error: matrix needs at least two datasets", file=sys.stderr)
+        sys.exit(1)
+    parsed = [parse_dataset_spec(spec, date_col, val_col) for spec in specs]
+    datasets = [load_dataset(path, d, v, delimiter=delimiter) for path, d, v in parsed]
+    labels = dataset_labels([path for path, _, _ in parsed])
+
+    dates, columns = align_datasets(datasets)
+    if not dates:
+        print("Error: No dates shared by all datasets", file=sys.stderr)
+        sys.exit(1)
+    elif len(dates) < 5:
+        print(f"Warning: Only {len(dates)} shared data points (recommended minimum: 5)", file=sys.stderr)
+
+    pearson, spearman = correlation_matrix(columns)
+    results = {'pearson': pearson, 'spearman': spearman}
+
+    if fmt == 'json':
+        doc = {'labels': labels, 'n': len(dates), 'first_date': dates[0], 'last_date': dates[-1]}
+        doc.update({m: results[m] for m in methods})
+        print(json.dumps(doc, indent=2))
+        return
+
+    for block, method in enumerate(methods):
+        if block:
+            print("")
+        print("\t".join([method] + labels))
+        for label, row in zip(labels, results[method]):
+            print("\t".join([label] + [f"{r:.4f}" for r in row]))
 
 def correlate(file1, file2, date_col_1=1, val_col_1=2, date_col_2=1, val_col_2=2):
     data1 = load_dataset(file1, date_col_1, val_col_1)
@@ -139,6 +663,9 @@ def correlate(file1, file2, date_col_1=1, val_col_1=2, date_col_2=1, val_col_2=2
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Correlation Engine')
+    parser.add_argument('--resume', action='store_true',
+                        help='Treat sources as append-only and read only bytes added since the cached run '
+                             '(same as CORRELATE_RESUME=1)')
     subparsers = parser.add_subparsers(dest='command')
     
     corr_parser = subparsers.add_parser('correlate')
@@ -150,14 +677,74 @@ if __name__ == "__main__":
     corr_parser.add_argument('--v2', type=int, default=2, help='Value column index file 2 (0-based)')
 
     patterns_parser = subparsers.add_parser('patterns')
-    patterns_parser.add_argument('file1')
+    patterns_parser.add_argument('files', nargs='*', metavar='file',
+                                 help='Dataset; with --all, any number of path[:date_col:value_col] specs')
     patterns_parser.add_argument('--d', type=int, default=1, help='Date column index (0-based)')
     patterns_parser.add_argument('--v', type=int, default=2, help='Value column index (0-based)')
     patterns_parser.add_argument('--delimiter', default='|', help='Field delimiter (default: |)')
+    patterns_parser.add_argument('--all', action='store_true',
+                                 help='Summarise every dataset given (and listed in --config) as one JSON document')
+    patterns_parser.add_argument('--config', help='File listing one dataset spec per line (with --all)')
+    patterns_parser.add_argument('--workers', type=int, default=1,
+                                 help='Processes to spread --all datasets over (default: 1)')
+
+    matrix_parser = subparsers.add_parser('matrix', help='Correlation matrix across many datasets')
+    matrix_parser.add_argument('files', nargs='+', help='Datasets, optionally as path:date_col:value_col')
+    matrix_parser.add_argument('--d', type=int, default=1, help='Default date column index (0-based)')
+    matrix_parser.add_argument('--v', type=int, default=2, help='Default value column index (0-based)')
+    matrix_parser.add_argument('--delimiter', default='|', help='Field delimiter (default: |)')
+    matrix_parser.add_argument('--method', choices=['pearson', 'spearman', 'both'], default='both')
+    matrix_parser.add_argument('--format', choices=['tsv', 'json'], default='tsv')
+
+    for name, help_text in (('lags', 'Correlation of file1 on day t-lag with file2 on day t, per lag'),
+                            ('rolling', 'Correlation over a sliding window of days')):
+        pair_parser = subparsers.add_parser(name, help=help_text)
+        pair_parser.add_argument('file1', help='Leading series (x)')
+        pair_parser.add_argument('file2', help='Following series (y)')
+        pair_parser.add_argument('--d1', type=int, default=1, help='Date column index file 1 (0-based)')
+        pair_parser.add_argument('--v1', type=int, default=2, help='Value column index file 1 (0-based)')
+        pair_parser.add_argument('--d2', type=int, default=1, help='Date column index file 2 (0-based)')
+        pair_parser.add_argument('--v2', type=int, default=2, help='Value column index file 2 (0-based)')
+        pair_parser.add_argument('--delimiter', default='|', help='Field delimiter (default: |)')
+        pair_parser.add_argument('--format', choices=['tsv', 'json'], default='tsv')
+        if name == 'lags':
+            pair_parser.add_argument('--max-lag', type=int, default=7, help='Largest lag in days (default: 7)')
+            pair_parser.add_argument('--min-lag', type=int, default=0, help='Smallest lag in days (default: 0)')
+        else:
+            pair_parser.add_argument('--window', type=int, default=30, help='Window length in days (default: 30)')
+            pair_parser.add_argument('--lag', type=int, default=0, help='Days file1 leads file2 (default: 0)')
+            pair_parser.add_argument('--min-periods', type=int, default=5,
+                                     help='Paired days a window needs before r is reported (default: 5)')
     
     args = parser.parse_args()
-    
+    if args.resume:
+        RESUME = True
+
     if args.command == 'correlate':
         correlate(args.file1, args.file2, args.d1, args.v1, args.d2, args.v2)
     elif args.command == 'patterns':
-        patterns(args.file1, args.d, args.v, args.delimiter)
+        if args.all:
+            specs = list(args.files)
+            if args.config:
+                if not os.path.exists(args.config):
+                    print(f"Error: File not found: {args.config}", file=sys.stderr)
+                    sys.exit(1)
+                specs += read_dataset_config(args.config)
+            patterns_all(specs, args.d, args.v, args.delimiter, max(1, args.workers))
+        elif len(args.files) != 1 or args.config:
+            patterns_parser.error('expects exactly one file (use --all for several or --config)')
+        else:
+            patterns(args.files[0], args.d, args.v, args.delimiter)
+    elif args.command == 'matrix':
+        methods = ('pearson', 'spearman') if args.method == 'both' else (args.method,)
+        matrix(args.files, args.d, args.v, args.delimiter, methods, args.format)
+    elif args.command == 'lags':
+        if args.min_lag > args.max_lag:
+            parser.error('--min-lag must not exceed --max-lag')
+        lags(args.file1, args.file2, args.d1, args.v1, args.d2, args.v2, args.delimiter,
+             args.max_lag, args.min_lag, args.format)
+    elif args.command == 'rolling':
+        if args.window < 1 or args.min_periods < 2:
+            parser.error('--window must be at least 1 and --min-periods at least 2')
+        rolling(args.file1, args.file2, args.d1, args.v1, args.d2, args.v2, args.delimiter,
+                args.window, args.lag, args.min_periods, args.format)
@@ -246,6 +246,58 @@ find_patterns() {
     _correlation_inline_patterns "$file" "$date_col" "$value_col"
 }
 
+# Pattern summaries for many datasets in one python3 process, as one JSON document
+# Usage: find_patterns_all [--config FILE] [--workers N] [--d N --v N] <file[:d:v]>...
+find_patterns_all() {
+    _correlation_require_python || return 1
+
+    if ! _correlation_has_python_engine; then
+        echo "Error: correlate.py not found at $CORRELATE_PY" >&2
+        return 1
+    fi
+
+    python3 "$CORRELATE_PY" patterns --all "$@"
+}
+
+# Correlation matrix (Pearson + Spearman) across many datasets in one process
+# Usage: correlation_matrix [--format tsv|json] [--method pearson|spearman|both] <file[:d:v]>...
+correlation_matrix() {
+    _correlation_require_python || return 1
+
+    if ! _correlation_has_python_engine; then
+        echo "Error: correlate.py not found at $CORRELATE_PY" >&2
+        return 1
+    fi
+
+    python3 "$CORRELATE_PY" matrix "$@"
+}
+
+# Lag sweep: r of file1 on day t-lag against file2 on day t, for each lag
+# Usage: correlation_lags <file1> <file2> [--max-lag N] [--d1 N --v1 N --d2 N --v2 N] [--format tsv|json]
+correlation_lags() {
+    _correlation_require_python || return 1
+
+    if ! _correlation_has_python_engine; then
+        echo "Error: correlate.py not found at $CORRELATE_PY" >&2
+        return 1
+    fi
+
+    python3 "$CORRELATE_PY" lags "$@"
+}
+
+# Rolling-window correlation, updated incrementally as the window slides
+# Usage: correlation_rolling <file1> <file2> [--window DAYS] [--lag N] [--min-periods N] [--format tsv|json]
+correlation_rolling() {
+    _correlation_require_python || return 1
+
+    if ! _correlation_has_python_engine; then
+        echo "Error: correlate.py not found at $CORRELATE_PY" >&2
+        return 1
+    fi
+
+    python3 "$CORRELATE_PY" rolling "$@"
+}
+
 # Predict value based on historical correlations
 # Usage: predict_value <historical_data> <current_inputs>
 predict_value() {
@@ -33,3 +33,129 @@ teardown() {
     [ "$status" -eq 0 ]
     [[ "$output" =~ "moderate positive" ]]
 }
+
+@test "correlate.sh matrix prints pearson and spearman blocks" {
+    cat <<EOF > "$TEST_DIR/other.csv"
+2026-01-01|5
+2026-01-02|4
+2026-01-03|3
+2026-01-04|2
+2026-01-05|1
+EOF
+    run bash -c "cd \"$TEST_DIR\" && \"$CORRELATE_SCRIPT\" matrix --d 0 --v 1 data.csv other.csv"
+    [ "$status" -eq 0 ]
+    [[ "$output" =~ "pearson" ]]
+    [[ "$output" =~ "spearman" ]]
+    [[ "$output" =~ "-1.0000" ]]
+}
+
+@test "correlate.sh matrix emits json" {
+    cp "$TEST_DIR/data.csv" "$TEST_DIR/copy.csv"
+    run bash -c "cd \"$TEST_DIR\" && \"$CORRELATE_SCRIPT\" matrix --format json data.csv:0:1 copy.csv:0:1"
+    [ "$status" -eq 0 ]
+    [[ "$output" =~ "\"labels\"" ]]
+    [[ "$output" =~ "\"n\": 5" ]]
+}
+
+@test "correlate.sh matrix requires two datasets" {
+    run bash -c "cd \"$TEST_DIR\" && \"$CORRELATE_SCRIPT\" matrix data.csv"
+    [ "$status" -ne 0 ]
+}
+
+@test "correlate.sh lags finds the leading day" {
+    cat <<EOF > "$TEST_DIR/lead.csv"
+2026-01-01|3
+2026-01-02|1
+2026-01-03|4
+2026-01-04|1
+2026-01-05|5
+2026-01-06|9
+2026-01-07|2
+EOF
+    cat <<EOF > "$TEST_DIR/follow.csv"
+2026-01-02|3
+2026-01-03|1
+2026-01-04|4
+2026-01-05|1
+2026-01-06|5
+2026-01-07|9
+2026-01-08|2
+EOF
+    run bash -c "cd \"$TEST_DIR\" && \"$CORRELATE_SCRIPT\" lags lead.csv follow.csv --d1 0 --v1 1 --d2 0 --v2 1 --max-lag 3"
+    [ "$status" -eq 0 ]
+    [[ "$output" =~ "Strongest: lag 1 (r=1.0000, n=7)" ]]
+}
+
+@test "correlate.sh rolling reports one row per full window" {
+    cp "$TEST_DIR/data.csv" "$TEST_DIR/copy.csv"
+    run bash -c "cd \"$TEST_DIR\" && \"$CORRELATE_SCRIPT\" rolling data.csv copy.csv --d1 0 --v1 1 --d2 0 --v2 1 --window 3 --min-periods 3"
+    [ "$status" -eq 0 ]
+    [[ "$output" =~ "2026-01-03	1.0000	3" ]]
+    [[ "$output" =~ "2026-01-05	1.0000	3" ]]
+}
+
+@test "correlate.sh run picks up edits to a cached dataset" {
+    cp "$TEST_DIR/data.csv" "$TEST_DIR/copy.csv"
+    run bash -c "cd \"$TEST_DIR\" && \"$CORRELATE_SCRIPT\" run data.csv copy.csv 0 1 0 1"
+    [ "$status" -eq 0 ]
+    [[ "$output" =~ "1.0000" ]]
+    [ -n "$(ls "$TEST_DIR/.cache/dotfiles/correlate")" ]
+
+    cat <<EOF > "$TEST_DIR/copy.csv"
+2026-01-01|5
+2026-01-02|4
+2026-01-03|3
+2026-01-04|2
+2026-01-05|1
+EOF
+    run bash -c "cd \"$TEST_DIR\" && \"$CORRELATE_SCRIPT\" run data.csv copy.csv 0 1 0 1"
+    [ "$status" -eq 0 ]
+    [[ "$output" =~ "-1.0000" ]]
+}
+
+@test "correlate.sh find-patterns folds appended rows in resume mode" {
+    run bash -c "cd \"$TEST_DIR\" && CORRELATE_RESUME=1 \"$CORRELATE_SCRIPT\" find-patterns data.csv 0 1"
+    [ "$status" -eq 0 ]
+    [[ "$output" =~ "Days: 5" ]]
+
+    printf '2026-01-05|15\n2026-01-06|6\n' >> "$TEST_DIR/data.csv"
+    run bash -c "cd \"$TEST_DIR\" && CORRELATE_RESUME=1 \"$CORRELATE_SCRIPT\" find-patterns data.csv 0 1"
+    [ "$status" -eq 0 ]
+    [[ "$output" =~ "Days: 6" ]]
+    [[ "$output" =~ "Max: 10.00" ]]
+}
+
+@test "correlate.sh find-patterns --all summarises datasets from args and config as json" {
+    cp "$TEST_DIR/data.csv" "$TEST_DIR/copy.csv"
+    cat <<EOF > "$TEST_DIR/metrics.conf"
+# one dataset per line
+copy.csv:0:1
+EOF
+    run bash -c "cd \"$TEST_DIR\" && \"$CORRELATE_SCRIPT\" find-patterns --all --config metrics.conf --workers 2 data.csv:0:1"
+    [ "$status" -eq 0 ]
+    [[ "$output" =~ "\"datasets\"" ]]
+    [[ "$output" =~ "\"trend\": \"increasing\"" ]]
+    [[ "$output" =~ "copy.csv" ]]
+    [[ "$output" =~ "\"errors\": []" ]]
+}
+
+@test "correlate.sh find-patterns rereads a resumed file edited mid-way" {
+    : > "$TEST_DIR/long.csv"
+    for day in $(seq -w 1 28); do
+        for sample in $(seq 1 20); do
+            echo "2026-02-$day|1|padding-to-push-the-edit-past-the-first-few-kilobytes" >> "$TEST_DIR/long.csv"
+        done
+    done
+    run bash -c "cd \"$TEST_DIR\" && CORRELATE_RESUME=1 \"$CORRELATE_SCRIPT\" find-patterns long.csv 0 1"
+    [ "$status" -eq 0 ]
+    [[ "$output" =~ "Max: 1.00" ]]
+
+    # Same-length edit well past the first 4 KB, plus an append
+    sed -i.bak 's/^2026-02-20|1|/2026-02-20|9|/' "$TEST_DIR/long.csv"
+    echo "2026-03-01|1|x" >> "$TEST_DIR/long.csv"
+    run bash -c "cd \"$TEST_DIR\" && CORRELATE_RESUME=1 \"$CORRELATE_SCRIPT\" find-patterns long.csv 0 1"
+    [ "$status" -eq 0 ]
+    [[ "$output" =~ "Days: 29" ]]
+    [[ "$output" =~ "Max: 9.00" ]]
+}
+